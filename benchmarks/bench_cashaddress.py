@@ -0,0 +1,138 @@
+"""
+Micro-benchmarks for CashAddr encoding and decoding.
+
+The table-driven polymod with precomputed prefix states is compared with
+the previous polymod, which looped over the generator for every symbol and
+expanded the prefix for every address.
+
+Run with ``python benchmarks/bench_cashaddress.py``.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitcash import cashaddress  # noqa: E402
+from bitcash.cashaddress import (  # noqa: E402
+    Address,
+    decode_addresses,
+    encode_addresses,
+    polymod,
+    prefix_expand,
+    scripts_to_addresses,
+)
+
+N_ADDRESSES = 10000
+
+
+def reference_polymod(values: list[int]) -> int:
+    """The polymod of bitcash.cashaddress before the lookup table."""
+    chk = 1
+    generator = [
+        (0x01, 0x98F2BC8E61),
+        (0x02, 0x79B76D99E2),
+        (0x04, 0xF33E5FB3C4),
+        (0x08, 0xAE2EABE2A8),
+        (0x10, 0x1E4F43E470),
+    ]
+    for value in values:
+        top = chk >> 35
+        chk = ((chk & 0x07FFFFFFFF) << 5) ^ value
+        for i in generator:
+            if top & i[0] != 0:
+                chk ^= i[1]
+    return chk ^ 1
+
+
+def reference_calculate_checksum(prefix: str, payload: list[int]) -> list[int]:
+    poly = reference_polymod(prefix_expand(prefix) + payload + [0] * 8)
+    return [(poly >> 5 * (7 - i)) & 0x1F for i in range(8)]
+
+
+def reference_verify_checksum(prefix: str, payload: list[int]) -> bool:
+    return reference_polymod(prefix_expand(prefix) + payload) == 0
+
+
+def make_addresses(n: int) -> list[str]:
+    return [
+        Address("P2PKH", list(i.to_bytes(20, "big"))).cash_address() for i in range(n)
+    ]
+
+
+def run(addresses: list[str]) -> tuple[float, float]:
+    # measure the conversions, not the caches of Address
+    cashaddress._cached_from_string.cache_clear()
+    cashaddress._cached_encode_cashaddress.cache_clear()
+    start = timeit.default_timer()
+    decoded = [Address.from_string(address) for address in addresses]
+    decode = timeit.default_timer() - start
+    start = timeit.default_timer()
+    for address in decoded:
+        address.cash_address()
+    encode = timeit.default_timer() - start
+    return decode, encode
+
+
+def bench(n: int = N_ADDRESSES) -> None:
+    addresses = make_addresses(n)
+    values = prefix_expand("bitcoincash") + [0] * 42
+    table = timeit.timeit(lambda: polymod(values), number=n) / n
+    reference = timeit.timeit(lambda: reference_polymod(values), number=n) / n
+    print(
+        f"polymod of {len(values)} symbols: {table * 1e6:.2f} us,"
+        f" reference {reference * 1e6:.2f} us"
+    )
+
+    decode, encode = run(addresses)
+
+    checksums = (cashaddress.calculate_checksum, cashaddress.verify_checksum)
+    cashaddress.calculate_checksum = reference_calculate_checksum
+    cashaddress.verify_checksum = reference_verify_checksum
+    try:
+        ref_decode, ref_encode = run(addresses)
+    finally:
+        cashaddress.calculate_checksum, cashaddress.verify_checksum = checksums
+
+    print(
+        f"{n} addresses: decode {decode * 1e3:.1f} ms"
+        f" (reference {ref_decode * 1e3:.1f} ms),"
+        f" encode {encode * 1e3:.1f} ms (reference {ref_encode * 1e3:.1f} ms)"
+    )
+
+    start = timeit.default_timer()
+    decoded = decode_addresses(addresses)
+    bulk_decode = timeit.default_timer() - start
+    start = timeit.default_timer()
+    encode_addresses(result.value for result in decoded)
+    bulk_encode = timeit.default_timer() - start
+    print(
+        f"{n} addresses in bulk: decode {bulk_decode * 1e3:.1f} ms,"
+        f" encode {bulk_encode * 1e3:.1f} ms"
+    )
+
+    address = addresses[0]
+    repeated = timeit.timeit(lambda: Address.from_string(address).scriptcode, number=n)
+    print(f"same address parsed {n} times: {repeated * 1e3:.1f} ms")
+
+    # token holders: each script appears in several outputs
+    scripts = [Address.from_string(address).scriptcode for address in addresses]
+    scripts = scripts[: n // 10] * 10
+    cashaddress._cached_encode_cashaddress.cache_clear()
+    start = timeit.default_timer()
+    for script in scripts:
+        Address.from_script(script).cash_address()
+    single = timeit.default_timer() - start
+    cashaddress._cached_encode_cashaddress.cache_clear()
+    start = timeit.default_timer()
+    scripts_to_addresses(scripts)
+    batch = timeit.default_timer() - start
+    print(
+        f"{n} scripts of {n // 10} addresses: from_script {single * 1e3:.1f} ms,"
+        f" scripts_to_addresses {batch * 1e3:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,96 @@
+"""
+Benchmarks for coin selection in ``sanitize_tx_data`` with ``combine=False``.
+
+The running totals of ``UnspentSelection`` are compared with the previous
+selection loop, which copied the aggregate for every candidate unspent.
+
+Run with ``python benchmarks/bench_selection.py``.
+"""
+
+import os
+import sys
+import time
+from copy import deepcopy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitcash.cashaddress import Address  # noqa: E402
+from bitcash.cashtoken import Unspents, prepare_output  # noqa: E402
+from bitcash.exceptions import InsufficientFunds  # noqa: E402
+from bitcash.network.meta import Unspent  # noqa: E402
+from bitcash.transaction import estimate_tx_fee, sanitize_tx_data  # noqa: E402
+
+ADDRESS = "bitcoincash:qzfyvx77v2pmgc0vulwlfkl3uzjgh5gnmqk5hhyaa6"
+UNSPENT_COUNTS = (100, 1000, 5000, 50000)
+
+
+def make_unspents(n: int) -> list[Unspent]:
+    return [
+        Unspent(10000 + i % 7, 1, "script", i.to_bytes(32, "big").hex(), i % 3)
+        for i in range(n)
+    ]
+
+
+def deepcopy_selection(unspents, outputs, fee, leftover):
+    """The selection loop of sanitize_tx_data before running totals."""
+    unspents = sorted(deepcopy(unspents))
+    prepared_outputs = [prepare_output(output) for output in outputs]
+    leftover_address = Address.from_string(leftover)
+    output_script_list = [output.scriptcode for output in prepared_outputs]
+    cashtoken = Unspents([])
+    for index, unspent in enumerate(unspents):
+        cashtoken.add_unspent(unspent)
+        test_token = deepcopy(cashtoken)
+        try:
+            for output in prepared_outputs:
+                test_token.subtract_output(output)
+            leftover_outputs, leftover_amount = test_token.get_outputs(leftover_address)
+        except InsufficientFunds:
+            continue
+        output_script_list += [output.scriptcode for output in leftover_outputs]
+        calculated_fee = estimate_tx_fee(index + 1, output_script_list, fee, True)
+        if calculated_fee < leftover_amount:
+            return unspents[: index + 1]
+    raise InsufficientFunds
+
+
+def bench_selection() -> None:
+    print("sanitize_tx_data(combine=False), spending 80% of the balance")
+    for n in UNSPENT_COUNTS:
+        unspents = make_unspents(n)
+        outputs = [(ADDRESS, sum(u.amount for u in unspents) * 8 // 10, "satoshi")]
+
+        start = time.perf_counter()
+        selected, _ = sanitize_tx_data(unspents, outputs, 1, ADDRESS, combine=False)
+        new = time.perf_counter() - start
+
+        if n <= 5000:
+            start = time.perf_counter()
+            deepcopy_selection(unspents, outputs, 1, ADDRESS)
+            old = f"{(time.perf_counter() - start) * 1e3:10.1f} ms"
+        else:
+            old = "   skipped"
+
+        print(
+            f"  {n:>6} unspents: {len(selected):>6} selected"
+            f" {new * 1e3:10.1f} ms, deepcopy loop {old}"
+        )
+
+
+def bench_sort(n: int = 100000) -> None:
+    unspents = make_unspents(n)
+    start = time.perf_counter()
+    sorted(unspents, key=Unspent.sort_key)
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    sorted(unspents, key=Unspent.sort_key)
+    cached = time.perf_counter() - start
+    print(
+        f"sort {n} unspents: {first * 1e3:.1f} ms,"
+        f" {cached * 1e3:.1f} ms with cached keys"
+    )
+
+
+if __name__ == "__main__":
+    bench_selection()
+    bench_sort()
@@ -0,0 +1,128 @@
+"""
+Benchmarks for transaction serialization.
+
+Run with ``python benchmarks/bench_transaction.py``.
+"""
+
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitcash.cashaddress import Address  # noqa: E402
+from bitcash.network.meta import Unspent  # noqa: E402
+from bitcash.transaction import (  # noqa: E402
+    TxIn,
+    create_p2pkh_transaction,
+    create_p2pkh_transactions,
+    serialize_transaction,
+)
+from bitcash.types import CashTokens, PreparedOutput  # noqa: E402
+from bitcash.wallet import PrivateKey  # noqa: E402
+
+ADDRESS = "bitcoincash:qzfyvx77v2pmgc0vulwlfkl3uzjgh5gnmqk5hhyaa6"
+INPUT_COUNTS = (1, 10, 100, 1000, 10000)
+
+
+def make_outputs() -> list[PreparedOutput]:
+    return [
+        PreparedOutput(
+            Address.from_string(ADDRESS).scriptcode,
+            1000,
+            CashTokens(None, None, None, None),
+        )
+    ]
+
+
+def make_unspents(private_key: PrivateKey, n: int) -> list[Unspent]:
+    script = private_key.scriptcode.hex()
+    return [Unspent(2000, 1, script, i.to_bytes(32, "big").hex(), 0) for i in range(n)]
+
+
+def make_inputs(n: int) -> list[TxIn]:
+    script_sig = b"\x47" + b"\x30" * 71 + b"\x21" + b"\x02" * 33
+    return [
+        TxIn(
+            script_sig,
+            len(script_sig).to_bytes(1, "little"),
+            i.to_bytes(32, "little"),
+            b"\x00\x00\x00\x00",
+            b"\x00" * 8,
+        )
+        for i in range(n)
+    ]
+
+
+def bench_serialize_transaction() -> None:
+    outputs = make_outputs()
+    print("serialize_transaction")
+    for n in INPUT_COUNTS:
+        inputs = make_inputs(n)
+        number = max(1, 10000 // n)
+        seconds = timeit.timeit(
+            lambda: serialize_transaction(inputs, outputs), number=number
+        )
+        per_call = seconds / number
+        print(
+            f"  {n:>6} inputs: {per_call * 1e3:10.3f} ms/tx"
+            f" {per_call / n * 1e6:8.3f} us/input"
+        )
+
+
+def bench_create_p2pkh_transaction(n: int = 2000) -> None:
+    private_key = PrivateKey()
+    unspents = make_unspents(private_key, n)
+    outputs = make_outputs()
+    print(f"create_p2pkh_transaction, {n} inputs")
+    for workers in (None, 2, 4, os.cpu_count()):
+        seconds = timeit.timeit(
+            lambda: create_p2pkh_transaction(
+                private_key, unspents, outputs, workers=workers
+            ),
+            number=1,
+        )
+        print(f"  workers={workers!s:>4}: {seconds * 1e3:10.3f} ms/tx")
+
+
+def bench_low_r(n: int = 2000) -> None:
+    private_key = PrivateKey()
+    unspents = make_unspents(private_key, n)
+    outputs = make_outputs()
+    print(f"create_p2pkh_transaction low_r, {n} inputs")
+    for low_r in (False, True):
+        start = time.perf_counter()
+        tx_hex = create_p2pkh_transaction(private_key, unspents, outputs, low_r=low_r)
+        seconds = time.perf_counter() - start
+        print(
+            f"  low_r={low_r!s:>5}: {seconds / n * 1e6:8.3f} us/input"
+            f" {len(tx_hex) // 2 / n:8.3f} bytes/input"
+        )
+
+
+def bench_create_p2pkh_transactions(n: int = 500, n_keys: int = 20) -> None:
+    keys = [PrivateKey() for _ in range(n_keys)]
+    outputs = make_outputs()
+    jobs = [
+        (keys[i % n_keys], make_unspents(keys[i % n_keys], 3), outputs)
+        for i in range(n)
+    ]
+    print(f"create_p2pkh_transactions, {n} jobs of 3 inputs")
+    start = time.perf_counter()
+    for job in jobs:
+        create_p2pkh_transaction(*job)
+    seconds = time.perf_counter() - start
+    print(f"  sequential: {n / seconds:10.1f} tx/s")
+    for max_workers in (2, os.cpu_count()):
+        start = time.perf_counter()
+        create_p2pkh_transactions(jobs, max_workers=max_workers, chunksize=16)
+        seconds = time.perf_counter() - start
+        print(f"  max_workers={max_workers}: {n / seconds:10.1f} tx/s")
+
+
+if __name__ == "__main__":
+    bench_serialize_transaction()
+    bench_create_p2pkh_transaction()
+    bench_low_r()
+    bench_create_p2pkh_transactions()
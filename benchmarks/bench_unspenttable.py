@@ -0,0 +1,60 @@
+"""
+Benchmarks for ``UnspentTable`` against a list of ``Unspent``.
+
+Run with ``python benchmarks/bench_unspenttable.py``, NumPy is required.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitcash.network.meta import Unspent  # noqa: E402
+from bitcash.unspenttable import UnspentTable  # noqa: E402
+
+N_UNSPENTS = 1000000
+SCRIPT = "76a914" + "00" * 20 + "88ac"
+
+
+def make_unspents(n: int) -> list[Unspent]:
+    return [
+        Unspent(546 + i % 100000, i % 10, SCRIPT, i.to_bytes(32, "big").hex(), i % 3)
+        for i in range(n)
+    ]
+
+
+def bench(n: int = N_UNSPENTS) -> None:
+    tracemalloc.start()
+    unspents = make_unspents(n)
+    list_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    table = UnspentTable.from_unspents(unspents)
+    convert = time.perf_counter() - start
+    table_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(
+        f"{n} unspents: list {list_size / n:.0f} bytes each,"
+        f" table {table_size / n:.0f} bytes each, built in {convert * 1e3:.0f} ms"
+    )
+
+    start = time.perf_counter()
+    selected = [u for u in unspents if u.confirmations >= 1 and u.amount >= 1000]
+    sorted(selected, key=lambda u: u.amount, reverse=True)[:100]
+    listed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table.filter(min_confirmations=1, min_amount=1000).top_k(100)
+    vectorized = time.perf_counter() - start
+    print(
+        f"filter and top 100: list {listed * 1e3:.1f} ms,"
+        f" table {vectorized * 1e3:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    bench()
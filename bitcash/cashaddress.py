@@ -1,58 +1,84 @@
 from __future__ import annotations
 
-import io
-from typing import Any, Optional
+import functools
+from typing import Any, Iterable, NamedTuple, Optional, Sequence
 
 from bitcash.exceptions import InvalidAddress
 from bitcash.op import OpCodes
 from bitcash.types import CashAddressVersion, Network
-from bitcash.utils import varint_to_int
+from bitcash.utils import split_cashtoken_prefix
 
 CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+TOKEN_PREFIX_BYTE = OpCodes.OP_TOKENPREFIX.binary
+# number of addresses kept by the caches of Address
+ADDRESS_CACHE_SIZE = 1024
 
 
-def polymod(values: list[int]) -> int:
-    chk = 1
-    generator = [
-        (0x01, 0x98F2BC8E61),
-        (0x02, 0x79B76D99E2),
-        (0x04, 0xF33E5FB3C4),
-        (0x08, 0xAE2EABE2A8),
-        (0x10, 0x1E4F43E470),
-    ]
+CHARSET_INDEX = {letter: i for i, letter in enumerate(CHARSET)}
+
+POLYMOD_GENERATOR = (
+    0x98F2BC8E61,
+    0x79B76D99E2,
+    0xF33E5FB3C4,
+    0xAE2EABE2A8,
+    0x1E4F43E470,
+)
+
+
+def _polymod_table() -> tuple[int, ...]:
+    # value to xor into the checksum for each of the 32 possible top 5 bits
+    table = []
+    for top in range(32):
+        value = 0
+        for bit, generator in enumerate(POLYMOD_GENERATOR):
+            if top >> bit & 1:
+                value ^= generator
+        table.append(value)
+    return tuple(table)
+
+
+POLYMOD_TABLE = _polymod_table()
+
+
+def _polymod_update(chk: int, values: Iterable[int]) -> int:
+    table = POLYMOD_TABLE
     for value in values:
-        top = chk >> 35
-        chk = ((chk & 0x07FFFFFFFF) << 5) ^ value
-        for i in generator:
-            if top & i[0] != 0:
-                chk ^= i[1]
-    return chk ^ 1
+        chk = table[chk >> 35] ^ ((chk & 0x07FFFFFFFF) << 5) ^ value
+    return chk
+
+
+def polymod(values: list[int]) -> int:
+    return _polymod_update(1, values) ^ 1
+
+
+def _prefix_state(prefix: str) -> int:
+    """
+    :returns: The polymod state after the expanded prefix, precomputed for
+              the network prefixes.
+    """
+    state = PREFIX_STATES.get(prefix)
+    if state is None:
+        state = _polymod_update(1, prefix_expand(prefix))
+    return state
 
 
 def calculate_checksum(prefix: str, payload: list[int]) -> list[int]:
-    poly = polymod(prefix_expand(prefix) + payload + [0, 0, 0, 0, 0, 0, 0, 0])
-    out: list[int] = list()
-    for i in range(8):
-        out.append((poly >> 5 * (7 - i)) & 0x1F)
-    return out
+    poly = _polymod_update(_prefix_state(prefix), payload)
+    poly = _polymod_update(poly, (0, 0, 0, 0, 0, 0, 0, 0)) ^ 1
+    return [(poly >> 5 * (7 - i)) & 0x1F for i in range(8)]
 
 
 def verify_checksum(prefix: str, payload: list[int]) -> bool:
-    return polymod(prefix_expand(prefix) + payload) == 0
+    return _polymod_update(_prefix_state(prefix), payload) == 1
 
 
 def b32decode(inputs: str) -> list[int]:
-    out: list[int] = []
-    for letter in inputs:
-        out.append(CHARSET.find(letter))
-    return out
+    get = CHARSET_INDEX.get
+    return [get(letter, -1) for letter in inputs]
 
 
 def b32encode(inputs: list[int]) -> str:
-    out = ""
-    for char_code in inputs:
-        out += CHARSET[char_code]
-    return out
+    return "".join([CHARSET[char_code] for char_code in inputs])
 
 
 def convertbits(
@@ -83,9 +109,42 @@ def prefix_expand(prefix: str) -> list[int]:
     return [ord(x) & 0x1F for x in prefix] + [0]
 
 
+# locking script templates by script size: version, bytes before the hash,
+# bytes after the hash
+SCRIPT_TEMPLATES: dict[int, tuple[str, bytes, bytes]] = {
+    25: (
+        "P2PKH",
+        OpCodes.OP_DUP.binary + OpCodes.OP_HASH160.binary + OpCodes.OP_DATA_20.binary,
+        OpCodes.OP_EQUALVERIFY.binary + OpCodes.OP_CHECKSIG.binary,
+    ),
+    23: (
+        "P2SH20",
+        OpCodes.OP_HASH160.binary + OpCodes.OP_DATA_20.binary,
+        OpCodes.OP_EQUAL.binary,
+    ),
+    35: (
+        "P2SH32",
+        OpCodes.OP_HASH256.binary + OpCodes.OP_DATA_32.binary,
+        OpCodes.OP_EQUAL.binary,
+    ),
+}
+
+NETWORK_SUFFIXES: dict[Network, str] = {
+    Network.main: "",
+    Network.test: "-TESTNET",
+    Network.regtest: "-REGTEST",
+}
+
+PREFIX_STATES = {
+    prefix: _polymod_update(1, prefix_expand(prefix))
+    for prefix in ("bitcoincash", "bchtest", "bchreg")
+}
+
+
 class Address:
     """
-    Class to handle CashAddr.
+    Class to handle CashAddr. Addresses are immutable and hashable, their
+    cashaddress string and locking script are computed once.
 
     :param version: Version of CashAddr
     :param payload: Payload of CashAddr as int list of the bytearray
@@ -127,13 +186,35 @@ class Address:
         27: "P2SH32-CATKN",
     }
 
-    def __init__(self, version: str, payload: list[int]):
+    __slots__ = ("version", "_payload", "prefix", "_cash_address", "_scriptcode")
+
+    version: str
+    prefix: str
+    _payload: bytes
+    _cash_address: Optional[str]
+    _scriptcode: Optional[bytes]
+
+    def __init__(self, version: str, payload: Sequence[int]):
         if version not in Address.VERSIONS:
             raise ValueError("Invalid address version provided")
 
-        self.version = version
-        self.payload = payload
-        self.prefix = Address.VERSIONS[self.version].prefix
+        set_attribute = object.__setattr__
+        set_attribute(self, "version", version)
+        set_attribute(self, "_payload", bytes(payload))
+        set_attribute(self, "prefix", Address.VERSIONS[version].prefix)
+        set_attribute(self, "_cash_address", None)
+        set_attribute(self, "_scriptcode", None)
+
+    @property
+    def payload(self) -> list[int]:
+        """Payload of the address as int list of the bytearray"""
+        return list(self._payload)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("Address is immutable")
+
+    def __reduce__(self):
+        return (self.__class__, (self.version, self._payload))
 
     def __str__(self):
         return (
@@ -153,46 +234,30 @@ class Address:
                 "Address can be compared to a string address or an instance of Address"
             )
 
+    def __hash__(self) -> int:
+        # equal to the hash of the string it compares equal to
+        return hash(self.cash_address())
+
     def cash_address(self) -> str:
         """
         Generate CashAddr of the Address
         """
-        version_bit = Address.VERSIONS[self.version].version_bit
-        payload = [version_bit] + self.payload
-        payload = convertbits(payload, 8, 5)
-        assert payload is not None, "Error converting payload"
-        checksum = calculate_checksum(self.prefix, payload)
-        return self.prefix + ":" + b32encode(payload + checksum)
+        cash_address = self._cash_address
+        if cash_address is None:
+            cash_address = _cached_encode_cashaddress(self.version, self._payload)
+            object.__setattr__(self, "_cash_address", cash_address)
+        return cash_address
 
     @property
     def scriptcode(self) -> bytes:
         """
         Generate the locking script of the Address
         """
-        if "P2PKH" in self.version:
-            return (
-                OpCodes.OP_DUP.binary
-                + OpCodes.OP_HASH160.binary
-                + OpCodes.OP_DATA_20.binary
-                + bytes(self.payload)
-                + OpCodes.OP_EQUALVERIFY.binary
-                + OpCodes.OP_CHECKSIG.binary
-            )
-        if "P2SH20" in self.version:
-            return (
-                OpCodes.OP_HASH160.binary
-                + OpCodes.OP_DATA_20.binary
-                + bytes(self.payload)
-                + OpCodes.OP_EQUAL.binary
-            )
-        if "P2SH32" in self.version:
-            return (
-                OpCodes.OP_HASH256.binary
-                + OpCodes.OP_DATA_32.binary
-                + bytes(self.payload)
-                + OpCodes.OP_EQUAL.binary
-            )
-        raise ValueError("Locking script not implemented for this address type")
+        scriptcode = self._scriptcode
+        if scriptcode is None:
+            scriptcode = _cached_scriptcode(self.version, self._payload)
+            object.__setattr__(self, "_scriptcode", scriptcode)
+        return scriptcode
 
     @classmethod
     def from_script(cls, scriptcode: bytes, network: Network = Network.main) -> Address:
@@ -204,100 +269,268 @@ class Address:
             :attr:`~bitcash.types.Network.test`, or :attr:`~bitcash.types.Network.regtest`
         :returns: Instance of :class:~bitcash.cashaddress.Address
         """
-        net_suffix = (
-            "-TESTNET"
-            if network == Network.test
-            else "-REGTEST" if network == Network.regtest else ""
-        )
-        # cashtoken suffix
-        catkn = ""
-        if scriptcode.startswith(OpCodes.OP_TOKENPREFIX.binary):
-            catkn = "-CATKN"
-            stream = io.BytesIO(scriptcode[33:])
-
-            token_bitfield = stream.read(1).hex()
-            # 4 bit prefix
-            _ = bin(int(token_bitfield[0], 16))[2:]
-            _ = "0" * (4 - len(_)) + _
-            prefix_structure = [bit == "1" for bit in _]
-            if prefix_structure[1]:
-                # has commitment length
-                length = varint_to_int(stream)
-                _ = stream.read(length)
-            if prefix_structure[3]:
-                # has amount
-                _ = varint_to_int(stream)
-            # only use locking script for the rest
-            scriptcode = stream.read()
-
-        # P2PKH
-        if len(scriptcode) == 25:
-            if scriptcode.startswith(
-                OpCodes.OP_DUP.binary
-                + OpCodes.OP_HASH160.binary
-                + OpCodes.OP_DATA_20.binary
-            ) and scriptcode.endswith(
-                OpCodes.OP_EQUALVERIFY.binary + OpCodes.OP_CHECKSIG.binary
-            ):
-                return cls("P2PKH" + catkn + net_suffix, list(scriptcode[3:23]))
-        # P2SH20
-        if len(scriptcode) == 23:
-            if scriptcode.startswith(
-                OpCodes.OP_HASH160.binary + OpCodes.OP_DATA_20.binary
-            ) and scriptcode.endswith(OpCodes.OP_EQUAL.binary):
-                return cls("P2SH20" + catkn + net_suffix, list(scriptcode[2:22]))
-        # P2SH32
-        if len(scriptcode) == 35:
-            if scriptcode.startswith(
-                OpCodes.OP_HASH256.binary + OpCodes.OP_DATA_32.binary
-            ) and scriptcode.endswith(OpCodes.OP_EQUAL.binary):
-                return cls("P2SH32" + catkn + net_suffix, list(scriptcode[2:34]))
-        raise ValueError("Unknown script")
+        classified = _classify_script(scriptcode)
+        if classified is None:
+            raise ValueError("Unknown script")
+        version, payload = classified
+        return cls(version + NETWORK_SUFFIXES.get(network, ""), payload)
 
     @classmethod
     def from_string(cls, address: str) -> Address:
         """
-        Generate Address from a cashadress string
+        Generate Address from a cashadress string. The addresses of the last
+        :data:`ADDRESS_CACHE_SIZE` strings are cached.
 
-        :param scriptcode: The cashaddress string
+        :param address: The cashaddress string
         :returns: Instance of :class:~bitcash.cashaddress.Address
         """
+        if type(address) is str:
+            return _cached_from_string(cls, address)
+        return cls(*_decode_cashaddress(address))
+
+
+class AddressResult(NamedTuple):
+    """
+    The result for one entry of a bulk address function.
+
+    :param value: The decoded or encoded value, or None if the entry is invalid.
+    :param error: The exception raised for the entry, or None if it is valid.
+    """
+
+    value: Any
+    error: Optional[Exception]
+
+
+def _decode_cashaddress(address: str) -> tuple[str, bytes]:
+    """
+    :returns: The version and the payload of a cashaddress string.
+    """
+    try:
+        address = str(address)
+    except Exception:
+        raise InvalidAddress("Expected string as input")
+
+    if address.upper() != address and address.lower() != address:
+        raise InvalidAddress("Cash address contains uppercase and lowercase characters")
+
+    address = address.lower()
+    colon_count = address.count(":")
+    if colon_count == 0:
+        raise InvalidAddress("Cash address is missing prefix")
+    if colon_count > 1:
+        raise InvalidAddress("Cash address contains more than one colon character")
+
+    prefix, base32string = address.split(":")
+    decoded = b32decode(base32string)
+
+    if not verify_checksum(prefix, decoded):
+        raise InvalidAddress("Bad cash address checksum for address {}".format(address))
+
+    if -1 in decoded:
+        raise InvalidAddress(
+            "Could not determine address version: invalid character in address"
+        )
+    value = 0
+    for symbol in decoded:
+        value = value << 5 | symbol
+    padding = -5 * len(decoded) % 8
+    data = (value << padding).to_bytes((5 * len(decoded) + padding) // 8, "big")
+
+    try:
+        version = Address.ADDRESS_TYPES[data[0]]
+    except (KeyError, IndexError) as e:
+        raise InvalidAddress(f"Could not determine address version: {e}")
+    try:
+        version += Address.VERSION_SUFFIXES[prefix]
+    except KeyError:
+        raise InvalidAddress(f"Unknown cash address prefix {prefix}")
+
+    # the checksum is in the last 5 bytes, and the padding in the byte before
+    return version, data[1:-6]
+
+
+def _encode_cashaddress(version: str, payload: bytes) -> str:
+    """
+    :returns: The cashaddress string of a version and a payload.
+    """
+    try:
+        prefix, version_bit, _ = Address.VERSIONS[version]
+    except KeyError:
+        raise ValueError("Invalid address version provided")
+
+    # 8 bit to 5 bit groups, the last one padded with zeros
+    n_bits = 8 * (len(payload) + 1)
+    padding = -n_bits % 5
+    value = int.from_bytes(bytes([version_bit]) + payload, "big") << padding
+    shift = n_bits + padding
+    symbols = []
+    while shift:
+        shift -= 5
+        symbols.append(value >> shift & 0x1F)
+
+    checksum = calculate_checksum(prefix, symbols)
+    return prefix + ":" + b32encode(symbols + checksum)
+
+
+def _scriptcode(version: str, payload: bytes) -> bytes:
+    """
+    :returns: The locking script of a version and a payload.
+    """
+    if "P2PKH" in version:
+        return (
+            OpCodes.OP_DUP.binary
+            + OpCodes.OP_HASH160.binary
+            + OpCodes.OP_DATA_20.binary
+            + payload
+            + OpCodes.OP_EQUALVERIFY.binary
+            + OpCodes.OP_CHECKSIG.binary
+        )
+    if "P2SH20" in version:
+        return (
+            OpCodes.OP_HASH160.binary
+            + OpCodes.OP_DATA_20.binary
+            + payload
+            + OpCodes.OP_EQUAL.binary
+        )
+    if "P2SH32" in version:
+        return (
+            OpCodes.OP_HASH256.binary
+            + OpCodes.OP_DATA_32.binary
+            + payload
+            + OpCodes.OP_EQUAL.binary
+        )
+    raise ValueError("Locking script not implemented for this address type")
+
+
+@functools.lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _cached_from_string(cls: type[Address], address: str) -> Address:
+    return cls(*_decode_cashaddress(address))
+
+
+_cached_encode_cashaddress = functools.lru_cache(maxsize=ADDRESS_CACHE_SIZE)(
+    _encode_cashaddress
+)
+_cached_scriptcode = functools.lru_cache(maxsize=ADDRESS_CACHE_SIZE)(_scriptcode)
+
+
+def _classify_script(scriptcode: bytes) -> Optional[tuple[str, bytes]]:
+    """
+    Matches a locking script against :data:`SCRIPT_TEMPLATES`.
+
+    :returns: The mainnet version and the hash, or ``None`` for another
+              script.
+    :raises ValueError: If the cashtoken prefix is truncated.
+    """
+    catkn = ""
+    if scriptcode[:1] == TOKEN_PREFIX_BYTE:
+        *_, end = split_cashtoken_prefix(scriptcode)
+        catkn = "-CATKN"
+        # only use locking script for the rest
+        scriptcode = scriptcode[end:]
+
+    template = SCRIPT_TEMPLATES.get(len(scriptcode))
+    if template is None:
+        return None
+    version, head, tail = template
+    if not scriptcode.startswith(head) or not scriptcode.endswith(tail):
+        return None
+    return version + catkn, bytes(scriptcode[len(head) : -len(tail)])
+
+
+def scripts_to_addresses(
+    scripts: Iterable[bytes], network: Network = Network.main
+) -> list[Optional[str]]:
+    """
+    Converts many locking scripts to cashaddress strings, e.g. the outputs
+    of a token category. Each distinct hash is encoded once.
+
+    :param scripts: Locking scripts, with or without cashtoken prefix.
+    :param network: Network of the addresses.
+    :returns: For each script, the cashaddress string, or ``None`` if the
+              script is not P2PKH, P2SH20 or P2SH32.
+    """
+    suffix = NETWORK_SUFFIXES.get(network, "")
+    # keyed by hash, as the cashtoken prefixes of a category mostly differ
+    known: dict[tuple[str, bytes], str] = {}
+    addresses: list[Optional[str]] = []
+    for script in scripts:
         try:
-            address = str(address)
-        except Exception:
-            raise InvalidAddress("Expected string as input")
+            classified = _classify_script(script)
+        except ValueError:
+            classified = None
+        if classified is None:
+            addresses.append(None)
+            continue
+        address = known.get(classified)
+        if address is None:
+            version, payload = classified
+            address = known[classified] = _encode_cashaddress(version + suffix, payload)
+        addresses.append(address)
+    return addresses
+
+
+def decode_addresses(addresses: Iterable[str]) -> list[AddressResult]:
+    """
+    Decodes many cashaddress strings, e.g. an imported address book.
 
-        if address.upper() != address and address.lower() != address:
-            raise InvalidAddress(
-                "Cash address contains uppercase and lowercase characters"
-            )
+    :param addresses: Cashaddress strings.
+    :returns: For each address, the version and the payload bytes, or the
+              :class:`~bitcash.exceptions.InvalidAddress` error.
+    """
+    results = []
+    for address in addresses:
+        try:
+            results.append(AddressResult(_decode_cashaddress(address), None))
+        except InvalidAddress as e:
+            results.append(AddressResult(None, e))
+    return results
 
-        address = address.lower()
-        colon_count = address.count(":")
-        if colon_count == 0:
-            raise InvalidAddress("Cash address is missing prefix")
-        if colon_count > 1:
-            raise InvalidAddress("Cash address contains more than one colon character")
 
-        prefix, base32string = address.split(":")
-        decoded = b32decode(base32string)
+def addresses_to_scripts(addresses: Iterable[str]) -> list[AddressResult]:
+    """
+    Converts many cashaddress strings to locking scripts.
 
-        if not verify_checksum(prefix, decoded):
-            raise InvalidAddress(
-                "Bad cash address checksum for address {}".format(address)
+    :param addresses: Cashaddress strings.
+    :returns: For each address, the locking script, or the
+              :class:`~bitcash.exceptions.InvalidAddress` error.
+    """
+    results = []
+    for address in addresses:
+        try:
+            results.append(
+                AddressResult(_scriptcode(*_decode_cashaddress(address)), None)
             )
-        converted = convertbits(decoded, 5, 8)
+        except InvalidAddress as e:
+            results.append(AddressResult(None, e))
+    return results
 
-        try:
-            assert converted is not None, "Error converting payload bits"
-            version = cls.ADDRESS_TYPES[converted[0]]
-        except (KeyError, AssertionError) as e:
-            raise InvalidAddress(f"Could not determine address version: {e}")
 
-        version += cls.VERSION_SUFFIXES[prefix]
+def encode_addresses(entries: Iterable[tuple[str, bytes]]) -> list[AddressResult]:
+    """
+    Encodes many addresses, e.g. the hashes found by a chain scan.
+
+    >>> encode_addresses([("P2PKH", pubkey_hash), ("P2SH32-TESTNET", script_hash)])
 
-        payload = converted[1:-6]
-        return cls(version, payload)
+    :param entries: Pairs of address version, a key of
+                    :attr:`Address.VERSIONS`, and hash bytes.
+    :returns: For each entry, the cashaddress string, or the ``ValueError``
+              or ``TypeError`` for a malformed entry, an unknown version or a
+              hash of the wrong type or size.
+    """
+    results = []
+    for entry in entries:
+        try:
+            version, payload = entry
+            if isinstance(payload, int):
+                raise TypeError("Expected hash bytes")
+            payload = bytes(payload)
+            size = 32 if "P2SH32" in version else 20
+            if len(payload) != size:
+                raise ValueError(f"Expected a {size} bytes hash for {version}")
+            results.append(AddressResult(_encode_cashaddress(version, payload), None))
+        except (ValueError, TypeError) as e:
+            results.append(AddressResult(None, e))
+    return results
 
 
 def parse_cashaddress(data: str) -> tuple[Optional[Address], dict[str, Any]]:
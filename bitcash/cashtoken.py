@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-import io
-from typing import Optional, Sequence
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Iterable, Optional, Sequence, Union
 
 from bitcash.cashaddress import Address
 from bitcash.exceptions import InsufficientFunds, InvalidAddress
@@ -16,7 +17,14 @@ from bitcash.types import (
     TokenData,
     UserOutput,
 )
-from bitcash.utils import int_to_varint, varint_to_int
+from bitcash.utils import (
+    TOKEN_CAPABILITY_MASK,
+    TOKEN_HAS_AMOUNT,
+    TOKEN_HAS_COMMITMENT_LENGTH,
+    TOKEN_HAS_NFT,
+    int_to_varint,
+    split_cashtoken_prefix,
+)
 
 
 def _calculate_dust_value(address: Address, cashtokens: CashTokens) -> int:
@@ -30,7 +38,28 @@ def _calculate_dust_value(address: Address, cashtokens: CashTokens) -> int:
     return 444 + (8 + len(int_to_varint(len(output))) + len(output)) * 3
 
 
-def parse_cashtoken_prefix(script: bytes) -> CashTokens:
+# cashtoken of a script without token prefix
+NO_CASHTOKEN = CashTokens(None, None, None, None)
+_NFT_CAPABILITIES = {capability.value: capability for capability in NFTCapability}
+
+
+def _to_cashtoken(
+    bitfield: int,
+    nft_commitment: Optional[bytes],
+    token_amount: Optional[int],
+    category_id: str,
+) -> CashTokens:
+    nft_capability = None
+    if bitfield & TOKEN_HAS_NFT:
+        capability = bitfield & TOKEN_CAPABILITY_MASK
+        nft_capability = _NFT_CAPABILITIES.get(capability)
+        if nft_capability is None:
+            # raises the ValueError of an unknown capability
+            nft_capability = NFTCapability(capability)
+    return CashTokens(category_id, nft_capability, nft_commitment, token_amount)
+
+
+def parse_cashtoken_prefix(script: Union[bytes, memoryview]) -> CashTokens:
     """
     Parses cashtoken prefix
 
@@ -38,47 +67,41 @@ def parse_cashtoken_prefix(script: bytes) -> CashTokens:
     :returns: :class:~bitcash.types.CashTokens
     """
     # Assumes valid script
-    category_id = None
-    nft_capability = None
-    nft_commitment = None
-    token_amount = None
-
-    has_commitment_length = False
-    has_nft = False
-    has_amount = False
-
-    # make bytestream
-    stream = io.BytesIO(script)
-
-    if stream.read(1) != OpCodes.OP_TOKENPREFIX.binary:
+    category, bitfield, nft_commitment, token_amount, _ = split_cashtoken_prefix(script)
+    if category is None:
         # no token info available
-        return CashTokens(None, None, None, None)
-
+        return NO_CASHTOKEN
     # OP_HASH256 byte order
-    category_id = stream.read(32)[::-1].hex()
-
-    token_bitfield = stream.read(1).hex()
-    # 4 bit prefix
-    prefix = bin(int(token_bitfield[0], 16))[2:]
-    prefix = "0" * (4 - len(prefix)) + prefix
-    prefix_structure = [bit == "1" for bit in prefix]
-    if prefix_structure[1]:
-        has_commitment_length = True
-    if prefix_structure[2]:
-        has_nft = True
-    if prefix_structure[3]:
-        has_amount = True
-
-    nft_capability_bit = int(token_bitfield[1], 16)
-    if has_nft:
-        nft_capability = NFTCapability(nft_capability_bit)
-    if has_commitment_length:
-        commitment_length = varint_to_int(stream)
-        nft_commitment = stream.read(commitment_length)
-    if has_amount:
-        token_amount = varint_to_int(stream)
+    category_id = category[::-1].hex()
+    return _to_cashtoken(bitfield, nft_commitment, token_amount, category_id)
 
-    return CashTokens(category_id, nft_capability, nft_commitment, token_amount)
+
+def parse_cashtoken_prefixes(
+    scripts: Iterable[Union[bytes, memoryview]],
+) -> list[CashTokens]:
+    """
+    Parses the cashtoken prefixes of many locking scripts, e.g. the outputs
+    scanned by a token indexer. Category ids are decoded once per category.
+
+    :param scripts: Locking scripts, with or without token prefix.
+    :returns: The :class:~bitcash.types.CashTokens of each script.
+    """
+    category_ids: dict[bytes, str] = {}
+    cashtokens = []
+    for script in scripts:
+        category, bitfield, nft_commitment, token_amount, _ = split_cashtoken_prefix(
+            script
+        )
+        if category is None:
+            cashtokens.append(NO_CASHTOKEN)
+            continue
+        category_id = category_ids.get(category)
+        if category_id is None:
+            category_id = category_ids[category] = category[::-1].hex()
+        cashtokens.append(
+            _to_cashtoken(bitfield, nft_commitment, token_amount, category_id)
+        )
+    return cashtokens
 
 
 def generate_cashtoken_prefix(cashtoken: CashTokens) -> bytes:
@@ -91,28 +114,26 @@ def generate_cashtoken_prefix(cashtoken: CashTokens) -> bytes:
     if cashtoken.category_id is None:
         return b""
 
-    # OP_HASH256 byte order
-    script = OpCodes.OP_TOKENPREFIX.binary + bytes.fromhex(cashtoken.category_id)[::-1]
-    prefix_structure = 0
+    # token bitfield
+    bitfield = 0
     if cashtoken.nft_commitment is not None:
-        prefix_structure += 4
+        bitfield |= TOKEN_HAS_COMMITMENT_LENGTH
     if cashtoken.nft_capability is not None:
-        prefix_structure += 2
+        bitfield |= TOKEN_HAS_NFT | cashtoken.nft_capability.value
     if cashtoken.token_amount is not None:
-        prefix_structure += 1
-    nft_capability = (
-        0 if cashtoken.nft_capability is None else cashtoken.nft_capability.value
-    )
-    # token bitfield
-    token_bitfield = hex(prefix_structure)[2:] + hex(nft_capability)[2:]
-    script += bytes.fromhex(token_bitfield)
+        bitfield |= TOKEN_HAS_AMOUNT
+
+    # OP_HASH256 byte order
+    script = bytearray(OpCodes.OP_TOKENPREFIX.binary)
+    script += bytes.fromhex(cashtoken.category_id)[::-1]
+    script.append(bitfield)
     if cashtoken.nft_commitment is not None:
         script += int_to_varint(len(cashtoken.nft_commitment))
         script += cashtoken.nft_commitment
     if cashtoken.token_amount is not None:
         script += int_to_varint(cashtoken.token_amount)
 
-    return script
+    return bytes(script)
 
 
 def prepare_output(output: UserOutput) -> PreparedOutput:
@@ -237,17 +258,54 @@ class Unspents:
                 ) + unspent.cashtoken.token_amount
             if unspent.has_nft:
                 assert unspent.cashtoken.nft_capability is not None
-                nftdata = NFTData(
-                    capability=unspent.cashtoken.nft_capability,
-                    commitment=unspent.cashtoken.nft_commitment,
+                categorydata.add_nft(
+                    NFTData(
+                        capability=unspent.cashtoken.nft_capability,
+                        commitment=unspent.cashtoken.nft_commitment,
+                    )
                 )
-                categorydata.nft = (categorydata.nft or []) + [nftdata]
             self.tokendata.update({unspent.cashtoken.category_id: categorydata})
 
         # possible cashtoken genesis unspent
         if unspent.txindex == 0:
             self.genesis_unspent_txid.append(unspent.txid)
 
+    def remove_unspent(self, unspent: Unspent) -> None:
+        """
+        Removes an unspent that was added
+
+        :param unspent: An instance of Unspent to remove
+        :raises ValueError: If the cashtokens of the unspent were not added.
+        """
+        if unspent.has_cashtoken:
+            assert unspent.cashtoken.category_id is not None
+            categorydata = self.tokendata.get(unspent.cashtoken.category_id)
+            if categorydata is None:
+                raise ValueError("unspent category_id was not added")
+            token_amount = categorydata.token_amount or 0
+            if (unspent.cashtoken.token_amount or 0) > token_amount:
+                raise ValueError("unspent token_amount was not added")
+            if unspent.has_nft:
+                assert unspent.cashtoken.nft_capability is not None
+                nftdata = NFTData(
+                    capability=unspent.cashtoken.nft_capability,
+                    commitment=unspent.cashtoken.nft_commitment,
+                )
+                if categorydata.nft is None or categorydata.nft.remove(nftdata) is None:
+                    raise ValueError("unspent nft was not added")
+            if unspent.has_amount:
+                assert unspent.cashtoken.token_amount is not None
+                categorydata.token_amount = (
+                    token_amount - unspent.cashtoken.token_amount
+                )
+            categorydata = _sanitize(categorydata)
+            if categorydata.is_empty():
+                self.tokendata.pop(unspent.cashtoken.category_id)
+
+        self.amount -= unspent.amount
+        if unspent.txindex == 0:
+            self.genesis_unspent_txid.remove(unspent.txid)
+
     def get_outputs(self, leftover: Address) -> tuple[list[PreparedOutput], int]:
         """
         Return sanitized outputs for the remaining cashtokens
@@ -255,9 +313,18 @@ class Unspents:
         :param leftover: Leftover address to add the outputs
         :returns: List of prepared outputs and leftover amount
         """
-        outputs: list[PreparedOutput] = []
+        outputs, dust = self._get_token_outputs(leftover)
+        return _add_leftover_amount(outputs, self.amount - dust, leftover)
 
-        amount = self.amount
+    def _get_token_outputs(self, leftover: Address) -> tuple[list[PreparedOutput], int]:
+        """
+        Return the dust outputs carrying the remaining cashtokens
+
+        :param leftover: Leftover address to add the outputs
+        :returns: List of prepared outputs and their total amount
+        """
+        outputs: list[PreparedOutput] = []
+        dust = 0
 
         category_id: Optional[str]
         token_amount: Optional[int]
@@ -277,7 +344,7 @@ class Unspents:
                     outputs.append(
                         prepare_output(
                             (
-                                leftover.cash_address(),
+                                leftover,
                                 dust_value,
                                 "satoshi",
                                 category_id,
@@ -289,7 +356,7 @@ class Unspents:
                     )
                     # add token to first nft
                     token_amount = None
-                    amount -= dust_value
+                    dust += dust_value
             elif token_amount is not None:
                 # token_amount but no nft
                 dust_value = _calculate_dust_value(
@@ -298,7 +365,7 @@ class Unspents:
                 outputs.append(
                     prepare_output(
                         (
-                            leftover.cash_address(),
+                            leftover,
                             dust_value,
                             "satoshi",
                             category_id,
@@ -308,26 +375,9 @@ class Unspents:
                         )
                     )
                 )
-                amount -= dust_value
+                dust += dust_value
 
-        if len(outputs) == 0:
-            # no tokendata
-            if amount > 0:
-                # add leftover amount
-                outputs.append(
-                    prepare_output((leftover.cash_address(), amount, "satoshi"))
-                )
-        else:
-            if amount < 0:
-                raise InsufficientFunds("Not enough sats")
-            # add leftover amount to last out
-            outputs[-1] = PreparedOutput(
-                outputs[-1].scriptcode,
-                outputs[-1].amount + amount,
-                outputs[-1].cashtokens,
-            )
-
-        return outputs, amount
+        return outputs, dust
 
     def subtract_output(self, output: PreparedOutput) -> None:
         """
@@ -362,6 +412,156 @@ class Unspents:
                 self.tokendata.update({category_id: categorydata})
 
 
+def _add_leftover_amount(
+    outputs: list[PreparedOutput], amount: int, leftover: Address
+) -> tuple[list[PreparedOutput], int]:
+    """
+    Adds the leftover BCH amount to the cashtoken leftover outputs
+
+    :param outputs: Cashtoken leftover outputs, the list is updated in place
+    :param amount: BCH amount left after paying for the cashtoken outputs
+    :param leftover: Leftover address to add the outputs
+    :returns: List of prepared outputs and leftover amount
+    """
+    if len(outputs) == 0:
+        # no tokendata
+        if amount > 0:
+            # add leftover amount
+            outputs.append(prepare_output((leftover, amount, "satoshi")))
+    else:
+        if amount < 0:
+            raise InsufficientFunds("Not enough sats")
+        # add leftover amount to last out
+        outputs[-1] = PreparedOutput(
+            outputs[-1].scriptcode,
+            outputs[-1].amount + amount,
+            outputs[-1].cashtokens,
+        )
+
+    return outputs, amount
+
+
+class UnspentSelection:
+    """
+    Running totals of unspents selected one at a time to fund outputs
+
+    ``get_outputs`` gives the same result as subtracting the outputs from an
+    :class:`Unspents` of the selected unspents and calling its
+    ``get_outputs``, without copying the aggregate for every unspent. The
+    cashtokens left after the outputs are only recomputed when an unspent
+    with cashtokens is added; BCH amounts are checked against the running
+    output totals.
+
+    :param unspents: Unspents already selected
+    :param outputs: Prepared outputs to fund
+    :param leftover: Leftover address to add the outputs
+    """
+
+    def __init__(
+        self,
+        unspents: list[Unspent],
+        outputs: Sequence[PreparedOutput],
+        leftover: Address,
+    ):
+        self.unspents = Unspents(unspents)
+        self.outputs = outputs
+        self.leftover = leftover
+        # cumulative output amounts, as checked by Unspents.subtract_output
+        self._cumulative: list[int] = list(
+            accumulate(output.amount for output in outputs)
+        )
+        self._categories = {
+            output.cashtokens.category_id
+            for output in outputs
+            if output.cashtokens.category_id is not None
+        }
+        # cashtokens left after the outputs, recomputed when they change
+        self._remaining: Optional[Unspents] = None
+        self._token_error: Optional[tuple[int, InsufficientFunds]] = None
+        self._token_outputs: Optional[tuple[list[PreparedOutput], int]] = None
+
+    @property
+    def amount(self) -> int:
+        return self.unspents.amount
+
+    def add_unspent(self, unspent: Unspent) -> None:
+        """
+        Adds unspent
+
+        :param unspent: An instance of Unspent to add
+        """
+        self.unspents.add_unspent(unspent)
+        if unspent.has_cashtoken or (
+            unspent.txindex == 0 and unspent.txid in self._categories
+        ):
+            self._remaining = None
+
+    def _subtract_tokens(self) -> Unspents:
+        """Subtracts the cashtokens of the outputs from a copy of the totals"""
+        remaining = Unspents()
+        # amounts are checked separately with the cumulative output amounts
+        remaining.amount = self._cumulative[-1] if self._cumulative else 0
+        remaining.tokendata = {
+            category_id: tokendata.copy()
+            for category_id, tokendata in self.unspents.tokendata.items()
+        }
+        remaining.genesis_unspent_txid = [
+            txid
+            for txid in self.unspents.genesis_unspent_txid
+            if txid in self._categories
+        ]
+        self._token_error = None
+        self._token_outputs = None
+        for i, output in enumerate(self.outputs):
+            try:
+                remaining.subtract_output(output)
+            except InsufficientFunds as err:
+                self._token_error = (i, err)
+                break
+        return remaining
+
+    def get_outputs(self) -> tuple[list[PreparedOutput], int]:
+        """
+        Return sanitized outputs for the cashtokens and BCH left after paying
+        the outputs
+
+        :returns: List of prepared outputs and leftover amount
+        :raises InsufficientFunds: If the selected unspents cannot pay the
+                                   outputs.
+        """
+        outputs, amount = self.get_token_outputs()
+        return _add_leftover_amount(outputs, amount, self.leftover)
+
+    def get_token_outputs(self) -> tuple[list[PreparedOutput], int]:
+        """
+        Return the outputs for the cashtokens left after paying the outputs,
+        without an output for the leftover BCH
+
+        :returns: List of prepared outputs and leftover amount
+        :raises InsufficientFunds: If the selected unspents cannot pay the
+                                   outputs.
+        """
+        if self._remaining is None:
+            self._remaining = self._subtract_tokens()
+
+        # index of the first output the BCH amount cannot pay
+        short = bisect_right(self._cumulative, self.unspents.amount)
+        if self._token_error is not None:
+            index, err = self._token_error
+            if index < short:
+                raise InsufficientFunds(*err.args)
+        if short < len(self._cumulative):
+            raise InsufficientFunds("Not enough amount")
+
+        if self._token_outputs is None:
+            self._token_outputs = self._remaining._get_token_outputs(self.leftover)
+        token_outputs, dust = self._token_outputs
+        amount = self.unspents.amount - (
+            self._cumulative[-1] if self._cumulative else 0
+        )
+        return list(token_outputs), amount - dust
+
+
 def _subtract_token_amount(categorydata: TokenData, token_amount: int) -> TokenData:
     if categorydata.token_amount is None:
         raise InsufficientFunds("No token amount")
@@ -421,12 +621,9 @@ def _sanitize(categorydata: TokenData) -> TokenData:
 
 def _subtract_immutable_nft(categorydata: TokenData, commitment: Optional[bytes]):
     assert categorydata.nft is not None, "nft data must be present"
-    # find an immutable to send
-    for i, nft in enumerate(categorydata.nft):
-        if nft.capability == NFTCapability.none and nft.commitment == commitment:
-            # found immutable with same commitment
-            categorydata.nft.pop(i)
-            return _sanitize(categorydata)
+    # find an immutable with same commitment to send
+    if categorydata.nft.pop_immutable(commitment) is not None:
+        return _sanitize(categorydata)
 
     raise InsufficientFunds("No immutable nft")
 
@@ -434,11 +631,8 @@ def _subtract_immutable_nft(categorydata: TokenData, commitment: Optional[bytes]
 def _subtract_mutable_nft(categorydata: TokenData) -> TokenData:
     assert categorydata.nft is not None, "nft data must be present"
     # find a mutable to send
-    for i, nft in enumerate(categorydata.nft):
-        if nft.capability == NFTCapability.mutable:
-            # found mutable
-            categorydata.nft.pop(i)
-            return _sanitize(categorydata)
+    if categorydata.nft.pop_capability(NFTCapability.mutable) is not None:
+        return _sanitize(categorydata)
 
     raise InsufficientFunds("No mutable nft")
 
@@ -446,10 +640,8 @@ def _subtract_mutable_nft(categorydata: TokenData) -> TokenData:
 def _subtract_minting_nft(categorydata: TokenData) -> TokenData:
     assert categorydata.nft is not None, "nft data must be present"
     # find a minting to mint
-    for nft in categorydata.nft:
-        if nft.capability == NFTCapability.minting:
-            # found minting
-            return categorydata
+    if categorydata.nft.count(NFTCapability.minting):
+        return categorydata
 
     raise InsufficientFunds("No minting nft")
 
@@ -491,11 +683,12 @@ def select_cashtoken_utxo(
                     categorydata.token_amount or 0
                 ) + token_amount
             if nft_capability is not None:
-                nftdata = NFTData(
-                    capability=nft_capability,
-                    commitment=nft_commitment,
+                categorydata.add_nft(
+                    NFTData(
+                        capability=nft_capability,
+                        commitment=nft_commitment,
+                    )
                 )
-                categorydata.nft = (categorydata.nft or []) + [nftdata]
             tokendata.update({category_id: categorydata})
 
     # add mandatory unspents, for genesis cashtoken
@@ -518,7 +711,7 @@ def select_cashtoken_utxo(
     # small token_amount is spent first, and for nft the order is to spend an
     # immutable if possible, or then spend a mutable with mutation or then
     # finally use a minting token to mint the output nft.
-    unspents_cashtoken = sorted(unspents_cashtoken)
+    unspents_cashtoken = sorted(unspents_cashtoken, key=Unspent.sort_key)
     pop_ids = []
     for i, unspent in enumerate(unspents_cashtoken):
         unspent_used = False
@@ -555,8 +748,8 @@ def select_cashtoken_utxo(
         unspents_cashtoken.pop(id_)
 
     # sort the rest unspents and fund the bch amount
-    # __gt__ and __eq__ will sort them with no cashtoken unspents first
-    unspents = sorted(unspents + unspents_cashtoken)
+    # Unspent.sort_key will sort them with no cashtoken unspents first
+    unspents = sorted(unspents + unspents_cashtoken, key=Unspent.sort_key)
     return unspents, unspents_used
 
 
@@ -573,21 +766,12 @@ def _subtract_nft_output(
         return _sanitize(categorydata), True
     elif unspent.cashtoken.nft_capability == NFTCapability.mutable:
         # pays first mutable, or first immutable
-        for i, nft in enumerate(categorydata.nft):
-            if nft.capability == NFTCapability.mutable:
-                categorydata.nft.pop(i)
-                return _sanitize(categorydata), True
-        else:
-            for i, nft in enumerate(categorydata.nft):
-                if nft.capability == NFTCapability.none:
-                    categorydata.nft.pop(i)
-                    return _sanitize(categorydata), True
+        if (
+            categorydata.nft.pop_capability(NFTCapability.mutable) is not None
+            or categorydata.nft.pop_capability(NFTCapability.none) is not None
+        ):
+            return _sanitize(categorydata), True
     else:  # immutable
-        for i, nft in enumerate(categorydata.nft):
-            if (
-                nft.capability == NFTCapability.none
-                and nft.commitment == unspent.cashtoken.nft_commitment
-            ):
-                categorydata.nft.pop(i)
-                return _sanitize(categorydata), True
+        if categorydata.nft.pop_immutable(unspent.cashtoken.nft_commitment) is not None:
+            return _sanitize(categorydata), True
     return categorydata, False
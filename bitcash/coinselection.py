@@ -0,0 +1,162 @@
+from bisect import bisect_left
+from typing import Optional, Sequence
+
+# Same bound on the search as Bitcoin Core's SelectCoinsBnB
+BNB_MAX_TRIES = 100000
+
+
+def select_branch_and_bound(
+    values: Sequence[int],
+    target: int,
+    window: int,
+    max_tries: int = BNB_MAX_TRIES,
+) -> Optional[list[int]]:
+    """
+    Searches for a set of inputs that pays ``target`` without a change output.
+
+    The search is a depth first search over the values sorted from largest to
+    smallest, like Bitcoin Core's branch and bound. A branch is cut when its
+    total exceeds ``target + window`` or cannot reach ``target`` with the
+    values left. The set with the least excess over ``target`` is returned.
+
+    :param values: Effective value of each input, its amount minus the fee
+                   to spend it. Inputs with no positive value are ignored.
+    :param target: Amount to pay, including the fee of the transaction
+                   without the inputs.
+    :param window: Excess that can be given to the fee instead of creating a
+                   change output.
+    :param max_tries: Number of steps after which the search gives up.
+    :returns: Indices of the selected values, or ``None`` if no set is found.
+    """
+    if target <= 0:
+        return None
+
+    # sorted amount index, largest first for the search
+    order = sorted(
+        (i for i, value in enumerate(values) if value > 0),
+        key=lambda i: values[i],
+        reverse=True,
+    )
+    amounts = [values[i] for i in order]
+    available = sum(amounts)
+    if available < target:
+        return None
+
+    best: Optional[list[int]] = None
+    best_excess = window + 1
+
+    # a single input is found by bisecting the ascending amounts
+    ascending = amounts[::-1]
+    pos = bisect_left(ascending, target)
+    if pos < len(ascending) and ascending[pos] - target <= window:
+        best = [len(amounts) - 1 - pos]
+        best_excess = ascending[pos] - target
+        if best_excess == 0:
+            return [order[i] for i in best]
+
+    selection: list[int] = []
+    total = 0
+    index = 0
+    for _ in range(max_tries):
+        backtrack = False
+        if total + available < target or total > target + window:
+            backtrack = True
+        elif total >= target:
+            if total - target < best_excess:
+                best = list(selection)
+                best_excess = total - target
+                if best_excess == 0:
+                    break
+            backtrack = True
+
+        if backtrack:
+            if not selection:
+                # every branch was searched
+                break
+            # put the values after the last included one back in reach
+            index -= 1
+            while index > selection[-1]:
+                available += amounts[index]
+                index -= 1
+            # continue with the branch excluding it
+            total -= amounts[index]
+            selection.pop()
+        else:
+            amount = amounts[index]
+            available -= amount
+            # including an input with the same value as the excluded
+            # previous one gives a branch that was searched already
+            if (
+                not selection
+                or selection[-1] == index - 1
+                or amount != amounts[index - 1]
+            ):
+                selection.append(index)
+                total += amount
+        index += 1
+
+    if best is None:
+        return None
+    return [order[i] for i in best]
+
+
+def select_knapsack(values: Sequence[int], target: int) -> Optional[list[int]]:
+    """
+    Selects inputs that pay at least ``target`` with little excess.
+
+    A deterministic version of Bitcoin Core's knapsack solver. An exact
+    match is used if there is one. Otherwise the smallest single input
+    larger than ``target`` is compared with a subset of the smaller inputs,
+    picked from the largest down.
+
+    :param values: Effective value of each input. Inputs with no positive
+                   value are ignored.
+    :param target: Amount to pay.
+    :returns: Indices of the selected values, or ``None`` if they cannot pay
+              ``target``.
+    """
+    if target <= 0:
+        return []
+
+    # sorted amount index, smallest first
+    order = sorted(
+        (i for i, value in enumerate(values) if value > 0), key=values.__getitem__
+    )
+    amounts = [values[i] for i in order]
+
+    pos = bisect_left(amounts, target)
+    if pos < len(amounts) and amounts[pos] == target:
+        return [order[pos]]
+    lowest_larger = order[pos] if pos < len(amounts) else None
+
+    smaller_total = sum(amounts[:pos])
+    if smaller_total < target:
+        return None if lowest_larger is None else [lowest_larger]
+    if smaller_total == target:
+        return order[:pos]
+
+    # take the smaller values from the largest down while they stay below
+    # the target, and finish with the value that reaches it with the least
+    # excess
+    subset: list[int] = []
+    total = 0
+    best = (0, 0)
+    best_total = 0
+    for i in range(pos - 1, -1, -1):
+        if total + amounts[i] < target:
+            subset.append(i)
+            total += amounts[i]
+        elif not best_total or total + amounts[i] < best_total:
+            best = (len(subset), i)
+            best_total = total + amounts[i]
+    subset = subset[: best[0]] + [best[1]]
+    total = best_total
+    # drop the inputs that are not needed, largest first
+    for i in list(subset):
+        if total - amounts[i] >= target:
+            subset.remove(i)
+            total -= amounts[i]
+
+    if lowest_larger is not None and amounts[pos] <= total:
+        return [lowest_larger]
+    return [order[i] for i in sorted(subset)]
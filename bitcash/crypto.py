@@ -1,8 +1,24 @@
+import hmac
 from hashlib import new, sha256 as _sha256
+from typing import Generator
+
 from bitcash._ripemd160 import ripemd160
+from bitcash.curve import FIELD_SIZE, GROUP_ORDER
 
 from coincurve import PrivateKey as ECPrivateKey, PublicKey as ECPublicKey
 
+# coincurve takes extra nonce data as a (function, data) pair of cffi
+# pointers, only reachable through its private bindings
+try:
+    from coincurve._libsecp256k1 import ffi as _ffi  # pyright: ignore
+except ImportError:  # pragma: no cover
+    _ffi = None
+
+# RFC 6979 algorithm tag used by Bitcoin Cash Schnorr nonces
+SCHNORR_NONCE_ALGO = b"Schnorr+SHA256  "
+# n - 1, multiplying a private key by it negates it
+NEGATED_ONE = (GROUP_ORDER - 1).to_bytes(32, "big")
+
 
 def sha256(bytestr: bytes) -> bytes:
     return _sha256(bytestr).digest()
@@ -24,3 +40,138 @@ def ripemd160_sha256(bytestr: bytes) -> bytes:
 
 
 hash160 = ripemd160_sha256
+
+
+def ecdsa_sign_low_r(private_key: ECPrivateKey, data: bytes) -> bytes:
+    """Signs data with an ECDSA signature whose R value fits in 32 bytes, so
+    the DER signature is at most 70 bytes long.
+
+    The nonce is ground with an incrementing counter as extra RFC 6979 data,
+    as Bitcoin Core does, so signatures stay deterministic. Fees of low R
+    transactions are computed for these smaller signatures, so there is no
+    fallback to a normal signature.
+
+    :param private_key: The signing key.
+    :param data: The message to sign, hashed with SHA-256.
+    :returns: A DER signature compliant with BIP-62.
+    :raises RuntimeError: If the installed coincurve cannot take extra nonce
+                          data.
+    """
+    if _ffi is None:
+        raise RuntimeError(
+            "Low R signatures need the extra nonce data of coincurve>=5.2.0"
+        )
+
+    signature = private_key.sign(data)
+    counter = 0
+    # DER layout is 0x30 <len> 0x02 <len(R)> <R> 0x02 <len(S)> <S>
+    while signature[3] > 32:
+        counter += 1
+        signature = private_key.sign(
+            data, custom_nonce=(_ffi.NULL, counter.to_bytes(32, "little"))
+        )
+    return signature
+
+
+def _rfc6979_nonces(
+    secret: bytes, msg: bytes, algo: bytes
+) -> Generator[bytes, None, None]:
+    """Yields RFC 6979 HMAC-SHA256 nonce candidates, as libsecp256k1's
+    nonce_function_rfc6979 does for successive counters."""
+    k = b"\x00" * 32
+    v = b"\x01" * 32
+    keydata = secret + msg + algo
+    k = hmac.new(k, v + b"\x00" + keydata, _sha256).digest()
+    v = hmac.new(k, v, _sha256).digest()
+    k = hmac.new(k, v + b"\x01" + keydata, _sha256).digest()
+    v = hmac.new(k, v, _sha256).digest()
+    while True:
+        v = hmac.new(k, v, _sha256).digest()
+        yield v
+        k = hmac.new(k, v + b"\x00", _sha256).digest()
+        v = hmac.new(k, v, _sha256).digest()
+
+
+def _is_square(num: int) -> bool:
+    return pow(num, (FIELD_SIZE - 1) // 2, FIELD_SIZE) == 1
+
+
+def schnorr_sign(secret: bytes, msg: bytes) -> bytes:
+    """Creates a Bitcoin Cash Schnorr signature (2019-05 upgrade).
+
+    The nonce and the private key are only used through libsecp256k1, whose
+    scalar operations are constant-time: ``s = k + e*x`` is computed by
+    tweaking the keys, and ``k`` is negated by multiplying it by ``n - 1``.
+    The nonce is derived with RFC 6979 in Python, and the checks on ``R`` and
+    ``e`` only depend on public values.
+
+    :param secret: The 32 byte private key.
+    :param msg: The 32 byte message hash.
+    :returns: The 64 byte signature ``r || s``.
+    """
+    if len(msg) != 32:
+        raise ValueError("Message hash must be 32 bytes long.")
+
+    private_key = ECPrivateKey(secret)
+    public_key = private_key.public_key.format(compressed=True)
+
+    nonces = _rfc6979_nonces(secret, msg, SCHNORR_NONCE_ALGO)
+    while True:
+        try:
+            k = ECPrivateKey(next(nonces))
+            break
+        except ValueError:
+            # not in [1, n - 1], try the next candidate
+            pass
+
+    R_x, R_y = k.public_key.point()
+    if not _is_square(R_y):
+        k = k.multiply(NEGATED_ONE)
+
+    r = R_x.to_bytes(32, "big")
+    e = int.from_bytes(_sha256(r + public_key + msg).digest(), "big") % GROUP_ORDER
+    if e == 0:  # pragma: no cover
+        s = k
+    else:
+        s = private_key.multiply(e.to_bytes(32, "big")).add(k.secret)
+
+    return r + s.secret
+
+
+def schnorr_verify(signature: bytes, msg: bytes, public_key: bytes) -> bool:
+    """Verifies a Bitcoin Cash Schnorr signature.
+
+    :param signature: The 64 byte signature.
+    :param msg: The 32 byte message hash.
+    :param public_key: The compressed or uncompressed public key.
+    :returns: ``True`` if the signature is valid, ``False`` otherwise.
+    """
+    if len(signature) != 64 or len(msg) != 32:
+        return False
+    r = int.from_bytes(signature[:32], "big")
+    s = int.from_bytes(signature[32:], "big")
+    if r >= FIELD_SIZE or s >= GROUP_ORDER:
+        return False
+
+    point = ECPublicKey(public_key)
+    e = (
+        int.from_bytes(
+            _sha256(signature[:32] + point.format(compressed=True) + msg).digest(),
+            "big",
+        )
+        % GROUP_ORDER
+    )
+
+    # R = sG - eP
+    terms: list[ECPublicKey] = []
+    if s:
+        terms.append(ECPublicKey.from_secret(s.to_bytes(32, "big")))
+    if e:
+        terms.append(point.multiply((GROUP_ORDER - e).to_bytes(32, "big")))
+    try:
+        R_x, R_y = ECPublicKey.combine_keys(terms).point()
+    except ValueError:
+        # R is the point at infinity
+        return False
+
+    return R_x == r and _is_square(R_y)
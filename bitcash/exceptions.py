@@ -24,3 +24,16 @@ class DataNotFound(Exception):
 
 class InvalidCashToken(ValueError):
     pass
+
+
+class BatchError(Exception):
+    """
+    Some requests of a batch failed, such as queries of invalid addresses.
+
+    :param results: The result of each request in order, with the exception
+                    of each failed request in its place.
+    """
+
+    def __init__(self, message: str, results: list):
+        super().__init__(message)
+        self.results = results
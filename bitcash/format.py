@@ -176,8 +176,7 @@ def address_to_cashtokenaddress(address: str) -> str:
         return cash_address.cash_address()
     version = cash_address.version.split("-")
     version.insert(1, "CATKN")
-    cash_address.version = "-".join(version)
-    return cash_address.cash_address()
+    return Address("-".join(version), cash_address.payload).cash_address()
 
 
 def cashtokenaddress_to_address(address: str) -> str:
@@ -192,8 +191,7 @@ def cashtokenaddress_to_address(address: str) -> str:
         return cash_address.cash_address()
     version = cash_address.version.split("-")
     version.pop(1)
-    cash_address.version = "-".join(version)
-    return cash_address.cash_address()
+    return Address("-".join(version), cash_address.payload).cash_address()
 
 
 def hex_to_asm(data: str) -> str:
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from typing import Iterable, Iterator, NamedTuple, Optional, Union
+
+from bitcash.cashtoken import Unspents
+from bitcash.network.meta import Unspent
+from bitcash.types import TokenData
+
+# (txid, txindex) of an unspent
+Outpoint = tuple[str, int]
+
+
+class LedgerDiff(NamedTuple):
+    """
+    Changes applied to an :class:`UnspentLedger`.
+
+    :param added: Unspents that were added.
+    :param spent: Unspents that were removed.
+    :param confirmed: Unspents whose number of confirmations changed.
+    """
+
+    added: list[Unspent]
+    spent: list[Unspent]
+    confirmed: list[Unspent]
+
+
+class UnspentLedger:
+    """
+    The unspents of a wallet, updated with diffs instead of being rebuilt.
+
+    The BCH balance and the cashtoken balance are updated with every added
+    or spent unspent, so the cost of an update is proportional to what
+    changed. Unspents are kept in the order they were added.
+
+    >>> ledger = UnspentLedger(NetworkAPI.get_unspent(address))
+    >>> diff = ledger.sync(NetworkAPI.get_unspent(address))
+    >>> ledger.balance, ledger.cashtoken_balance
+
+    :param unspents: The initial unspents.
+    """
+
+    def __init__(self, unspents: Optional[Iterable[Unspent]] = None):
+        self._unspents: dict[Outpoint, Unspent] = {}
+        self._totals = Unspents()
+        if unspents is not None:
+            self.apply(added=unspents)
+
+    @property
+    def balance(self) -> int:
+        """The BCH balance in satoshi."""
+        return self._totals.amount
+
+    @property
+    def cashtoken_balance(self) -> dict[str, TokenData]:
+        """
+        The cashtoken balance by category id. The dictionary is updated in
+        place by later changes, see :meth:`snapshot` for a copy.
+        """
+        return self._totals.tokendata
+
+    def add(self, unspent: Unspent) -> bool:
+        """
+        Adds an unspent.
+
+        :param unspent: The unspent to add.
+        :returns: Whether the unspent was added. An unspent with the outpoint
+                  of one in the ledger is not added.
+        """
+        outpoint = (unspent.txid, unspent.txindex)
+        if outpoint in self._unspents:
+            return False
+        self._unspents[outpoint] = unspent
+        self._totals.add_unspent(unspent)
+        return True
+
+    def spend(self, txid: str, txindex: int) -> Optional[Unspent]:
+        """
+        Removes a spent unspent.
+
+        :param txid: The txid of the unspent.
+        :param txindex: The output index of the unspent.
+        :returns: The removed unspent, or ``None`` if it was not in the ledger.
+        """
+        unspent = self._unspents.pop((txid, txindex), None)
+        if unspent is not None:
+            self._totals.remove_unspent(unspent)
+        return unspent
+
+    def set_confirmations(self, txid: str, txindex: int, confirmations: int) -> bool:
+        """
+        Updates the number of confirmations of an unspent.
+
+        :returns: Whether the unspent is in the ledger.
+        """
+        unspent = self._unspents.get((txid, txindex))
+        if unspent is None:
+            return False
+        unspent.confirmations = confirmations
+        return True
+
+    def apply(
+        self,
+        added: Iterable[Unspent] = (),
+        spent: Iterable[Union[Outpoint, Unspent]] = (),
+        confirmations: Optional[dict[Outpoint, int]] = None,
+    ) -> LedgerDiff:
+        """
+        Applies a diff.
+
+        :param added: Unspents to add.
+        :param spent: Unspents, or their outpoints, to remove.
+        :param confirmations: New number of confirmations by outpoint.
+        :returns: The changes that were applied.
+        """
+        diff = LedgerDiff([], [], [])
+        for outpoint in spent:
+            if isinstance(outpoint, Unspent):
+                outpoint = (outpoint.txid, outpoint.txindex)
+            unspent = self.spend(*outpoint)
+            if unspent is not None:
+                diff.spent.append(unspent)
+        for unspent in added:
+            if self.add(unspent):
+                diff.added.append(unspent)
+        if confirmations:
+            for outpoint, count in confirmations.items():
+                unspent = self._unspents.get(outpoint)
+                if unspent is not None and unspent.confirmations != count:
+                    unspent.confirmations = count
+                    diff.confirmed.append(unspent)
+        return diff
+
+    def sync(self, unspents: Iterable[Unspent]) -> LedgerDiff:
+        """
+        Updates the ledger to a full list of unspents, such as the result of
+        :meth:`~bitcash.network.NetworkAPI.get_unspent`. Unspents already in
+        the ledger are kept, only their confirmations are updated.
+
+        :param unspents: All the unspents of the wallet.
+        :returns: The changes that were applied.
+        """
+        current: dict[Outpoint, Unspent] = {
+            (unspent.txid, unspent.txindex): unspent for unspent in unspents
+        }
+        known = self._unspents
+        spent = known.keys() - current.keys()
+        added = [
+            unspent for outpoint, unspent in current.items() if outpoint not in known
+        ]
+        confirmations = {
+            outpoint: unspent.confirmations
+            for outpoint, unspent in current.items()
+            if outpoint in known
+            and known[outpoint].confirmations != unspent.confirmations
+        }
+        return self.apply(added, spent, confirmations)
+
+    def get(self, txid: str, txindex: int) -> Optional[Unspent]:
+        return self._unspents.get((txid, txindex))
+
+    def snapshot(self) -> tuple[list[Unspent], int, dict[str, TokenData]]:
+        """
+        :returns: A copy of the unspents, the BCH balance and the cashtoken
+                  balance.
+        """
+        return (
+            list(self._unspents.values()),
+            self._totals.amount,
+            {
+                category_id: tokendata.copy()
+                for category_id, tokendata in self._totals.tokendata.items()
+            },
+        )
+
+    def __iter__(self) -> Iterator[Unspent]:
+        return iter(self._unspents.values())
+
+    def __len__(self) -> int:
+        return len(self._unspents)
+
+    def __contains__(self, item: Union[Outpoint, Unspent]) -> bool:
+        if isinstance(item, Unspent):
+            item = (item.txid, item.txindex)
+        return item in self._unspents
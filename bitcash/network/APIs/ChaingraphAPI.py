@@ -10,7 +10,7 @@ from bitcash.exceptions import (
 from bitcash.network.APIs import BaseAPI, SubscriptionHandle
 from bitcash.network.meta import Unspent
 from bitcash.network.transaction import Transaction, TxPart
-from bitcash.cashaddress import Address
+from bitcash.cashaddress import Address, scripts_to_addresses
 from bitcash.types import NFTCapability, Network, NetworkStr
 
 
@@ -237,39 +237,48 @@ query GetOutputs($lb: _text!, $node: String!) {
             int(response["fee_satoshis"]),
         )
 
-        for part_name in ["inputs", "outputs"]:
-            for txpart in response[part_name]:
-                sats = int(txpart["value_satoshis"])
-                data_hex = txpart[
-                    "{}locking_bytecode".format("un" if part_name == "inputs" else "")
-                ][2:]
-                # switching to outpoint for inputs
-                if part_name == "inputs":
-                    txpart = txpart["outpoint"]
-                try:
-                    scriptcode = bytes.fromhex(txpart["locking_bytecode"][2:])
-                    cashaddress = Address.from_script(
-                        scriptcode, self.network
-                    ).cash_address()
-                except ValueError:
-                    cashaddress = None
-                part = TxPart(cashaddress, sats, data_hex=data_hex)
-                # adding token data
-                token_category = txpart["token_category"]
-                if token_category:
-                    part.category_id = token_category[2:]
-                part.nft_capability = txpart["nonfungible_token_capability"]
-                nft_commitment = txpart["nonfungible_token_commitment"]
-                if nft_commitment:
-                    part.nft_commitment = bytes.fromhex(nft_commitment[2:]) or None
-                token_amount = txpart["fungible_token_amount"]
-                if token_amount:
-                    part.token_amount = int(token_amount) or None
-                # adding to transaction
-                if part_name == "inputs":
-                    tx.add_input(part)
-                else:
-                    tx.add_output(part)
+        parts = [
+            (part_name, txpart)
+            for part_name in ["inputs", "outputs"]
+            for txpart in response[part_name]
+        ]
+        scripts = []
+        for part_name, txpart in parts:
+            # the locking bytecode of an input is in its outpoint
+            if part_name == "inputs":
+                txpart = txpart["outpoint"]
+            try:
+                scripts.append(bytes.fromhex(txpart["locking_bytecode"][2:]))
+            except ValueError:
+                # not a script with an address
+                scripts.append(b"")
+        cashaddresses = scripts_to_addresses(scripts, self.network)
+
+        for (part_name, txpart), cashaddress in zip(parts, cashaddresses):
+            sats = int(txpart["value_satoshis"])
+            data_hex = txpart[
+                "{}locking_bytecode".format("un" if part_name == "inputs" else "")
+            ][2:]
+            # switching to outpoint for inputs
+            if part_name == "inputs":
+                txpart = txpart["outpoint"]
+            part = TxPart(cashaddress, sats, data_hex=data_hex)
+            # adding token data
+            token_category = txpart["token_category"]
+            if token_category:
+                part.category_id = token_category[2:]
+            part.nft_capability = txpart["nonfungible_token_capability"]
+            nft_commitment = txpart["nonfungible_token_commitment"]
+            if nft_commitment:
+                part.nft_commitment = bytes.fromhex(nft_commitment[2:]) or None
+            token_amount = txpart["fungible_token_amount"]
+            if token_amount:
+                part.token_amount = int(token_amount) or None
+            # adding to transaction
+            if part_name == "inputs":
+                tx.add_input(part)
+            else:
+                tx.add_output(part)
 
         return tx
 
@@ -520,16 +529,17 @@ query GetTransactionDetails($tx: bytea!, $node: String!) {
         json = self.send_request(
             {"query": query, "variables": variables}, *args, **kwargs
         )
-        addresses: set[str] = set()
+        scripts = []
         for output in json["data"]["output"]:
             try:
-                scriptcode = bytes.fromhex(output["locking_bytecode"][2:])
-                addresses.add(
-                    Address.from_script(scriptcode, self.network).cash_address()
-                )
+                scripts.append(bytes.fromhex(output["locking_bytecode"][2:]))
             except ValueError:
                 pass
-        return addresses
+        return {
+            address
+            for address in scripts_to_addresses(scripts, self.network)
+            if address is not None
+        }
 
     def broadcast_tx(self, tx_hex: str, *args, **kwargs) -> bool:  # pragma: no cover
         json_request = {
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import itertools
 import json
+import logging
 import socket
 import ssl
+from concurrent.futures import Future, wait
 from decimal import Decimal
 import threading
+import time
 import typing
 from requests.exceptions import ConnectTimeout, ContentDecodingError
-from typing import Any, Callable, Optional, Union
+from typing import Any, Callable, Iterator, Optional, Union
 
 from bitcash.exceptions import (
+    BatchError,
     InvalidEndpointURLProvided,
     InvalidEndpointResponse,
     DataNotFound,
@@ -23,11 +28,87 @@ from bitcash.types import NFTCapability, Network, NetworkStr
 context = ssl.create_default_context()
 FULCRUM_PROTOCOL = "1.5.0"
 DEFAULT_SOCKET_TIMEOUT = 5.0
+# bytes received from the socket at a time
+DEFAULT_RECV_SIZE = 65536
+# requests in a JSON-RPC batch array, Fulcrum rejects more than 345 by default
+DEFAULT_BATCH_SIZE = 300
+# connections to one server shared by the FulcrumProtocolAPI instances
+DEFAULT_POOL_SIZE = 4
+# seconds before an unused connection is closed
+DEFAULT_IDLE_TIMEOUT = 300.0
+# seconds before an unused connection is pinged before it is used again
+DEFAULT_PING_INTERVAL = 30.0
+# seconds to wait before connecting again after a failed handshake, doubled
+# after every failure up to MAX_RECONNECT_BACKOFF
+RECONNECT_BACKOFF = 0.5
+MAX_RECONNECT_BACKOFF = 30.0
+# addresses subscribed on one connection before another one is opened
+DEFAULT_SUBSCRIPTIONS_PER_CONNECTION = 20000
 
 BCH_TO_SAT_MULTIPLIER = 100000000
 # TODO: Refactor constant above into a 'constants.py' file
 
 
+class LineReader:
+    """
+    Reads newline framed messages from a socket.
+
+    Received data is appended to one buffer and each complete line is
+    decoded from it in place. The lines read are dropped from the buffer
+    once they make up half of it, so reading large responses, or several
+    messages received at once, takes linear time.
+
+    :param sock: The socket to read from.
+    :param recv_size: Maximum number of bytes to receive at a time.
+    """
+
+    def __init__(
+        self,
+        sock: Union[socket.socket, ssl.SSLSocket],
+        recv_size: int = DEFAULT_RECV_SIZE,
+    ):
+        self.sock = sock
+        self.recv_size = recv_size
+        self._buffer = bytearray()
+        # start of the next line, and the end of the data without a newline
+        self._start = 0
+        self._scanned = 0
+        # time.monotonic() of the last data received
+        self.last_received = time.monotonic()
+
+    def readline(self) -> Optional[str]:
+        """
+        Waits for the next complete line.
+
+        :returns: The line without the newline, or ``None`` if the socket
+                  closed.
+        """
+        end = self._buffer.find(b"\n", self._scanned)
+        while end == -1:
+            self._scanned = len(self._buffer)
+            data = self.sock.recv(self.recv_size)
+            if not data:
+                return None
+            self.last_received = time.monotonic()
+            self._buffer += data
+            end = self._buffer.find(b"\n", self._scanned)
+        with memoryview(self._buffer) as view, view[self._start : end] as line:
+            text = str(line, "utf-8")
+        self._start = self._scanned = end + 1
+        if 2 * self._start >= len(self._buffer):
+            del self._buffer[: self._start]
+            self._start = self._scanned = 0
+        return text
+
+    def __iter__(self) -> Iterator[str]:
+        """Yields the lines until the socket closes."""
+        while True:
+            line = self.readline()
+            if line is None:
+                return
+            yield line
+
+
 def handshake(
     hostname: str, port: int, timeout: float = DEFAULT_SOCKET_TIMEOUT
 ) -> Union[socket.socket, ssl.SSLSocket]:
@@ -69,16 +150,15 @@ def send_json_rpc_payload(
     }
     payload_bytes = json.dumps(payload).encode() + b"\n"
     sock.sendall(payload_bytes)  # will raise ssl.SSLZeroReturnError if SSL closes
-    data = b""
-    while True:
-        data += sock.recv(4096)
-        # if sock timed out and data is b""
-        # or the message completed and has endline char
-        if not data or data.endswith(b"\n"):
+    for line in LineReader(sock):
+        if not line.strip():
+            continue
+        return_json = json.loads(line, parse_float=Decimal)
+        # skip notifications received before the response
+        if "method" not in return_json:
             break
-    if data == b"":
+    else:
         raise ConnectTimeout("TLS/SSL connection has been closed (EOF)")
-    return_json = json.loads(data.decode(), parse_float=Decimal)
     if return_json["jsonrpc"] != "2.0" or return_json["id"] != "bitcash":
         raise ContentDecodingError(
             f"Returned json {return_json} is not valid json rpc 2.0"
@@ -90,12 +170,697 @@ def send_json_rpc_payload(
     return return_json["result"]
 
 
+class JsonRpcConnection:
+    """
+    JSON-RPC 2.0 requests multiplexed over one socket.
+
+    Every request gets a unique id and a future. A reader thread reads the
+    responses as they arrive and resolves the future with the same id, so
+    many threads can have requests in flight on the same connection.
+    Messages without id, such as subscription notifications, are passed to
+    ``on_notification``.
+
+    :param sock: A connected socket, after :func:`handshake`.
+    :param on_notification: Called with the method and the params of each
+                            notification, from the reader thread.
+    :param recv_size: Maximum number of bytes to receive at a time.
+    :param on_close: Called with the connection and the error that closed
+                     it once the reader thread stops.
+    """
+
+    def __init__(
+        self,
+        sock: Union[socket.socket, ssl.SSLSocket],
+        on_notification: Optional[Callable[[str, Any], None]] = None,
+        recv_size: int = DEFAULT_RECV_SIZE,
+        on_close: Optional[Callable[[JsonRpcConnection, Exception], None]] = None,
+    ):
+        self.sock = sock
+        self.on_notification = on_notification
+        self.on_close = on_close
+        self._lines = LineReader(sock, recv_size)
+        self._ids = itertools.count()
+        self._pending: dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._closed = False
+        # responses can take any time, each request has its own timeout
+        sock.settimeout(None)
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests waiting for their response."""
+        return len(self._pending)
+
+    def request(self, method: str, params: list[Any]) -> Future:
+        """
+        Sends a request without waiting for the response.
+
+        :returns: A future of the result of the request. It raises
+                  :class:`~bitcash.exceptions.InvalidEndpointResponse` for an
+                  error response, and ``ConnectTimeout`` if the connection
+                  closes first.
+        :raises ConnectTimeout: If the connection is closed.
+        """
+        return self._send([(method, params)])[0][1]
+
+    def request_batch(self, calls: list[tuple[str, list[Any]]]) -> list[Future]:
+        """
+        Sends several requests in one JSON-RPC batch array without waiting
+        for the responses.
+
+        :param calls: The method and the params of each request.
+        :returns: A future of the result of each request, in order.
+        :raises ConnectTimeout: If the connection is closed.
+        """
+        if not calls:
+            return []
+        return [future for _, future in self._send(calls, batch=True)]
+
+    def call(
+        self, method: str, params: list[Any], timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Sends a request and waits for its result.
+
+        :param timeout: Seconds to wait for the response without receiving
+                        any data, see :meth:`wait`.
+        :raises TimeoutError: If nothing is received within ``timeout``.
+        """
+        request_id, future = self._send([(method, params)])[0]
+        if not self.wait([future], timeout):
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            raise TimeoutError(f"No response to {method} within {timeout} seconds")
+        return future.result()
+
+    def call_batch(
+        self,
+        calls: list[tuple[str, list[Any]]],
+        timeout: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """
+        Sends requests in batch arrays and waits for their results. All the
+        batches are sent before waiting, so they take one round trip. An error
+        response fails its own request only.
+
+        :param calls: The method and the params of each request.
+        :param timeout: Seconds to wait for each batch of responses without
+                        receiving any data, see :meth:`wait`.
+        :param batch_size: Maximum number of requests in a batch array, all
+                           of them if ``None``.
+        :param return_exceptions: Whether to return the
+                                  :class:`~bitcash.exceptions.InvalidEndpointResponse`
+                                  of a request with an error response in
+                                  place of its result.
+        :returns: The result of each request, in order.
+        :raises TimeoutError: If a batch has no response within ``timeout``.
+        :raises ConnectTimeout: If the connection closes first.
+        :raises BatchError: If some requests return an error and not
+                            ``return_exceptions``, with the results of the
+                            others.
+        """
+        batch_size = batch_size or max(len(calls), 1)
+        requests: list[tuple[int, Future]] = []
+        try:
+            for i in range(0, len(calls), batch_size):
+                requests += self._send(calls[i : i + batch_size], batch=True)
+            for i in range(0, len(requests), batch_size):
+                futures = [future for _, future in requests[i : i + batch_size]]
+                if not self.wait(futures, timeout):
+                    raise TimeoutError(
+                        f"No response to a batch of {len(futures)} requests"
+                        f" within {timeout} seconds"
+                    )
+        finally:
+            with self._pending_lock:
+                for request_id, _ in requests:
+                    self._pending.pop(request_id, None)
+        results = []
+        for _, future in requests:
+            error = future.exception()
+            if error is None:
+                results.append(future.result())
+            elif isinstance(error, InvalidEndpointResponse):
+                results.append(error)
+            else:
+                # the connection failed, not the request
+                raise error
+        failed = sum(isinstance(result, Exception) for result in results)
+        if failed and not return_exceptions:
+            raise BatchError(f"{failed} of {len(results)} requests failed", results)
+        return results
+
+    def wait(self, futures: list[Future], timeout: Optional[float] = None) -> bool:
+        """
+        Waits for the futures of requests on this connection. Like a socket
+        timeout, the timeout restarts whenever data is received, so a large
+        response that keeps arriving is not cut off. Data of any message on
+        the connection counts.
+
+        :param futures: The futures to wait for.
+        :param timeout: Seconds to wait without receiving any data, or
+                        ``None`` to wait forever.
+        :returns: Whether all the futures are done.
+        """
+        if timeout is None:
+            wait(futures)
+            return True
+        started = time.monotonic()
+        remaining = timeout
+        while True:
+            _, not_done = wait(futures, remaining)
+            if not not_done:
+                return True
+            last = max(started, self._lines.last_received)
+            remaining = last + timeout - time.monotonic()
+            if remaining <= 0:
+                return False
+
+    def _send(
+        self, calls: list[tuple[str, list[Any]]], batch: bool = False
+    ) -> list[tuple[int, Future]]:
+        requests: list[tuple[int, Future]] = []
+        with self._pending_lock:
+            if self._closed:
+                raise ConnectTimeout("TLS/SSL connection has been closed (EOF)")
+            for _ in calls:
+                future: Future = Future()
+                request_id = next(self._ids)
+                self._pending[request_id] = future
+                requests.append((request_id, future))
+        payloads = [
+            {
+                "method": method,
+                "params": params,
+                "jsonrpc": "2.0",
+                "id": request_id,
+            }
+            for (method, params), (request_id, _) in zip(calls, requests)
+        ]
+        try:
+            with self._send_lock:
+                self.sock.sendall(
+                    json.dumps(payloads if batch else payloads[0]).encode() + b"\n"
+                )
+        except OSError as e:
+            with self._pending_lock:
+                for request_id, _ in requests:
+                    self._pending.pop(request_id, None)
+            self.close()
+            raise ConnectTimeout(f"TLS/SSL connection has been closed: {e}")
+        return requests
+
+    def close(self) -> None:
+        """Closes the socket and fails the requests in flight."""
+        with self._pending_lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def _read(self) -> None:
+        error: Exception = ConnectTimeout("TLS/SSL connection has been closed (EOF)")
+        try:
+            for line in self._lines:
+                if not line.strip():
+                    continue
+                message = json.loads(line, parse_float=Decimal)
+                # a batch is answered with an array of responses
+                for item in message if isinstance(message, list) else [message]:
+                    self._dispatch(item)
+        except (OSError, ValueError) as e:
+            error = e
+        finally:
+            self.close()
+            with self._pending_lock:
+                pending = list(self._pending.values())
+                self._pending.clear()
+            for future in pending:
+                if not future.done():
+                    future.set_exception(
+                        ConnectTimeout("TLS/SSL connection has been closed (EOF)")
+                    )
+            if self.on_close is not None:
+                self.on_close(self, error)
+
+    def _dispatch(self, message: dict[str, Any]) -> None:
+        if "id" not in message or message["id"] is None:
+            if "method" in message and self.on_notification is not None:
+                self.on_notification(message["method"], message.get("params"))
+            return
+        with self._pending_lock:
+            future = self._pending.pop(message["id"], None)
+        if future is None:
+            # the request timed out
+            return
+        if message.get("jsonrpc") != "2.0":
+            future.set_exception(
+                ContentDecodingError(
+                    f"Returned json {message} is not valid json rpc 2.0"
+                )
+            )
+        elif "error" in message:
+            future.set_exception(
+                InvalidEndpointResponse(f"Error in returned json: {message['error']}")
+            )
+        else:
+            future.set_result(message.get("result"))
+
+
+class ConnectionPool:
+    """
+    Handshaken connections to one Fulcrum server, shared between threads.
+
+    Requests go to the connection with the fewest requests in flight. A new
+    connection is opened only when every connection is busy and the pool is
+    not full. Connections unused for ``ping_interval`` are checked with
+    ``server.ping`` before they are used again, and connections unused for
+    ``idle_timeout`` are closed. After a failed handshake, the pool waits
+    before connecting again, twice as long after every failure.
+
+    :param hostname: The hostname of the server.
+    :param port: The port of the server.
+    :param timeout: Socket timeout in seconds.
+    :param size: Maximum number of connections.
+    :param idle_timeout: Seconds after which an unused connection is closed.
+    :param ping_interval: Seconds after which an unused connection is pinged
+                          before it is used again.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        timeout: float = DEFAULT_SOCKET_TIMEOUT,
+        size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        ping_interval: float = DEFAULT_PING_INTERVAL,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.timeout = timeout
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        # connections and the time they were last used
+        self._connections: dict[JsonRpcConnection, float] = {}
+        self._connecting = 0
+        self._failures = 0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> JsonRpcConnection:
+        """
+        :returns: A connection to send requests on.
+        :raises ConnectTimeout: If the pool is waiting to connect again after
+                                a failed handshake.
+        """
+        while True:
+            connection, last_used = self._select()
+            if connection is None:
+                return self._connect()
+            if time.monotonic() - last_used < self.ping_interval or self._ping(
+                connection
+            ):
+                return connection
+            self.discard(connection)
+
+    def _select(self) -> tuple[Optional[JsonRpcConnection], float]:
+        with self._lock:
+            now = time.monotonic()
+            for connection, last_used in list(self._connections.items()):
+                if connection.closed or (
+                    not connection.in_flight and now - last_used >= self.idle_timeout
+                ):
+                    del self._connections[connection]
+                    connection.close()
+            connection = min(self._connections, key=lambda c: c.in_flight, default=None)
+            full = len(self._connections) + self._connecting >= self.size
+            if connection is not None and (
+                not connection.in_flight or full or now < self._retry_at
+            ):
+                last_used = self._connections[connection]
+                self._connections[connection] = now
+                return connection, last_used
+            if now < self._retry_at:
+                raise ConnectTimeout(
+                    f"Connecting to {self.hostname}:{self.port} again in"
+                    f" {self._retry_at - now:.1f} seconds"
+                )
+            self._connecting += 1
+            return None, now
+
+    def _connect(self) -> JsonRpcConnection:
+        try:
+            connection = JsonRpcConnection(
+                handshake(self.hostname, self.port, self.timeout)
+            )
+        except Exception:
+            with self._lock:
+                self._connecting -= 1
+                self._failures += 1
+                backoff = RECONNECT_BACKOFF * 2 ** (self._failures - 1)
+                self._retry_at = time.monotonic() + min(backoff, MAX_RECONNECT_BACKOFF)
+            raise
+        with self._lock:
+            self._connecting -= 1
+            self._failures = 0
+            self._retry_at = 0.0
+            self._connections[connection] = time.monotonic()
+        return connection
+
+    def _ping(self, connection: JsonRpcConnection) -> bool:
+        try:
+            connection.call("server.ping", [], self.timeout)
+        except (
+            ConnectTimeout,
+            ContentDecodingError,
+            InvalidEndpointResponse,
+            TimeoutError,
+        ):
+            return False
+        return True
+
+    def discard(self, connection: JsonRpcConnection) -> None:
+        """Closes a connection and removes it from the pool."""
+        with self._lock:
+            self._connections.pop(connection, None)
+        connection.close()
+
+    def close(self) -> None:
+        """Closes all the connections."""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for connection in connections:
+            connection.close()
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+
+# connection pools by hostname and port
+_pools: dict[tuple[str, int], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(
+    hostname: str, port: int, timeout: float = DEFAULT_SOCKET_TIMEOUT
+) -> ConnectionPool:
+    """
+    Gets the connection pool shared by the :class:`FulcrumProtocolAPI`
+    instances of an endpoint, created on first use. Its settings, such as
+    ``size``, can be changed on the returned pool.
+
+    :param hostname: The hostname of the server.
+    :param port: The port of the server.
+    :param timeout: Socket timeout in seconds of a new pool.
+    """
+    with _pools_lock:
+        pool = _pools.get((hostname, port))
+        if pool is None:
+            pool = _pools[(hostname, port)] = ConnectionPool(hostname, port, timeout)
+        return pool
+
+
+class SubscriptionManager:
+    """
+    Address subscriptions multiplexed over a few connections to one server.
+
+    Each address is subscribed once with ``blockchain.address.subscribe`` on
+    the newest connection, until it holds ``max_per_connection`` addresses.
+    The reader thread of each connection passes the notifications to the
+    callbacks of the address, so thousands of addresses take a few sockets
+    and threads. If a connection closes, the callbacks of its addresses get
+    an ``"error: <message>"`` status and the addresses are no longer
+    subscribed.
+
+    :param hostname: The hostname of the server.
+    :param port: The port of the server.
+    :param timeout: Socket timeout in seconds of the handshake.
+    :param max_per_connection: Maximum number of addresses subscribed on one
+                               connection.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        timeout: float = DEFAULT_SOCKET_TIMEOUT,
+        max_per_connection: int = DEFAULT_SUBSCRIPTIONS_PER_CONNECTION,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.timeout = timeout
+        self.max_per_connection = max_per_connection
+        # callbacks of each address by subscription token
+        self._callbacks: dict[str, dict[int, Callable[[str, str | None], None]]] = {}
+        # last status of each address, once the server returned it
+        self._statuses: dict[str, Optional[str]] = {}
+        self._connection_of: dict[str, JsonRpcConnection] = {}
+        self._addresses: dict[JsonRpcConnection, set[str]] = {}
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self, address: str, callback: Callable[[str, str | None], None]
+    ) -> SubscriptionHandle:
+        """
+        Subscribes to an address. The callback is called with the current
+        status once the server returns it, then with every new status.
+
+        :param address: Address to subscribe to.
+        :param callback: Function to call with (address, status_hash) on
+                         update, from a reader thread.
+        :returns: A SubscriptionHandle to remove the callback.
+
+        Note: connection errors during handshake propagate directly to the
+        caller.
+        """
+        token = next(self._tokens)
+        handle = SubscriptionHandle(lambda: self._unsubscribe(address, token))
+        connection = opened = None
+        known, status = False, None
+        while True:
+            with self._lock:
+                callbacks = self._callbacks.get(address)
+                if callbacks is not None:
+                    # already subscribed, share the status of the address
+                    callbacks[token] = callback
+                    known = address in self._statuses
+                    status = self._statuses.get(address)
+                    break
+                connection = self._get_connection()
+                if connection is None and opened is not None:
+                    connection, opened = opened, None
+                    self._addresses[connection] = set()
+                if connection is not None:
+                    self._callbacks[address] = {token: callback}
+                    self._connection_of[address] = connection
+                    self._addresses[connection].add(address)
+                    break
+            # handshake without the lock, so the other addresses are not
+            # blocked while connecting
+            opened = JsonRpcConnection(
+                handshake(self.hostname, self.port, self.timeout),
+                on_notification=self._notify,
+                on_close=self._closed,
+            )
+        if opened is not None:
+            # another thread opened a connection in the meantime
+            opened.close()
+        if connection is None:
+            if known:
+                self._call(callback, address, status)
+            return handle
+
+        try:
+            future = connection.request("blockchain.address.subscribe", [address])
+        except ConnectTimeout as e:
+            self._fail(connection, [address], e)
+            return handle
+        future.add_done_callback(
+            lambda future: self._subscribed(connection, address, future)
+        )
+        return handle
+
+    def _get_connection(self) -> Optional[JsonRpcConnection]:
+        # called with the lock held, the newest connection if it is not full
+        if self._addresses:
+            connection, addresses = next(reversed(self._addresses.items()))
+            if not connection.closed and len(addresses) < self.max_per_connection:
+                return connection
+        return None
+
+    def _subscribed(
+        self, connection: JsonRpcConnection, address: str, future: Future
+    ) -> None:
+        error = future.exception()
+        if error is not None:
+            self._fail(connection, [address], error)
+            return
+        status = future.result()
+        with self._lock:
+            if self._connection_of.get(address) is not connection:
+                # unsubscribed in the meantime
+                return
+            self._statuses[address] = status
+            callbacks = list(self._callbacks[address].values())
+        for callback in callbacks:
+            self._call(callback, address, status)
+
+    def _notify(self, method: str, params: Any) -> None:
+        if method != "blockchain.address.subscribe":
+            return
+        address, status = params
+        with self._lock:
+            if address not in self._callbacks:
+                return
+            self._statuses[address] = status
+            callbacks = list(self._callbacks[address].values())
+        for callback in callbacks:
+            self._call(callback, address, status)
+
+    def _closed(self, connection: JsonRpcConnection, error: Exception) -> None:
+        with self._lock:
+            addresses = self._addresses.pop(connection, set())
+        self._fail(connection, addresses, error)
+
+    def _fail(
+        self,
+        connection: JsonRpcConnection,
+        addresses: typing.Iterable[str],
+        error: BaseException,
+    ) -> None:
+        failed = []
+        with self._lock:
+            for address in list(addresses):
+                if self._connection_of.get(address) is not connection:
+                    continue
+                failed.append((address, self._remove(address)))
+        for address, callbacks in failed:
+            for callback in callbacks:
+                self._call(callback, address, f"error: {error}")
+
+    def _remove(self, address: str) -> list[Callable[[str, str | None], None]]:
+        # called with the lock held
+        connection = self._connection_of.pop(address)
+        self._addresses.get(connection, set()).discard(address)
+        self._statuses.pop(address, None)
+        return list(self._callbacks.pop(address).values())
+
+    def _unsubscribe(self, address: str, token: int) -> None:
+        connection = None
+        with self._lock:
+            callbacks = self._callbacks.get(address)
+            if callbacks is None or token not in callbacks:
+                # the subscription failed or was removed already
+                return
+            callback = callbacks.pop(token)
+            if not callbacks:
+                connection = self._connection_of[address]
+                self._remove(address)
+                if self._addresses.get(connection) == set():
+                    # no more addresses, close the connection
+                    del self._addresses[connection]
+                    connection.close()
+                    connection = None
+        if connection is not None:
+            try:
+                connection.request("blockchain.address.unsubscribe", [address])
+            except ConnectTimeout:
+                pass
+        self._call(callback, address, "unsubscribed")
+
+    @staticmethod
+    def _call(
+        callback: Callable[[str, str | None], None],
+        address: str,
+        status: Optional[str],
+    ) -> None:
+        # an error in a callback must not stop the reader thread shared by
+        # the other addresses
+        try:
+            callback(address, status)
+        except Exception:
+            logging.exception(f"Subscription callback failed for {address}")
+
+    def close(self) -> None:
+        """
+        Closes all the connections. The callbacks get an ``"unsubscribed"``
+        status.
+        """
+        with self._lock:
+            removed = [
+                (address, self._remove(address)) for address in list(self._callbacks)
+            ]
+            connections = list(self._addresses)
+            self._addresses.clear()
+        for connection in connections:
+            connection.close()
+        for address, callbacks in removed:
+            for callback in callbacks:
+                self._call(callback, address, "unsubscribed")
+
+    def __len__(self) -> int:
+        return len(self._callbacks)
+
+
+# subscription managers by hostname and port
+_subscription_managers: dict[tuple[str, int], SubscriptionManager] = {}
+_subscription_managers_lock = threading.Lock()
+
+
+def get_subscription_manager(
+    hostname: str, port: int, timeout: float = DEFAULT_SOCKET_TIMEOUT
+) -> SubscriptionManager:
+    """
+    Gets the subscription manager shared by the :class:`FulcrumProtocolAPI`
+    instances of an endpoint, created on first use.
+
+    :param hostname: The hostname of the server.
+    :param port: The port of the server.
+    :param timeout: Socket timeout in seconds of a new manager.
+    """
+    with _subscription_managers_lock:
+        manager = _subscription_managers.get((hostname, port))
+        if manager is None:
+            manager = _subscription_managers[(hostname, port)] = SubscriptionManager(
+                hostname, port, timeout
+            )
+        return manager
+
+
 class FulcrumProtocolAPI(BaseAPI):
     """Fulcrum Protocol API
     Documentation at: https://electrum-cash-protocol.readthedocs.io/en/latest/index.html
 
     :param network_endpoint: The url for the network endpoint
     :param timeout: Socket timeout in seconds.
+    :param batch_size: Maximum number of requests in a JSON-RPC batch array
+                       sent by the batch methods.
+    :param pool: The connections to use, by default the pool shared by the
+                 instances with the same endpoint, see
+                 :func:`get_connection_pool`.
+    :param subscriptions: The address subscriptions, by default the manager
+                          shared by the instances with the same endpoint, see
+                          :func:`get_subscription_manager`.
     """
 
     # Default endpoints to use for this interface
@@ -116,6 +881,9 @@ class FulcrumProtocolAPI(BaseAPI):
         network_endpoint: str,
         timeout: float = DEFAULT_SOCKET_TIMEOUT,
         network: Network = Network.main,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        pool: Optional[ConnectionPool] = None,
+        subscriptions: Optional[SubscriptionManager] = None,
     ):
         try:
             assert isinstance(network_endpoint, str)
@@ -136,19 +904,72 @@ class FulcrumProtocolAPI(BaseAPI):
 
         self.timeout = timeout
         self.network = network
-        self.sock: Union[None, socket.socket, ssl.SSLSocket] = None
-        self._sock_lock = threading.Lock()
+        self.batch_size = batch_size
+        if pool is None:
+            pool = get_connection_pool(self.hostname, self.port, timeout)
+        self.pool = pool
+        if subscriptions is None:
+            subscriptions = get_subscription_manager(self.hostname, self.port, timeout)
+        self.subscriptions = subscriptions
 
     def _send_rpc(self, method: str, params: list[Any], *args, **kwargs) -> Any:
-        """Send JSON-RPC with lock - ensures send+receive is atomic."""
-        with self._sock_lock:
-            if self.sock is None:
-                self.sock = handshake(self.hostname, self.port, self.timeout)
-            try:
-                return send_json_rpc_payload(self.sock, method, params, *args, **kwargs)
-            except ConnectTimeout:
-                self.sock = handshake(self.hostname, self.port, self.timeout)
-                return send_json_rpc_payload(self.sock, method, params, *args, **kwargs)
+        """
+        Send JSON-RPC on a pooled connection. Requests from several threads
+        are in flight at the same time.
+        """
+        connection = self.pool.get()
+        try:
+            return connection.call(method, params, self.timeout)
+        except ConnectTimeout:
+            # the connection closed, retry once on another one
+            self.pool.discard(connection)
+            return self.pool.get().call(method, params, self.timeout)
+
+    def _send_rpc_batch(
+        self, method: str, params: list[list[Any]], *args, **kwargs
+    ) -> list[Any]:
+        """
+        Send one JSON-RPC request per params in batch arrays of
+        ``batch_size`` on a pooled connection, in one round trip. The
+        requests with an error response return their
+        :class:`~bitcash.exceptions.InvalidEndpointResponse`.
+        """
+        calls = [(method, call_params) for call_params in params]
+        connection = self.pool.get()
+        try:
+            return connection.call_batch(
+                calls, self.timeout, self.batch_size, return_exceptions=True
+            )
+        except ConnectTimeout:
+            # the connection closed, retry once on another one
+            self.pool.discard(connection)
+            return self.pool.get().call_batch(
+                calls, self.timeout, self.batch_size, return_exceptions=True
+            )
+
+    @staticmethod
+    def _map_batch(
+        func: Callable[..., Any], results: list[Any], *iterables: list[Any]
+    ) -> list[Any]:
+        """
+        Parses the results of :meth:`_send_rpc_batch` like :func:`map`,
+        skipping the failed requests.
+
+        :raises BatchError: If some requests failed, with the parsed results
+                            of the others.
+        """
+        parsed = [
+            result if isinstance(result, Exception) else func(result, *args)
+            for result, *args in zip(results, *iterables)
+        ]
+        failed = sum(isinstance(result, Exception) for result in parsed)
+        if failed:
+            raise BatchError(f"{failed} of {len(parsed)} requests failed", parsed)
+        return parsed
+
+    def close(self) -> None:
+        """Closes the connections of the pool."""
+        self.pool.close()
 
     @classmethod
     def get_default_endpoints(cls, network: NetworkStr) -> list[str]:
@@ -164,10 +985,36 @@ class FulcrumProtocolAPI(BaseAPI):
         )
         return result["confirmed"] + result["unconfirmed"]
 
+    def get_balance_batch(self, addresses: list[str], *args, **kwargs) -> list[int]:
+        results = self._send_rpc_batch(
+            "blockchain.address.get_balance",
+            [[address] for address in addresses],
+            *args,
+            **kwargs,
+        )
+        return self._map_batch(
+            lambda result: result["confirmed"] + result["unconfirmed"], results
+        )
+
     def get_transactions(self, address: str, *args, **kwargs) -> list[str]:
         result = self._send_rpc(
             "blockchain.address.get_history", [address], *args, **kwargs
         )
+        return self._sort_history(result)
+
+    def get_transactions_batch(
+        self, addresses: list[str], *args, **kwargs
+    ) -> list[list[str]]:
+        results = self._send_rpc_batch(
+            "blockchain.address.get_history",
+            [[address] for address in addresses],
+            *args,
+            **kwargs,
+        )
+        return self._map_batch(self._sort_history, results)
+
+    @staticmethod
+    def _sort_history(result: list[dict[str, Any]]) -> list[str]:
         transactions = [(tx["tx_hash"], tx["height"]) for tx in result]
         # sort by block height
         transactions.sort(key=lambda x: x[1])
@@ -271,7 +1118,29 @@ class FulcrumProtocolAPI(BaseAPI):
         result = self._send_rpc(
             "blockchain.address.listunspent", [address], *args, **kwargs
         )
+        return self._parse_unspents(result, address, self.get_blockheight())
+
+    def get_unspent_batch(
+        self, addresses: list[str], *args, **kwargs
+    ) -> list[list[Unspent]]:
+        results = self._send_rpc_batch(
+            "blockchain.address.listunspent",
+            [[address] for address in addresses],
+            *args,
+            **kwargs,
+        )
         blockheight = self.get_blockheight()
+        return self._map_batch(
+            lambda result, address: self._parse_unspents(result, address, blockheight),
+            results,
+            addresses,
+        )
+
+    @staticmethod
+    def _parse_unspents(
+        result: list[dict[str, Any]], address: str, blockheight: int
+    ) -> list[Unspent]:
+        script = Address.from_string(address).scriptcode.hex()
         unspents = []
         for utxo in result:
             confirmations = (
@@ -292,7 +1161,7 @@ class FulcrumProtocolAPI(BaseAPI):
                 Unspent(
                     int(utxo["value"]),
                     confirmations,
-                    Address.from_string(address).scriptcode.hex(),
+                    script,
                     utxo["tx_hash"],
                     utxo["tx_pos"],
                     token_category,
@@ -309,6 +1178,17 @@ class FulcrumProtocolAPI(BaseAPI):
         )
         return typing.cast(dict[str, Any], result)
 
+    def get_raw_transaction_batch(
+        self, txids: list[str], *args, **kwargs
+    ) -> list[dict[str, Any]]:
+        results = self._send_rpc_batch(
+            "blockchain.transaction.get",
+            [[txid, True] for txid in txids],
+            *args,
+            **kwargs,
+        )
+        return self._map_batch(lambda result: result, results)
+
     def get_cashtoken_addresses(
         self,
         category_id: str,
@@ -335,62 +1215,9 @@ class FulcrumProtocolAPI(BaseAPI):
         :param callback: Function to call with (address, status_hash) on update.
         :return: A SubscriptionHandle object for managing the subscription.
 
+        The subscriptions of all addresses share the connections of
+        ``self.subscriptions``, see :class:`SubscriptionManager`.
+
         Note: connection errors during handshake propagate directly to the caller.
         """
-        # Create a new socket for subscription
-        sub_sock = handshake(self.hostname, self.port, self.timeout)
-        sub_sock.settimeout(None)  # set to blocking mode for subscription
-        stop_event = threading.Event()
-
-        def listen():
-            try:
-                # Send subscription request
-                payload = {
-                    "method": "blockchain.address.subscribe",
-                    "params": [address],
-                    "jsonrpc": "2.0",
-                    "id": "bitcash-sub",
-                }
-                sub_sock.sendall(json.dumps(payload).encode() + b"\n")
-                buffer = b""
-                while not stop_event.is_set():
-                    buffer += sub_sock.recv(4096)
-                    while b"\n" in buffer:
-                        line, buffer = buffer.split(b"\n", 1)
-                        if not line:
-                            continue
-                        msg = json.loads(line.decode())
-                        # Initial response or notification
-                        if (
-                            msg.get("method") == "blockchain.address.subscribe"
-                            or msg.get("id") == "bitcash-sub"
-                        ):
-                            status = (
-                                msg.get("params", [None, None])[1]
-                                if "method" in msg
-                                else msg.get("result")
-                            )
-                            callback(address, status)
-            except (OSError, ValueError) as e:
-                if not stop_event.is_set():
-                    callback(address, f"error: {str(e)}")
-            finally:
-                try:
-                    sub_sock.close()
-                except Exception:
-                    pass
-                if stop_event.is_set():
-                    # Notify that subscription has ended (clean stop only)
-                    callback(address, "unsubscribed")
-
-        thread = threading.Thread(target=listen, daemon=True)
-        thread.start()
-
-        def stop_subscription():
-            stop_event.set()
-            try:
-                sub_sock.shutdown(socket.SHUT_RDWR)
-            except Exception:
-                pass
-
-        return SubscriptionHandle(stop_subscription)
+        return self.subscriptions.subscribe(address, callback)
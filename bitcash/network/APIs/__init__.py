@@ -3,6 +3,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import Any, Callable, Optional
 
+from bitcash.exceptions import BatchError, DataNotFound
 from bitcash.network.meta import Unspent
 from bitcash.network.transaction import Transaction
 from bitcash.types import NFTCapability, Network, NetworkStr
@@ -99,6 +100,68 @@ class BaseAPI(ABC):
             endpoint.
         """
 
+    def get_balance_batch(self, addresses: list[str], *args, **kwargs) -> list[int]:
+        """
+        Returns the balance of many addresses. Endpoints that can query
+        many addresses at once override this, the default queries them one
+        by one.
+
+        :param addresses: Cashaddresses of the locking scripts
+        :returns: BCH amount in satoshis of each address, in order
+        :raises BatchError: If a batch query returns an error for some
+            addresses, with the results of the others.
+        """
+        return [self.get_balance(address, *args, **kwargs) for address in addresses]
+
+    def get_transactions_batch(
+        self, addresses: list[str], *args, **kwargs
+    ) -> list[list[str]]:
+        """
+        Gets the ID of all transactions related to many addresses.
+
+        :param addresses: The addresses in question.
+        :returns: A list of transaction IDs for each address, in order.
+        :raises BatchError: If a batch query returns an error for some
+            addresses, with the results of the others.
+        """
+        return [
+            self.get_transactions(address, *args, **kwargs) for address in addresses
+        ]
+
+    def get_unspent_batch(
+        self, addresses: list[str], *args, **kwargs
+    ) -> list[list[Unspent]]:
+        """
+        Returns list of unspent outputs associated with many addresses
+
+        :param addresses: Cashaddresses of the locking scripts
+        :returns: List of unspents of each address, in order
+        :raises BatchError: If a batch query returns an error for some
+            addresses, with the results of the others.
+        """
+        return [self.get_unspent(address, *args, **kwargs) for address in addresses]
+
+    def get_raw_transaction_batch(
+        self, txids: list[str], *args, **kwargs
+    ) -> list[dict[str, Any]]:
+        """Gets the raw, unparsed details of many transactions.
+
+        :param txids: The transaction ids in question.
+        :returns: The raw details of each transaction, in order.
+        :raises BatchError: If some transactions do not exist on this
+            endpoint, with the details of the others.
+        """
+        results: list[Any] = []
+        for txid in txids:
+            try:
+                results.append(self.get_raw_transaction(txid, *args, **kwargs))
+            except DataNotFound as e:
+                results.append(e)
+        failed = sum(isinstance(result, Exception) for result in results)
+        if failed:
+            raise BatchError(f"{failed} of {len(results)} requests failed", results)
+        return results
+
     @abstractmethod
     def broadcast_tx(self, tx_hex: str, *args, **kwargs) -> bool:
         """
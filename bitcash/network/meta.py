@@ -31,6 +31,7 @@ class Unspent:
         "txid",
         "txindex",
         "cashtoken",
+        "_sort_key",
     )
 
     def __init__(
@@ -58,6 +59,7 @@ class Unspent:
             nft_commitment=nft_commitment,
             token_amount=token_amount,
         )
+        self._sort_key: Optional[tuple] = None
 
     def to_dict(self) -> dict:
         dict_ = {
@@ -110,42 +112,65 @@ class Unspent:
     def has_cashtoken(self) -> bool:
         return self.has_amount or self.has_nft
 
+    def sort_key(self) -> tuple:
+        """
+        Key to sort Unspents during spending, in the order of ``__gt__``:
+        unspents without cashtokens first, then fungible tokens by token
+        amount, then NFTs by capability. Ties are broken by amount.
+
+        The key is cached until the amount or cashtoken is replaced.
+        """
+        cached = self._sort_key
+        if (
+            cached is not None
+            and cached[0] == self.amount
+            and cached[1] is self.cashtoken
+        ):
+            return cached[2]
+        nft_capability = self.cashtoken.nft_capability
+        token_amount = self.cashtoken.token_amount
+        key = (
+            nft_capability is not None,
+            nft_capability.value if nft_capability is not None else 0,
+            token_amount is not None,
+            token_amount if token_amount is not None else 0,
+            self.amount,
+        )
+        self._sort_key = (self.amount, self.cashtoken, key)
+        return key
+
+    def _compare_key(self) -> tuple:
+        # same fields as to_dict(), without building the dict
+        cashtoken = self.cashtoken
+        return (
+            self.amount,
+            self.confirmations,
+            self.script,
+            self.txid,
+            self.txindex,
+            cashtoken.category_id,
+            cashtoken.nft_capability,
+            cashtoken.nft_commitment or None,
+            cashtoken.token_amount,
+        )
+
     def __eq__(self, other) -> bool:
-        return self.to_dict() == other.to_dict()
+        if not isinstance(other, Unspent):
+            return NotImplemented
+        return self._compare_key() == other._compare_key()
+
+    def __hash__(self) -> int:
+        # an unspent is identified by its outpoint
+        return hash((self.txid, self.txindex))
 
     def __gt__(self, other: Unspent) -> bool:
         """
         Method to help sorting of Unspents during spending
         """
-        if self.has_nft:
-            assert self.cashtoken.nft_capability is not None
-            if not other.has_nft:
-                return True
-            assert other.cashtoken.nft_capability is not None
-            if (
-                self.cashtoken.nft_capability.value
-                > other.cashtoken.nft_capability.value
-            ):
-                return True
-            if (
-                self.cashtoken.nft_capability.value
-                < other.cashtoken.nft_capability.value
-            ):
-                return False
-        elif other.has_nft:
-            return False
-        if self.has_amount:
-            assert self.cashtoken.token_amount is not None
-            if not other.has_amount:
-                return True
-            assert other.cashtoken.token_amount is not None
-            if self.cashtoken.token_amount > other.cashtoken.token_amount:
-                return True
-            if self.cashtoken.token_amount < other.cashtoken.token_amount:
-                return False
-        elif other.has_amount:
-            return False
-        return self.amount > other.amount
+        return self.sort_key() > other.sort_key()
+
+    def __lt__(self, other: Unspent) -> bool:
+        return self.sort_key() < other.sort_key()
 
     def __repr__(self) -> str:
         var_list = [
@@ -343,6 +343,96 @@ class NetworkAPI:
 
         raise ConnectionError("All APIs are unreachable.")  # pragma: no cover
 
+    @classmethod
+    def get_balance_batch(
+        cls, addresses: list[str], network: NetworkStr = "mainnet"
+    ) -> list[int]:
+        """Gets the balance of many addresses in satoshi. Fulcrum endpoints
+        query them in JSON-RPC batches, in one round trip.
+
+        :param addresses: The addresses in question.
+        :returns: The balance in satoshi of each address, in order.
+        :raises ConnectionError: If all API services fail.
+        :raises BatchError: If the endpoint returns an error for some
+            addresses, such as invalid ones, with the results of the others.
+            Not caught by endpoint fallback logic.
+        """
+        for endpoint in get_sanitized_endpoints_for(network):
+            try:
+                return endpoint.get_balance_batch(addresses, timeout=DEFAULT_TIMEOUT)
+            except cls.IGNORED_ERRORS:  # pragma: no cover
+                pass
+
+        raise ConnectionError("All APIs are unreachable.")  # pragma: no cover
+
+    @classmethod
+    def get_transactions_batch(
+        cls, addresses: list[str], network: NetworkStr = "mainnet"
+    ) -> list[list[str]]:
+        """Gets the ID of all transactions related to many addresses.
+
+        :param addresses: The addresses in question.
+        :returns: A list of transaction ids for each address, in order.
+        :raises ConnectionError: If all API services fail.
+        :raises BatchError: If the endpoint returns an error for some
+            addresses, such as invalid ones, with the results of the others.
+            Not caught by endpoint fallback logic.
+        """
+        for endpoint in get_sanitized_endpoints_for(network):
+            try:
+                return endpoint.get_transactions_batch(
+                    addresses, timeout=DEFAULT_TIMEOUT
+                )
+            except cls.IGNORED_ERRORS:  # pragma: no cover
+                pass
+
+        raise ConnectionError("All APIs are unreachable.")  # pragma: no cover
+
+    @classmethod
+    def get_unspent_batch(
+        cls, addresses: list[str], network: NetworkStr = "mainnet"
+    ) -> list[list[Unspent]]:
+        """Gets all unspent transaction outputs belonging to many addresses.
+
+        :param addresses: The addresses in question.
+        :returns: A list of unspent transaction outputs of
+            :class:`~bitcash.network.meta.Unspent` for each address, in order.
+        :raises ConnectionError: If all API services fail.
+        :raises BatchError: If the endpoint returns an error for some
+            addresses, such as invalid ones, with the results of the others.
+            Not caught by endpoint fallback logic.
+        """
+        for endpoint in get_sanitized_endpoints_for(network):
+            try:
+                return endpoint.get_unspent_batch(addresses, timeout=DEFAULT_TIMEOUT)
+            except cls.IGNORED_ERRORS:  # pragma: no cover
+                pass
+
+        raise ConnectionError("All APIs are unreachable.")  # pragma: no cover
+
+    @classmethod
+    def get_raw_transaction_batch(
+        cls, txids: list[str], network: NetworkStr = "mainnet"
+    ) -> list[dict[str, Any]]:
+        """Gets the raw, unparsed details of many transactions.
+
+        :param txids: The transaction ids in question.
+        :returns: The raw details of each transaction, in order.
+        :raises ConnectionError: If all API services fail.
+        :raises BatchError: If some transactions do not exist on the
+            endpoint, with the details of the others. Not caught by endpoint
+            fallback logic.
+        """
+        for endpoint in get_sanitized_endpoints_for(network):
+            try:
+                return endpoint.get_raw_transaction_batch(
+                    txids, timeout=DEFAULT_TIMEOUT
+                )
+            except cls.IGNORED_ERRORS:  # pragma: no cover
+                pass
+
+        raise ConnectionError("All APIs are unreachable.")  # pragma: no cover
+
     @classmethod
     def get_cashtoken_addresses(
         cls,
@@ -1,19 +1,32 @@
 import logging
-from copy import deepcopy
-from typing import Optional, Sequence, Union
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from hashlib import sha256 as _sha256
+from typing import Any, Callable, NamedTuple, Optional, Sequence, Union
 
 from bitcash.cashaddress import Address
 from bitcash.cashtoken import (
     Unspents,
+    UnspentSelection,
+    _calculate_dust_value,
     generate_cashtoken_prefix,
+    parse_cashtoken_prefix,
     prepare_output,
     select_cashtoken_utxo,
 )
-from bitcash.crypto import double_sha256, sha256
+from bitcash.coinselection import select_branch_and_bound, select_knapsack
+from bitcash.crypto import double_sha256
 from bitcash.exceptions import InsufficientFunds
 from bitcash.network.meta import Unspent
+from bitcash.network.transaction import Transaction, TxPart
 from bitcash.op import OpCodes
-from bitcash.types import CashTokens, PreparedOutput, UserOutput
+from bitcash.types import (
+    CashTokens,
+    Network,
+    PreparedOutput,
+    SelectionStrategy,
+    SignatureType,
+    UserOutput,
+)
 from bitcash.utils import (
     bytes_to_hex,
     chunk_data,
@@ -37,6 +50,16 @@ HASH_TYPE = 0x41.to_bytes(4, byteorder="little")
 
 MESSAGE_LIMIT = 220
 
+# Upper bound of a DER encoded low-S ECDSA signature with its sighash byte
+ECDSA_SIGNATURE_SIZE = 72
+# Upper bound of the same signature when ground to a low R value
+LOW_R_SIGNATURE_SIZE = 71
+# Schnorr signature with its sighash byte
+SCHNORR_SIGNATURE_SIZE = 65
+
+# Private keys of a batch, loaded once per worker process
+_BATCH_KEYS: list[Any] = []
+
 
 class TxIn:
     __slots__ = ("script", "script_len", "txid", "txindex", "amount", "token_prefix")
@@ -80,25 +103,66 @@ class TxIn:
         )
 
 
-def calc_txid(tx_hex: str) -> str:
-    return bytes_to_hex(double_sha256(hex_to_bytes(tx_hex))[::-1])
+def calc_txid(tx: Union[str, bytes]) -> str:
+    if isinstance(tx, str):
+        tx = hex_to_bytes(tx)
+    return bytes_to_hex(double_sha256(tx)[::-1])
+
+
+def signature_size(sig_type: SignatureType = "ecdsa", low_r: bool = False) -> int:
+    """
+    Upper bound of the size of an input signature, with its sighash byte.
+
+    :param sig_type: Either ``"ecdsa"`` or ``"schnorr"``.
+    :param low_r: Whether ECDSA signatures are ground to a low R value.
+    :returns: The size in bytes.
+    """
+    if sig_type == "schnorr":
+        return SCHNORR_SIGNATURE_SIZE
+    if sig_type == "ecdsa":
+        return LOW_R_SIGNATURE_SIZE if low_r else ECDSA_SIGNATURE_SIZE
+    raise ValueError(f"Unknown signature type {sig_type!r}")
 
 
 def estimate_tx_fee(
-    n_in: int, output_script_list: list[bytes], satoshis: int, compressed: bool
+    n_in: int,
+    output_script_list: list[bytes],
+    satoshis: int,
+    compressed: bool,
+    sig_type: SignatureType = "ecdsa",
+) -> int:
+    return _estimate_tx_fee(
+        n_in,
+        len(output_script_list),
+        sum([len(script) for script in output_script_list]),
+        satoshis,
+        compressed,
+        sig_type,
+    )
+
+
+def _estimate_tx_fee(
+    n_in: int,
+    n_out: int,
+    scripts_size: int,
+    satoshis: int,
+    compressed: bool,
+    sig_type: SignatureType = "ecdsa",
 ) -> int:
+    """
+    estimate_tx_fee() from the number of outputs and the total size of their
+    scripts, for callers keeping running totals.
+    """
     if not satoshis:
         return 0
 
-    n_out = len(output_script_list)
-
     estimated_size = (
         4  # version
         + len(int_to_unknown_bytes(n_in, byteorder="little"))
-        + n_in * (148 if compressed else 180)
+        + n_in * p2pkh_input_size(compressed, signature_size(sig_type))
         + len(int_to_unknown_bytes(n_out, byteorder="little"))
         + n_out * 9  # satoshi_value + script_len
-        + sum([len(script) for script in output_script_list])
+        + scripts_size
         + 4  # time lock
     )
 
@@ -109,6 +173,101 @@ def estimate_tx_fee(
     return estimated_fee
 
 
+def p2pkh_input_size(
+    compressed: bool = True, signature_size: int = ECDSA_SIGNATURE_SIZE
+) -> int:
+    """
+    Serialized size of a signed P2PKH input.
+
+    :param compressed: Whether the signing public key is compressed.
+    :param signature_size: Size of the signature, including the sighash byte.
+    :returns: The size in bytes.
+    """
+    script_sig_size = 1 + signature_size + 1 + (33 if compressed else 65)
+    return (
+        32  # txid
+        + 4  # txindex
+        + len(int_to_varint(script_sig_size))
+        + script_sig_size
+        + 4  # sequence
+    )
+
+
+class TxSize:
+    """
+    Tracks the exact serialized size of a transaction while its inputs and
+    outputs are being selected.
+
+    :param input_size: Serialized size of each input, see
+                       :func:`p2pkh_input_size`.
+    """
+
+    __slots__ = ("input_size", "n_in", "n_out", "_outputs_size")
+
+    def __init__(self, input_size: int):
+        self.input_size = input_size
+        self.n_in = 0
+        self.n_out = 0
+        self._outputs_size = 0
+
+    def add_inputs(self, n_in: int = 1) -> None:
+        self.n_in += n_in
+
+    def add_output(self, script: bytes) -> None:
+        self.n_out += 1
+        self._outputs_size += 8 + len(int_to_varint(len(script))) + len(script)
+
+    def size(
+        self, extra_scripts: Sequence[bytes] = (), n_in: Optional[int] = None
+    ) -> int:
+        """
+        :param extra_scripts: Scripts of outputs counted for this call only,
+                              such as the leftover outputs.
+        :param n_in: Number of inputs for this call only, instead of the
+                     inputs added so far.
+        :returns: The serialized size in bytes.
+        """
+        if n_in is None:
+            n_in = self.n_in
+        n_out = self.n_out + len(extra_scripts)
+        outputs_size = self._outputs_size + sum(
+            [
+                8 + len(int_to_varint(len(script))) + len(script)
+                for script in extra_scripts
+            ]
+        )
+        return (
+            4  # version
+            + len(int_to_varint(n_in))
+            + n_in * self.input_size
+            + len(int_to_varint(n_out))
+            + outputs_size
+            + 4  # lock time
+        )
+
+    def fee(
+        self,
+        satoshis: int,
+        extra_scripts: Sequence[bytes] = (),
+        n_in: Optional[int] = None,
+    ) -> int:
+        """
+        :param satoshis: Fee rate in satoshi per byte.
+        :param extra_scripts: Scripts of outputs counted for this call only.
+        :param n_in: Number of inputs for this call only.
+        :returns: The fee in satoshi.
+        """
+        if not satoshis:
+            return 0
+
+        size = self.size(extra_scripts, n_in)
+        fee = size * satoshis
+
+        logging.debug(f"Exact fee: {fee} satoshis for {size} bytes")
+
+        return fee
+
+
 def get_op_pushdata_code(dest: bytes) -> bytes:
     length_data = len(dest)
     if length_data <= 0x4C:  # (https://en.bitcoin.it/wiki/Script)
@@ -136,13 +295,30 @@ def sanitize_tx_data(
     message: Optional[Union[bytes, str]] = None,
     compressed: bool = True,
     custom_pushdata: bool = False,
+    exact_fee: bool = False,
+    low_r: bool = False,
+    sig_type: SignatureType = "ecdsa",
+    coin_selection: SelectionStrategy = "smallest",
 ):
     """
     sanitize_tx_data()
 
-    fee is in satoshis per byte.
+    fee is in satoshis per byte. If exact_fee is True, the fee is computed
+    from the exact serialized size of the transaction, using the largest
+    signature size, instead of the per-input estimate of estimate_tx_fee.
+    low_r is whether the inputs will be signed with low R signatures, which
+    are a byte smaller, and sig_type is the signature algorithm of the inputs.
+
+    coin_selection is how unspents are selected when combine is False.
+    "smallest" spends the smallest unspents first. "bnb" searches for
+    unspents that pay the outputs without a change output, and otherwise
+    picks them with a knapsack solver.
     """
-    unspents = deepcopy(unspents)
+    if coin_selection not in ("smallest", "bnb"):
+        raise ValueError(f"Unknown coin selection {coin_selection!r}")
+
+    # the list is consumed by the coin selection, the unspents are not changed
+    unspents = list(unspents)
     leftover_address = Address.from_string(leftover)
 
     if not unspents:
@@ -185,19 +361,29 @@ def sanitize_tx_data(
     output_script_list = [_[0] for _ in prepared_outputs]
     output_script_list += [_[0] for _ in message_outputs]
 
+    tx_size = TxSize(p2pkh_input_size(compressed, signature_size(sig_type, low_r)))
+    for script in output_script_list:
+        tx_size.add_output(script)
+
     if combine:
         cashtoken = Unspents(unspents)
         for output in prepared_outputs:
             cashtoken.subtract_output(output)
         leftover_outputs, leftover_amount = cashtoken.get_outputs(leftover_address)
-        output_script_list += [_[0] for _ in leftover_outputs]
+        leftover_scripts = [_[0] for _ in leftover_outputs]
         # calculated_fee is in total satoshis.
-        calculated_fee = estimate_tx_fee(
-            len(unspents),
-            output_script_list,
-            fee,
-            compressed,
-        )
+        if exact_fee:
+            tx_size.add_inputs(len(unspents))
+            calculated_fee = tx_size.fee(fee, leftover_scripts)
+        else:
+            output_script_list += leftover_scripts
+            calculated_fee = estimate_tx_fee(
+                len(unspents),
+                output_script_list,
+                fee,
+                compressed,
+                sig_type,
+            )
         if calculated_fee > leftover_amount:
             raise InsufficientFunds("leftover balance cannot cover fee")
         if calculated_fee:
@@ -212,38 +398,69 @@ def sanitize_tx_data(
     else:
         unspents, unspents_used = select_cashtoken_utxo(unspents, prepared_outputs)
 
+        if coin_selection == "bnb":
+
+            def calculate_fee(n_in: int, extra_scripts: Sequence[bytes] = ()) -> int:
+                if exact_fee:
+                    return tx_size.fee(fee, extra_scripts, n_in)
+                return estimate_tx_fee(
+                    n_in,
+                    output_script_list + list(extra_scripts),
+                    fee,
+                    compressed,
+                    sig_type,
+                )
+
+            changeless, unspents = _select_bnb(
+                unspents,
+                unspents_used,
+                prepared_outputs,
+                leftover_address,
+                calculate_fee,
+            )
+            if changeless is not None:
+                # the excess over the fee is given to the miners
+                prepared_outputs.extend(message_outputs)
+                return changeless, prepared_outputs
+
         error = None
         # the first unspent is added regardless because of how selection is,
         # easiest is to pop the last unspent used and add to unspents searched
         if len(unspents_used) > 0:
             unspents = [unspents_used[-1]] + unspents
             unspents_used = unspents_used[:-1]
-        cashtoken = Unspents(unspents_used)
+        selected = UnspentSelection(unspents_used, prepared_outputs, leftover_address)
+        tx_size.add_inputs(len(unspents_used))
+        # running totals of output_script_list for estimate_tx_fee
+        n_out = len(output_script_list)
+        scripts_size = sum([len(script) for script in output_script_list])
         for index, unspent in enumerate(unspents):
-            cashtoken.add_unspent(unspent)
-            test_token = deepcopy(cashtoken)
+            selected.add_unspent(unspent)
+            tx_size.add_inputs()
             try:
-                for output in prepared_outputs:
-                    test_token.subtract_output(output)
-                leftover_outputs, leftover_amount = test_token.get_outputs(
-                    leftover_address
-                )
+                leftover_outputs, leftover_amount = selected.get_outputs()
             except InsufficientFunds as err:
                 error = err
                 continue
 
-            output_script_list += [_[0] for _ in leftover_outputs]
-
-            calculated_fee = estimate_tx_fee(
-                len(unspents[: index + 1]) + len(unspents_used),
-                output_script_list,
-                fee,
-                compressed,
-            )
+            leftover_scripts = [_[0] for _ in leftover_outputs]
+            if exact_fee:
+                calculated_fee = tx_size.fee(fee, leftover_scripts)
+            else:
+                n_out += len(leftover_scripts)
+                scripts_size += sum([len(script) for script in leftover_scripts])
+                calculated_fee = _estimate_tx_fee(
+                    index + 1 + len(unspents_used),
+                    n_out,
+                    scripts_size,
+                    fee,
+                    compressed,
+                    sig_type,
+                )
             if calculated_fee < leftover_amount:
                 break
         else:
-            raise InsufficientFunds(error or f"{cashtoken.amount} is insufficient")
+            raise InsufficientFunds(error or f"{selected.amount} is insufficient")
 
         if calculated_fee:
             leftover_outputs[-1] = PreparedOutput(
@@ -260,39 +477,286 @@ def sanitize_tx_data(
     return unspents, prepared_outputs
 
 
+def _select_bnb(
+    unspents: list[Unspent],
+    unspents_used: list[Unspent],
+    outputs: list[PreparedOutput],
+    leftover: Address,
+    calculate_fee: Callable[[int, Sequence[bytes]], int],
+) -> tuple[Optional[list[Unspent]], list[Unspent]]:
+    """
+    Branch and bound coin selection of sanitize_tx_data().
+
+    The cost of a change output is the fee to create it and to spend it
+    later, an excess over the fee up to that cost is paid to the miners
+    instead.
+
+    :param unspents: Sorted unspents to select from.
+    :param unspents_used: Unspents selected for the cashtokens of the outputs.
+    :param outputs: Prepared outputs to pay.
+    :param leftover: Leftover address.
+    :param calculate_fee: Fee for a number of inputs and extra output scripts.
+    :returns: The inputs of a transaction without change, if there is one,
+              and the unspents to select from, with the unspents picked by
+              the knapsack solver first.
+    """
+    n_used = len(unspents_used)
+    base_fee = calculate_fee(n_used, ())
+    input_fee = calculate_fee(n_used + 1, ()) - base_fee
+    change_fee = calculate_fee(n_used, [leftover.scriptcode]) - base_fee
+    window = change_fee + input_fee
+    target = (
+        sum([output.amount for output in outputs])
+        + base_fee
+        - sum([unspent.amount for unspent in unspents_used])
+    )
+
+    # unspents with cashtokens always need a change output
+    positions = [i for i, unspent in enumerate(unspents) if not unspent.has_cashtoken]
+    values = [unspents[i].amount - input_fee for i in positions]
+
+    picked = select_branch_and_bound(values, target, window)
+    if picked is not None:
+        inputs = unspents_used + [unspents[positions[i]] for i in picked]
+        try:
+            token_outputs, leftover_amount = UnspentSelection(
+                inputs, outputs, leftover
+            ).get_token_outputs()
+        except InsufficientFunds:
+            pass
+        else:
+            excess = leftover_amount - calculate_fee(len(inputs), ())
+            if not token_outputs and 0 <= excess <= window:
+                return inputs, unspents
+
+    # the change must be at least dust
+    dust = _calculate_dust_value(leftover, CashTokens(None, None, None, None))
+    picked = select_knapsack(values, target + change_fee + dust)
+    if picked:
+        # largest first, selection stops once the outputs are paid
+        picked_positions = sorted(
+            [positions[i] for i in picked],
+            key=lambda i: unspents[i].amount,
+            reverse=True,
+        )
+        rest = set(range(len(unspents))).difference(picked_positions)
+        unspents = [unspents[i] for i in picked_positions] + [
+            unspent for i, unspent in enumerate(unspents) if i in rest
+        ]
+
+    return None, unspents
+
+
 def construct_output_block(outputs: Sequence[PreparedOutput]) -> bytes:
-    output_block = b""
+    output_block: list[bytes] = []
 
     for data in outputs:
         script, amount, _ = data
 
-        output_block += amount.to_bytes(8, byteorder="little")
+        output_block.append(amount.to_bytes(8, byteorder="little"))
+        output_block.append(int_to_varint(len(script)))
+        output_block.append(script)
 
-        # Script length in wiki is "Var_int" but there's a note of
-        # "modern BitcoinQT" using a more compact "CVarInt"
-        # CVarInt is what I believe we have here - No changes made.
-        # If incorrect - only breaks if 220 byte limit is increased.
-        output_block += int_to_unknown_bytes(len(script), byteorder="little")
-        output_block += script
-
-    return output_block
+    return b"".join(output_block)
 
 
 def construct_input_block(inputs: list[TxIn]) -> bytes:
-    input_block = b""
     sequence = SEQUENCE
 
-    for txin in inputs:
-        input_block += (
+    return b"".join(
+        [
             txin.txid + txin.txindex + txin.script_len + txin.script + sequence
+            for txin in inputs
+        ]
+    )
+
+
+class TxWriter:
+    """
+    Writes a serialized transaction into a single preallocated buffer.
+
+    :param size: Exact size of the serialized transaction in bytes.
+    """
+
+    __slots__ = ("_buffer", "_view", "_offset")
+
+    def __init__(self, size: int):
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._offset = 0
+
+    def write(self, data: bytes) -> None:
+        end = self._offset + len(data)
+        self._view[self._offset : end] = data
+        self._offset = end
+
+    def getvalue(self) -> bytes:
+        if self._offset != len(self._buffer):
+            raise ValueError(
+                f"Buffer holds {len(self._buffer)} bytes, {self._offset} written"
+            )
+        self._view.release()
+        return bytes(self._buffer)
+
+
+def serialize_transaction(
+    inputs: list[TxIn],
+    outputs: Sequence[PreparedOutput],
+    version: bytes = VERSION_1,
+    lock_time: bytes = LOCK_TIME,
+    output_block: Optional[bytes] = None,
+) -> bytes:
+    """
+    Serializes version, inputs, outputs and lock time in one pass.
+
+    :param inputs: Inputs with their final unlocking scripts.
+    :param outputs: Prepared outputs of the transaction.
+    :param version: Transaction version bytes.
+    :param lock_time: Transaction lock time bytes.
+    :param output_block: Already serialized ``outputs``, if available.
+    :returns: The serialized transaction.
+    """
+    if output_block is None:
+        output_block = construct_output_block(outputs)
+    input_count = int_to_varint(len(inputs))
+    output_count = int_to_varint(len(outputs))
+
+    size = (
+        len(version)
+        + len(input_count)
+        + sum(
+            [
+                len(txin.txid)
+                + len(txin.txindex)
+                + len(txin.script_len)
+                + len(txin.script)
+                + len(SEQUENCE)
+                for txin in inputs
+            ]
         )
+        + len(output_count)
+        + len(output_block)
+        + len(lock_time)
+    )
 
-    return input_block
+    writer = TxWriter(size)
+    writer.write(version)
+    writer.write(input_count)
+    for txin in inputs:
+        writer.write(txin.txid)
+        writer.write(txin.txindex)
+        writer.write(txin.script_len)
+        writer.write(txin.script)
+        writer.write(SEQUENCE)
+    writer.write(output_count)
+    writer.write(output_block)
+    writer.write(lock_time)
+
+    return writer.getvalue()
+
+
+class SighashCache:
+    """
+    Computes BIP-143 signature hashes for the inputs of a transaction.
+
+    The components shared by every input (``hashPrevouts``, ``hashSequence``
+    and ``hashOutputs``) are hashed once, and the SHA-256 state of the common
+    preimage prefix is copied for each input instead of being rehashed.
+
+    :param inputs: Inputs of the transaction being signed.
+    :param output_block: Serialized outputs of the transaction.
+    :param version: Transaction version bytes.
+    :param lock_time: Transaction lock time bytes.
+    :param hash_type: Sighash type bytes, including the fork id.
+    """
+
+    __slots__ = ("_prefix", "_suffix")
+
+    def __init__(
+        self,
+        inputs: list[TxIn],
+        output_block: bytes,
+        version: bytes = VERSION_1,
+        lock_time: bytes = LOCK_TIME,
+        hash_type: bytes = HASH_TYPE,
+    ):
+        hashPrevouts = double_sha256(b"".join([i.txid + i.txindex for i in inputs]))
+        hashSequence = double_sha256(SEQUENCE * len(inputs))
+        hashOutputs = double_sha256(output_block)
+
+        self._prefix = _sha256(version + hashPrevouts + hashSequence)
+        self._suffix = SEQUENCE + hashOutputs + lock_time + hash_type
+
+    def sighash(self, txin: TxIn, script_code: Optional[bytes] = None) -> bytes:
+        """
+        Hashes the BIP-143 preimage of an input once with SHA-256. The signer
+        applies the second round of SHA-256.
+
+        :param txin: The input to compute the hash for.
+        :param script_code: The script code to commit to, prefixed with its
+                            length. Defaults to ``txin.script_len + txin.script``.
+        :returns: The SHA-256 hash of the signature preimage.
+        """
+        if script_code is None:
+            script_code = txin.script_len + txin.script
+
+        state = self._prefix.copy()
+        state.update(
+            txin.txid
+            + txin.txindex
+            + txin.token_prefix
+            + script_code
+            + txin.amount
+            + self._suffix
+        )
+        return state.digest()
 
 
 def create_p2pkh_transaction(
-    private_key, unspents: list[Unspent], outputs: Sequence[PreparedOutput]
+    private_key,
+    unspents: list[Unspent],
+    outputs: Sequence[PreparedOutput],
+    workers: Optional[int] = None,
+    low_r: bool = False,
+    sig_type: SignatureType = "ecdsa",
 ) -> str:
+    """
+    Creates and signs a P2PKH transaction. Accepts the same arguments as
+    :func:`create_p2pkh_transaction_bytes`.
+
+    :returns: The signed transaction as hex.
+    """
+    tx, _ = create_p2pkh_transaction_bytes(
+        private_key, unspents, outputs, workers=workers, low_r=low_r, sig_type=sig_type
+    )
+    return bytes_to_hex(tx)
+
+
+def create_p2pkh_transaction_bytes(
+    private_key,
+    unspents: list[Unspent],
+    outputs: Sequence[PreparedOutput],
+    workers: Optional[int] = None,
+    low_r: bool = False,
+    sig_type: SignatureType = "ecdsa",
+) -> tuple[bytes, str]:
+    """
+    Creates and signs a P2PKH transaction, without converting it to hex.
+
+    :param private_key: The private key that signs every input.
+    :param unspents: The UTXOs to spend.
+    :param outputs: The prepared outputs of the transaction.
+    :param workers: If more than one, the inputs are signed on a thread pool
+                    of this size. libsecp256k1 releases the GIL while signing.
+    :param low_r: Whether to grind signatures to a low R value, so each is at
+                  most 71 bytes long with its sighash byte.
+    :param sig_type: ``"ecdsa"`` or ``"schnorr"``. Schnorr signatures are 64
+                     bytes, smaller than any DER encoded ECDSA signature.
+    :returns: The signed transaction and its txid.
+    """
+    # validate early, before any signing
+    signature_size(sig_type)
+
     public_key = private_key.public_key
     public_key_len = len(public_key).to_bytes(1, byteorder="little")
 
@@ -300,50 +764,46 @@ def create_p2pkh_transaction(
     lock_time = LOCK_TIME
     # sequence = SEQUENCE
     hash_type = HASH_TYPE
-    input_count = int_to_unknown_bytes(len(unspents), byteorder="little")
-    output_count = int_to_unknown_bytes(len(outputs), byteorder="little")
 
     output_block = construct_output_block(outputs)
 
     # Optimize for speed, not memory, by pre-computing values.
+    # Unspents of the same address share their script, decode it once.
+    scripts: dict[str, bytes] = {}
     inputs: list[TxIn] = []
     for unspent in unspents:
-        script = hex_to_bytes(unspent.script)
+        script = scripts.get(unspent.script)
+        if script is None:
+            script = scripts[unspent.script] = hex_to_bytes(unspent.script)
         script_len = int_to_varint(len(script))
         # get cashtoken prefix
         token_prefix = generate_cashtoken_prefix(unspent.cashtoken)
-        txid = hex_to_bytes(unspent.txid)[::-1]
+        txid = bytes.fromhex(unspent.txid)[::-1]
         txindex = unspent.txindex.to_bytes(4, byteorder="little")
         amount = unspent.amount.to_bytes(8, byteorder="little")
 
         inputs.append(TxIn(script, script_len, txid, txindex, amount, token_prefix))
 
-    hashPrevouts = double_sha256(b"".join([i.txid + i.txindex for i in inputs]))
-    hashSequence = double_sha256(b"".join([SEQUENCE for _ in inputs]))
-    hashOutputs = double_sha256(output_block)
-
-    # scriptCode_len is part of the script.
-    for i, txin in enumerate(inputs):
-        to_be_hashed = (
-            version
-            + hashPrevouts
-            + hashSequence
-            + txin.txid
-            + txin.txindex
-            + txin.token_prefix
-            + txin.script_len
-            + txin.script
-            + txin.amount
-            + SEQUENCE
-            + hashOutputs
-            + lock_time
-            + hash_type
-        )
-        hashed = sha256(to_be_hashed)  # BIP-143: Used for Bitcoin Cash
+    sighash_cache = SighashCache(inputs, output_block, version, lock_time, hash_type)
+
+    def sign_input(txin: TxIn) -> bytes:
+        # scriptCode_len is part of the script.
+        hashed = sighash_cache.sighash(txin)  # BIP-143: Used for Bitcoin Cash
+
+        # return private_key.sign(hashed) + b'\x01'
+        if sig_type == "schnorr":
+            return private_key.sign_schnorr(hashed) + b"\x41"
+        if low_r:
+            return private_key.sign(hashed, low_r=True) + b"\x41"
+        return private_key.sign(hashed) + b"\x41"
 
-        # signature = private_key.sign(hashed) + b'\x01'
-        signature = private_key.sign(hashed) + b"\x41"
+    if workers is not None and workers > 1 and len(inputs) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            signatures = list(executor.map(sign_input, inputs))
+    else:
+        signatures = [sign_input(txin) for txin in inputs]
 
+    for i, signature in enumerate(signatures):
         script_sig = (
             len(signature).to_bytes(1, byteorder="little")
             + signature
@@ -352,13 +812,326 @@ def create_p2pkh_transaction(
         )
 
         inputs[i].script = script_sig
-        inputs[i].script_len = int_to_unknown_bytes(len(script_sig), byteorder="little")
-
-    return bytes_to_hex(
-        version
-        + input_count
-        + construct_input_block(inputs)
-        + output_count
-        + output_block
-        + lock_time
+        inputs[i].script_len = int_to_varint(len(script_sig))
+
+    tx = serialize_transaction(inputs, outputs, version, lock_time, output_block)
+    return tx, calc_txid(tx)
+
+
+class BatchResult(NamedTuple):
+    """
+    The result of one job of :func:`create_p2pkh_transactions`.
+
+    :param tx_hex: The signed transaction as hex, or None if the job failed.
+    :param error: The exception raised by the job, or None if it succeeded.
+    """
+
+    tx_hex: Optional[str]
+    error: Optional[Exception]
+
+
+def _init_batch_worker(wifs: list[str]) -> None:
+    # imported here, bitcash.wallet depends on this module
+    from bitcash.wallet import wif_to_key
+
+    global _BATCH_KEYS
+    _BATCH_KEYS = [wif_to_key(wif) for wif in wifs]
+
+
+def _run_batch_job(
+    job: tuple[int, list[Unspent], Sequence[PreparedOutput]],
+) -> BatchResult:
+    key_index, unspents, outputs = job
+    try:
+        tx_hex = create_p2pkh_transaction(_BATCH_KEYS[key_index], unspents, outputs)
+    except Exception as e:
+        return BatchResult(None, e)
+    return BatchResult(tx_hex, None)
+
+
+def create_p2pkh_transactions(
+    jobs: Sequence[tuple[Any, list[Unspent], Sequence[PreparedOutput]]],
+    max_workers: Optional[int] = None,
+    chunksize: int = 1,
+) -> list[BatchResult]:
+    """
+    Creates and signs many independent P2PKH transactions on a process pool.
+
+    Each distinct private key is sent to every worker process once, when the
+    worker starts, and jobs only refer to it by index.
+
+    :param jobs: Sequence of ``(private_key, unspents, prepared_outputs)``,
+                 as passed to :func:`create_p2pkh_transaction`.
+    :param max_workers: Number of worker processes. Defaults to the number of
+                        processors.
+    :param chunksize: Number of jobs sent to a worker at a time.
+    :returns: A :class:`BatchResult` per job, in the order of ``jobs``.
+    """
+    wifs: list[str] = []
+    key_indices: dict[str, int] = {}
+    batch_jobs: list[tuple[int, list[Unspent], Sequence[PreparedOutput]]] = []
+    for private_key, unspents, outputs in jobs:
+        wif = private_key.to_wif()
+        if wif not in key_indices:
+            key_indices[wif] = len(wifs)
+            wifs.append(wif)
+        batch_jobs.append((key_indices[wif], unspents, outputs))
+
+    if not batch_jobs:
+        return []
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_batch_worker,
+        initargs=(wifs,),
+    ) as executor:
+        return list(executor.map(_run_batch_job, batch_jobs, chunksize=chunksize))
+
+
+def _read_varint(view: memoryview, offset: int) -> tuple[int, int]:
+    """
+    Reads a varint from ``view`` at ``offset``.
+
+    :returns: The int value and the offset following the varint.
+    """
+    prefix = view[offset]
+    if prefix < 0xFD:
+        return prefix, offset + 1
+    size = 2 if prefix == 0xFD else 4 if prefix == 0xFE else 8
+    end = offset + 1 + size
+    if end > len(view):
+        raise ValueError("Transaction data ends unexpectedly")
+    return int.from_bytes(view[offset + 1 : end], "little"), end
+
+
+def _read_bytes(view: memoryview, offset: int, size: int) -> tuple[memoryview, int]:
+    end = offset + size
+    if end > len(view):
+        raise ValueError("Transaction data ends unexpectedly")
+    return view[offset:end], end
+
+
+class RawTxInput:
+    """
+    An input of a :class:`RawTransaction`. Fields are views into the
+    serialized transaction and are decoded on access.
+    """
+
+    __slots__ = ("_outpoint", "_script", "_sequence")
+
+    def __init__(self, outpoint: memoryview, script: memoryview, sequence: memoryview):
+        self._outpoint = outpoint
+        self._script = script
+        self._sequence = sequence
+
+    @property
+    def txid(self) -> str:
+        """The txid hex of the output being spent."""
+        return bytes(self._outpoint[:32])[::-1].hex()
+
+    @property
+    def txindex(self) -> int:
+        """The index of the output being spent."""
+        return int.from_bytes(self._outpoint[32:], "little")
+
+    @property
+    def script_sig(self) -> bytes:
+        """The unlocking script."""
+        return bytes(self._script)
+
+    @property
+    def sequence(self) -> int:
+        return int.from_bytes(self._sequence, "little")
+
+    def __repr__(self) -> str:
+        return f"RawTxInput(txid={self.txid!r}, txindex={self.txindex})"
+
+
+class RawTxOutput:
+    """
+    An output of a :class:`RawTransaction`. Fields are views into the
+    serialized transaction and are decoded on access.
+    """
+
+    __slots__ = ("_amount", "_script")
+
+    def __init__(self, amount: memoryview, script: memoryview):
+        self._amount = amount
+        self._script = script
+
+    @property
+    def amount(self) -> int:
+        """The amount in satoshi."""
+        return int.from_bytes(self._amount, "little")
+
+    @property
+    def script(self) -> bytes:
+        """The locking script, with the cashtoken prefix if any."""
+        return bytes(self._script)
+
+    @property
+    def cashtoken(self) -> CashTokens:
+        return parse_cashtoken_prefix(self._script)
+
+    def __repr__(self) -> str:
+        return f"RawTxOutput(amount={self.amount}, script={self.script.hex()!r})"
+
+
+class RawTransaction:
+    """
+    A transaction deserialized by :func:`deserialize_transaction`.
+
+    :param data: The serialized transaction.
+    :param version: Transaction version.
+    :param inputs: Inputs of the transaction.
+    :param outputs: Outputs of the transaction.
+    :param lock_time: Transaction lock time.
+    """
+
+    __slots__ = ("_data", "version", "inputs", "outputs", "lock_time", "_txid")
+
+    def __init__(
+        self,
+        data: bytes,
+        version: int,
+        inputs: list[RawTxInput],
+        outputs: list[RawTxOutput],
+        lock_time: int,
+    ):
+        self._data = data
+        self.version = version
+        self.inputs = inputs
+        self.outputs = outputs
+        self.lock_time = lock_time
+        self._txid: Optional[str] = None
+
+    @property
+    def txid(self) -> str:
+        if self._txid is None:
+            self._txid = calc_txid(self._data)
+        return self._txid
+
+    def to_transaction(
+        self,
+        unspents: Sequence[Unspent],
+        block: Optional[int] = None,
+        network: Network = Network.main,
+    ) -> Transaction:
+        """
+        Converts to :class:`~bitcash.network.transaction.Transaction`.
+
+        The serialized transaction does not hold the amounts, scripts or
+        cashtokens of the outputs its inputs spend, so they are taken from
+        ``unspents``.
+
+        :param unspents: The unspents spent by the inputs, in input order.
+        :param block: Height of the block including the transaction, if any.
+        :param network: Network used to encode the addresses.
+        :returns: Instance of :class:`~bitcash.network.transaction.Transaction`
+        """
+        if len(unspents) != len(self.inputs):
+            raise ValueError(
+                f"Expected {len(self.inputs)} unspents, received {len(unspents)}"
+            )
+
+        input_parts: list[TxPart] = []
+        for txin, unspent in zip(self.inputs, unspents):
+            if (txin.txid, txin.txindex) != (unspent.txid, unspent.txindex):
+                raise ValueError(f"Unspent {unspent} is not spent by {txin}")
+            input_parts.append(
+                _to_txpart(
+                    hex_to_bytes(unspent.script),
+                    unspent.amount,
+                    unspent.cashtoken,
+                    network,
+                )
+            )
+
+        output_parts = [
+            _to_txpart(output.script, output.amount, output.cashtoken, network)
+            for output in self.outputs
+        ]
+
+        amount_in = sum([part.amount for part in input_parts])
+        amount_out = sum([part.amount for part in output_parts])
+        tx = Transaction(
+            self.txid, block, amount_in, amount_out, amount_in - amount_out
+        )
+        tx.inputs = input_parts
+        tx.outputs = output_parts
+        return tx
+
+    def __repr__(self) -> str:
+        return (
+            f"RawTransaction(txid={self.txid!r}, {len(self.inputs)} inputs,"
+            f" {len(self.outputs)} outputs)"
+        )
+
+
+def _to_txpart(
+    script: bytes, amount: int, cashtoken: CashTokens, network: Network
+) -> TxPart:
+    try:
+        address: Optional[str] = Address.from_script(script, network).cash_address()
+    except ValueError:
+        address = None
+    return TxPart(
+        address,
+        amount,
+        cashtoken.category_id,
+        cashtoken.nft_capability.name if cashtoken.nft_capability else None,
+        cashtoken.nft_commitment,
+        cashtoken.token_amount,
+        data_hex=(
+            script.hex()
+            if address is None and script.startswith(OpCodes.OP_RETURN.binary)
+            else None
+        ),
+    )
+
+
+def deserialize_transaction(tx: Union[bytes, str]) -> RawTransaction:
+    """
+    Deserializes a transaction without copying its scripts.
+
+    :param tx: The serialized transaction as bytes or hex.
+    :returns: Instance of :class:`RawTransaction`
+    :raises ValueError: If the transaction is malformed.
+    """
+    if isinstance(tx, str):
+        tx = hex_to_bytes(tx)
+    view = memoryview(tx)
+
+    try:
+        version_bytes, offset = _read_bytes(view, 0, 4)
+        n_in, offset = _read_varint(view, offset)
+        inputs: list[RawTxInput] = []
+        for _ in range(n_in):
+            outpoint, offset = _read_bytes(view, offset, 36)
+            script_len, offset = _read_varint(view, offset)
+            script, offset = _read_bytes(view, offset, script_len)
+            sequence, offset = _read_bytes(view, offset, 4)
+            inputs.append(RawTxInput(outpoint, script, sequence))
+
+        n_out, offset = _read_varint(view, offset)
+        outputs: list[RawTxOutput] = []
+        for _ in range(n_out):
+            amount, offset = _read_bytes(view, offset, 8)
+            script_len, offset = _read_varint(view, offset)
+            script, offset = _read_bytes(view, offset, script_len)
+            outputs.append(RawTxOutput(amount, script))
+
+        lock_time_bytes, offset = _read_bytes(view, offset, 4)
+    except IndexError:
+        raise ValueError("Transaction data ends unexpectedly")
+
+    if offset != len(view):
+        raise ValueError(f"{len(view) - offset} trailing bytes after transaction")
+
+    return RawTransaction(
+        tx,
+        int.from_bytes(version_bytes, "little"),
+        inputs,
+        outputs,
+        int.from_bytes(lock_time_bytes, "little"),
     )
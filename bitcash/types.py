@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from enum import Enum
-from typing import Literal, NamedTuple, Optional, Union
+from typing import Iterable, Iterator, Literal, NamedTuple, Optional, Union
 from dataclasses import dataclass
 import typing
 
 from bitcash.exceptions import InvalidCashToken
 
+if typing.TYPE_CHECKING:
+    from bitcash.cashaddress import Address
+
 COMMITMENT_LENGTH = 128
 MAX_TOKEN_AMOUNT = 9223372036854775807
 
@@ -25,6 +29,12 @@ class Network(Enum):
 
 NetworkStr = Union[Literal["mainnet"], Literal["testnet"], Literal["regtest"]]
 
+# Signature algorithm used to sign transaction inputs
+SignatureType = Union[Literal["ecdsa"], Literal["schnorr"]]
+
+# Coin selection used when unspents are not combined
+SelectionStrategy = Union[Literal["smallest"], Literal["bnb"]]
+
 
 class NFTCapability(Enum):
     """
@@ -146,11 +156,16 @@ class TokenData:
     Data class for holding token information for a cashtoken category.
 
     :param token_amount: Fungible token amount of the cashtoken.
-    :param nft: List of NFTData associated with the token.
+    :param nft: NFTData associated with the token. A list is converted to an
+                :class:`NFTMultiset`.
     """
 
     token_amount: Optional[int]
-    nft: Optional[list[NFTData]]
+    nft: Optional[NFTMultiset]
+
+    def __post_init__(self):
+        if self.nft is not None and not isinstance(self.nft, NFTMultiset):
+            self.nft = NFTMultiset(self.nft)
 
     @classmethod
     def get_empty(cls) -> TokenData:
@@ -162,6 +177,16 @@ class TokenData:
     def is_empty(self) -> bool:
         return self.token_amount is None and (self.nft is None or len(self.nft) == 0)
 
+    def copy(self) -> TokenData:
+        return TokenData(
+            self.token_amount, None if self.nft is None else self.nft.copy()
+        )
+
+    def add_nft(self, nft: NFTData) -> None:
+        if self.nft is None:
+            self.nft = NFTMultiset()
+        self.nft.append(nft)
+
     def to_dict(self) -> dict[str, Union[str, int, list[dict[str, Union[str, bytes]]]]]:
         dict_: dict[str, Union[str, int, list[dict[str, Union[str, bytes]]]]] = {}
         if self.token_amount is not None:
@@ -179,7 +204,7 @@ class TokenData:
             Optional[list[dict[str, Union[str, bytes]]]], dict_.get("nft")
         )
         nft_list = (
-            [NFTData.from_dict(nft_dict) for nft_dict in nft_list_dict]
+            NFTMultiset(NFTData.from_dict(nft_dict) for nft_dict in nft_list_dict)
             if nft_list_dict
             else None
         )
@@ -189,6 +214,116 @@ class TokenData:
         )
 
 
+class NFTMultiset:
+    """
+    NFTs of a cashtoken category, in the order they were added.
+
+    The NFTs are indexed by capability and by commitment, so adding an NFT
+    and removing the first one of a capability or commitment take constant
+    time.
+
+    :param nfts: NFTData to add.
+    """
+
+    __slots__ = ("_nfts", "_capabilities", "_commitments", "_next_key")
+
+    def __init__(self, nfts: Iterable[NFTData] = ()):
+        self._nfts: OrderedDict[int, NFTData] = OrderedDict()
+        self._capabilities: dict[NFTCapability, OrderedDict[int, None]] = {
+            capability: OrderedDict() for capability in NFTCapability
+        }
+        # NFTs by capability and commitment
+        self._commitments: dict[
+            tuple[NFTCapability, Optional[bytes]], OrderedDict[int, None]
+        ] = {}
+        self._next_key = 0
+        for nft in nfts:
+            self.append(nft)
+
+    def append(self, nft: NFTData) -> None:
+        key = self._next_key
+        self._next_key += 1
+        self._nfts[key] = nft
+        self._capabilities[nft.capability][key] = None
+        self._commitments.setdefault((nft.capability, nft.commitment), OrderedDict())[
+            key
+        ] = None
+
+    def _pop(self, key: int) -> NFTData:
+        nft = self._nfts.pop(key)
+        del self._capabilities[nft.capability][key]
+        keys = self._commitments[(nft.capability, nft.commitment)]
+        del keys[key]
+        if not keys:
+            del self._commitments[(nft.capability, nft.commitment)]
+        return nft
+
+    def pop_capability(self, capability: NFTCapability) -> Optional[NFTData]:
+        """
+        Removes the first NFT with the capability.
+
+        :returns: The NFT, or ``None`` if there is none.
+        """
+        keys = self._capabilities[capability]
+        if not keys:
+            return None
+        return self._pop(next(iter(keys)))
+
+    def pop_immutable(self, commitment: Optional[bytes]) -> Optional[NFTData]:
+        """
+        Removes the first immutable NFT with the commitment.
+
+        :returns: The NFT, or ``None`` if there is none.
+        """
+        return self.remove(NFTData(NFTCapability.none, commitment))
+
+    def remove(self, nft: NFTData) -> Optional[NFTData]:
+        """
+        Removes the first NFT with the capability and commitment of ``nft``.
+
+        :returns: The NFT, or ``None`` if there is none.
+        """
+        keys = self._commitments.get((nft.capability, nft.commitment))
+        if not keys:
+            return None
+        return self._pop(next(iter(keys)))
+
+    def count(self, capability: NFTCapability) -> int:
+        return len(self._capabilities[capability])
+
+    def copy(self) -> NFTMultiset:
+        return NFTMultiset(self._nfts.values())
+
+    def __iter__(self) -> Iterator[NFTData]:
+        return iter(self._nfts.values())
+
+    @typing.overload
+    def __getitem__(self, index: int) -> NFTData: ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> list[NFTData]: ...
+
+    def __getitem__(self, index):
+        """
+        Indexes the NFTs in the order they were added, like the list
+        ``TokenData.nft`` used to be. This takes linear time.
+        """
+        return list(self._nfts.values())[index]
+
+    def __len__(self) -> int:
+        return len(self._nfts)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, NFTMultiset):
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"NFTMultiset({list(self)!r})"
+
+
 @dataclass
 class NFTData:
     """
@@ -220,9 +355,15 @@ class NFTData:
 # The output tuple a user send.
 # Output tuple of format: (destination address, amount, currency) or
 # (destination address, amount, currency, category_id, nft_capability,
-# nft_commitment, token_amount)
-SimpleUserOutput = tuple[str, int, str]
+# nft_commitment, token_amount). The destination can be an Address instance.
+SimpleUserOutput = tuple[Union[str, "Address"], int, str]
 CashTokenUserOutput = tuple[
-    str, int, str, Optional[str], Optional[str], Optional[bytes], Optional[int]
+    Union[str, "Address"],
+    int,
+    str,
+    Optional[str],
+    Optional[str],
+    Optional[bytes],
+    Optional[int],
 ]
 UserOutput = Union[SimpleUserOutput, CashTokenUserOutput]
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+try:
+    import numpy as np  # pyright: ignore
+except ImportError:
+    raise ImportError(
+        "Please install the 'numpy' package to use UnspentTable,"
+        " e.g. pip install bitcash[numpy]."
+    )
+
+from bitcash.network.meta import Unspent
+from bitcash.types import NFTCapability
+
+TXID_SIZE = 32
+# sentinel for a column without a value, token amounts are at least 1
+NO_TOKEN_AMOUNT = 0
+NO_INDEX = -1
+
+
+class UnspentTable:
+    """
+    Unspents stored column by column in NumPy arrays.
+
+    A list of :class:`~bitcash.network.meta.Unspent` costs hundreds of bytes
+    per unspent. The table keeps one array per field instead, with txids as
+    raw bytes and the scripts and token categories stored once and referenced
+    by index. Filtering, summing and selecting the largest unspents are
+    vectorized.
+
+    >>> table = UnspentTable.from_unspents(NetworkAPI.get_unspent(address))
+    >>> spendable = table.filter(min_confirmations=1, has_token=False)
+    >>> spendable.top_k(100).to_unspents()
+
+    :param amount: Amount of each unspent in satoshi.
+    :param confirmations: Confirmations of each unspent.
+    :param txid: Txid of each unspent, an array of shape ``(n, 32)``.
+    :param txindex: Output index of each unspent.
+    :param script: Index of the script of each unspent in ``scripts``.
+    :param category: Index of the token category of each unspent in
+                     ``categories``, or -1.
+    :param token_amount: Fungible token amount of each unspent, or 0.
+    :param nft_capability: Index of the NFT capability of each unspent in
+                           :class:`~bitcash.types.NFTCapability`, or -1.
+    :param nft_commitment: NFT commitment of each unspent, or ``None``.
+    :param scripts: Locking scripts hex.
+    :param categories: Token category ids.
+    """
+
+    __slots__ = (
+        "amount",
+        "confirmations",
+        "txid",
+        "txindex",
+        "script",
+        "category",
+        "token_amount",
+        "nft_capability",
+        "nft_commitment",
+        "scripts",
+        "categories",
+    )
+
+    def __init__(
+        self,
+        amount,
+        confirmations,
+        txid,
+        txindex,
+        script,
+        category,
+        token_amount,
+        nft_capability,
+        nft_commitment,
+        scripts: list[str],
+        categories: list[str],
+    ):
+        self.amount = amount
+        self.confirmations = confirmations
+        self.txid = txid
+        self.txindex = txindex
+        self.script = script
+        self.category = category
+        self.token_amount = token_amount
+        self.nft_capability = nft_capability
+        self.nft_commitment = nft_commitment
+        self.scripts = scripts
+        self.categories = categories
+
+    @classmethod
+    def from_unspents(cls, unspents: Iterable[Unspent]) -> UnspentTable:
+        """
+        :param unspents: The unspents, their txids must be 32 bytes hex.
+        :returns: A table of the unspents, in the same order.
+        """
+        unspents = list(unspents)
+        capabilities = {capability: i for i, capability in enumerate(NFTCapability)}
+
+        scripts: dict[str, int] = {}
+        categories: dict[str, int] = {}
+        script_column = []
+        category_column = []
+        token_amounts = []
+        nft_capabilities = []
+        for unspent in unspents:
+            script_column.append(scripts.setdefault(unspent.script, len(scripts)))
+            cashtoken = unspent.cashtoken
+            if cashtoken.category_id is None:
+                category_column.append(NO_INDEX)
+            else:
+                category_column.append(
+                    categories.setdefault(cashtoken.category_id, len(categories))
+                )
+            token_amounts.append(cashtoken.token_amount or NO_TOKEN_AMOUNT)
+            nft_capabilities.append(
+                NO_INDEX
+                if cashtoken.nft_capability is None
+                else capabilities[cashtoken.nft_capability]
+            )
+
+        txids = "".join(unspent.txid for unspent in unspents)
+        if len(txids) != 2 * TXID_SIZE * len(unspents):
+            raise ValueError(f"txids must be {TXID_SIZE} bytes hex")
+        nft_commitment = np.empty(len(unspents), dtype=object)
+        nft_commitment[:] = [unspent.cashtoken.nft_commitment for unspent in unspents]
+
+        return cls(
+            amount=np.fromiter(
+                (unspent.amount for unspent in unspents), np.int64, len(unspents)
+            ),
+            confirmations=np.fromiter(
+                (unspent.confirmations for unspent in unspents),
+                np.int64,
+                len(unspents),
+            ),
+            txid=np.frombuffer(bytes.fromhex(txids), np.uint8).reshape(-1, TXID_SIZE),
+            txindex=np.fromiter(
+                (unspent.txindex for unspent in unspents), np.uint32, len(unspents)
+            ),
+            script=np.array(script_column, np.int32),
+            category=np.array(category_column, np.int32),
+            token_amount=np.array(token_amounts, np.int64),
+            nft_capability=np.array(nft_capabilities, np.int8),
+            nft_commitment=nft_commitment,
+            scripts=list(scripts),
+            categories=list(categories),
+        )
+
+    def to_unspents(self) -> list[Unspent]:
+        """
+        :returns: The unspents of the table, e.g. to pass to
+                  :func:`~bitcash.transaction.sanitize_tx_data`.
+        """
+        capabilities = [capability.name for capability in NFTCapability]
+        txids = self.txid.tobytes().hex()
+        step = 2 * TXID_SIZE
+        return [
+            Unspent(
+                amount,
+                confirmations,
+                self.scripts[script],
+                txids[i * step : (i + 1) * step],
+                txindex,
+                None if category == NO_INDEX else self.categories[category],
+                None if capability == NO_INDEX else capabilities[capability],
+                commitment,
+                token_amount or None,
+            )
+            for i, (
+                amount,
+                confirmations,
+                txindex,
+                script,
+                category,
+                token_amount,
+                capability,
+                commitment,
+            ) in enumerate(
+                zip(
+                    self.amount.tolist(),
+                    self.confirmations.tolist(),
+                    self.txindex.tolist(),
+                    self.script.tolist(),
+                    self.category.tolist(),
+                    self.token_amount.tolist(),
+                    self.nft_capability.tolist(),
+                    self.nft_commitment.tolist(),
+                )
+            )
+        ]
+
+    @property
+    def has_token(self):
+        """Boolean array of the unspents carrying cashtokens."""
+        return self.category != NO_INDEX
+
+    def filter(
+        self,
+        min_confirmations: Optional[int] = None,
+        has_token: Optional[bool] = None,
+        min_amount: Optional[int] = None,
+    ) -> UnspentTable:
+        """
+        Selects the unspents matching every given condition.
+
+        :param min_confirmations: Minimum number of confirmations.
+        :param has_token: Whether the unspents carry cashtokens.
+        :param min_amount: Minimum amount in satoshi, e.g. to leave out
+                           unspents that cost more in fee than they are worth.
+        :returns: A table of the matching unspents, in the same order.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if min_confirmations is not None:
+            mask &= self.confirmations >= min_confirmations
+        if has_token is not None:
+            mask &= self.has_token == has_token
+        if min_amount is not None:
+            mask &= self.amount >= min_amount
+        return self[mask]
+
+    def sum(self) -> int:
+        """:returns: The total amount in satoshi."""
+        return int(self.amount.sum())
+
+    def top_k(self, k: int) -> UnspentTable:
+        """
+        Selects the unspents with the largest amounts.
+
+        :param k: Number of unspents to select.
+        :returns: A table of the ``k`` largest unspents, largest first. Equal
+                  amounts keep their order in the table.
+        """
+        if k <= 0:
+            return self[np.empty(0, dtype=np.intp)]
+        if k < len(self):
+            # partition to find the k-th largest amount, then sort only the
+            # unspents above it and the first ones equal to it
+            kth = np.partition(self.amount, len(self) - k)[len(self) - k]
+            larger = np.flatnonzero(self.amount > kth)
+            equal = np.flatnonzero(self.amount == kth)[: k - len(larger)]
+            indices = np.sort(np.concatenate((larger, equal)))
+        else:
+            indices = np.arange(len(self))
+        order = np.argsort(-self.amount[indices], kind="stable")
+        return self[indices[order]]
+
+    def __getitem__(self, key) -> UnspentTable:
+        """
+        :param key: A slice, an array of indices or a boolean mask.
+        :returns: A table of the selected rows, sharing the scripts and
+                  categories of this table.
+        """
+        return UnspentTable(
+            amount=self.amount[key],
+            confirmations=self.confirmations[key],
+            txid=self.txid[key],
+            txindex=self.txindex[key],
+            script=self.script[key],
+            category=self.category[key],
+            token_amount=self.token_amount[key],
+            nft_capability=self.nft_capability[key],
+            nft_commitment=self.nft_commitment[key],
+            scripts=self.scripts,
+            categories=self.categories,
+        )
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    def __repr__(self) -> str:
+        return f"<UnspentTable: {len(self)} unspents, {self.sum()} satoshi>"
@@ -3,7 +3,7 @@ import functools
 from io import BytesIO
 import time
 from binascii import hexlify
-from typing import Generator, Literal, Union
+from typing import Generator, Literal, Optional, Union
 
 
 class Decimal(decimal.Decimal):
@@ -75,6 +75,67 @@ def varint_to_int(val: BytesIO) -> int:
     return int.from_bytes(start_byte, "little")
 
 
+# OP_TOKENPREFIX and the bits of the token bitfield that follows the category
+TOKEN_PREFIX = 0xEF
+TOKEN_HAS_COMMITMENT_LENGTH = 0x40
+TOKEN_HAS_NFT = 0x20
+TOKEN_HAS_AMOUNT = 0x10
+TOKEN_CAPABILITY_MASK = 0x0F
+
+
+def _read_prefix_varint(
+    script: Union[bytes, memoryview], offset: int
+) -> tuple[int, int]:
+    if offset >= len(script):
+        raise ValueError("Token prefix ends unexpectedly")
+    prefix = script[offset]
+    if prefix < 0xFD:
+        return prefix, offset + 1
+    size = 2 if prefix == 0xFD else 4 if prefix == 0xFE else 8
+    end = offset + 1 + size
+    if end > len(script):
+        raise ValueError("Token prefix ends unexpectedly")
+    return int.from_bytes(script[offset + 1 : end], "little"), end
+
+
+def split_cashtoken_prefix(
+    script: Union[bytes, memoryview], offset: int = 0
+) -> tuple[Optional[bytes], int, Optional[bytes], Optional[int], int]:
+    """
+    Reads the cashtoken prefix at the start of a locking script.
+
+    The token bitfield is decoded with bit masks and the script is sliced in
+    place, so a ``memoryview`` of a serialized transaction can be passed
+    without copying it.
+
+    :param script: The locking script.
+    :param offset: Position of the prefix in ``script``.
+    :returns: The category id bytes in serialized order (``None`` without a
+              prefix), the token bitfield, the NFT commitment, the token
+              amount and the position following the prefix.
+    :raises ValueError: If the script ends within the prefix.
+    """
+    if offset >= len(script) or script[offset] != TOKEN_PREFIX:
+        return None, 0, None, None, offset
+
+    offset += 34
+    if offset > len(script):
+        raise ValueError("Token prefix ends unexpectedly")
+    category = bytes(script[offset - 33 : offset - 1])
+    bitfield = script[offset - 1]
+    nft_commitment = None
+    token_amount = None
+    if bitfield & TOKEN_HAS_COMMITMENT_LENGTH:
+        length, offset = _read_prefix_varint(script, offset)
+        if offset + length > len(script):
+            raise ValueError("Token prefix ends unexpectedly")
+        nft_commitment = bytes(script[offset : offset + length])
+        offset += length
+    if bitfield & TOKEN_HAS_AMOUNT:
+        token_amount, offset = _read_prefix_varint(script, offset)
+    return category, bitfield, nft_commitment, token_amount, offset
+
+
 def time_cache(max_age: int, cache_size: int = 32):
     """
     Timed cache decorator to store a value until time-to-live
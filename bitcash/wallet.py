@@ -3,8 +3,13 @@ from __future__ import annotations
 import json
 from typing import Callable, Literal, Optional, Sequence, Union
 
-from bitcash.cashtoken import Unspents
-from bitcash.crypto import ECPrivateKey
+from bitcash.crypto import (
+    ECPrivateKey,
+    ecdsa_sign_low_r,
+    schnorr_sign,
+    schnorr_verify,
+    sha256,
+)
 from bitcash.curve import Point
 from bitcash.format import (
     address_to_cashtokenaddress,
@@ -14,12 +19,25 @@ from bitcash.format import (
     public_key_to_coords,
     wif_to_bytes,
 )
+from bitcash.ledger import UnspentLedger
 from bitcash.network import NetworkAPI, satoshi_to_currency_cached
 from bitcash.network.APIs import SubscriptionHandle
 from bitcash.network.meta import Unspent
 from bitcash.op import OpCodes
-from bitcash.transaction import calc_txid, create_p2pkh_transaction, sanitize_tx_data
-from bitcash.types import Network, PreparedOutput, TokenData, UserOutput
+from bitcash.transaction import (
+    create_p2pkh_transaction,
+    create_p2pkh_transaction_bytes,
+    sanitize_tx_data,
+)
+from bitcash.types import (
+    Network,
+    PreparedOutput,
+    SelectionStrategy,
+    SignatureType,
+    TokenData,
+    UserOutput,
+)
+from bitcash.utils import bytes_to_hex
 
 DEFAULT_FEE = 1
 
@@ -88,17 +106,47 @@ class BaseKey:
             self._public_point = Point(*public_key_to_coords(self._public_key))
         return self._public_point
 
-    def sign(self, data: bytes) -> bytes:
+    def sign(self, data: bytes, low_r: bool = False) -> bytes:
         """Signs some data which can be verified later by others using
         the public key.
 
         :param data: The message to sign.
         :type data: ``bytes``
+        :param low_r: Whether to grind the nonce until the signature's R value
+                      fits in 32 bytes, so the DER signature is at most 70
+                      bytes long. Signatures stay deterministic.
+        :type low_r: ``bool``
         :returns: A signature compliant with BIP-62.
         :rtype: ``bytes``
         """
+        if low_r:
+            return ecdsa_sign_low_r(self._pk, data)
         return self._pk.sign(data)
 
+    def sign_schnorr(self, data: bytes) -> bytes:
+        """Signs some data with a Bitcoin Cash Schnorr signature. Like
+        :func:`~bitcash.wallet.BaseKey.sign`, the data is hashed with SHA-256
+        first.
+
+        :param data: The message to sign.
+        :type data: ``bytes``
+        :returns: A 64 byte Schnorr signature.
+        :rtype: ``bytes``
+        """
+        return schnorr_sign(self._pk.secret, sha256(data))
+
+    def verify_schnorr(self, signature: bytes, data: bytes) -> bool:
+        """Verifies some data was signed by this private key with a Schnorr
+        signature.
+
+        :param signature: The signature to verify.
+        :type signature: ``bytes``
+        :param data: The data that was supposedly signed.
+        :type data: ``bytes``
+        :rtype: ``bool``
+        """
+        return schnorr_verify(signature, sha256(data), self._public_key)
+
     def verify(self, signature: bytes, data: bytes) -> bool:
         """Verifies some data was signed by this private key.
 
@@ -166,6 +214,7 @@ class PrivateKey(BaseKey):
         self.balance: int = 0
         self.cashtoken_balance: dict[str, TokenData] = {}
         self.unspents: list[Unspent] = []
+        self.ledger = UnspentLedger()
         self.transactions: list[str] = []
 
     @property
@@ -236,12 +285,16 @@ class PrivateKey(BaseKey):
 
         :rtype: ``list`` of :class:`~bitcash.network.meta.Unspent`
         """
-        self.unspents[:] = NetworkAPI.get_unspent(
-            self.address, network=self._network.value
+        self.ledger.sync(
+            NetworkAPI.get_unspent(self.address, network=self._network.value)
         )
-        processed_unspents = Unspents(self.unspents)
-        self.balance = processed_unspents.amount
-        self.cashtoken_balance = processed_unspents.tokendata
+        self.unspents[:] = self.ledger
+        self.balance = self.ledger.balance
+        # the ledger updates its balance in place, hand out a copy
+        self.cashtoken_balance = {
+            category_id: tokendata.copy()
+            for category_id, tokendata in self.ledger.cashtoken_balance.items()
+        }
         return self.unspents
 
     def get_transactions(self) -> list[str]:
@@ -263,6 +316,11 @@ class PrivateKey(BaseKey):
         message: Union[bytes, str, None] = None,
         unspents: Optional[list[Unspent]] = None,
         custom_pushdata: bool = False,
+        workers: Optional[int] = None,
+        exact_fee: bool = False,
+        low_r: bool = False,
+        sig_type: SignatureType = "ecdsa",
+        coin_selection: SelectionStrategy = "smallest",
     ) -> str:  # pragma: no cover
         """Creates a signed P2PKH transaction.
 
@@ -303,10 +361,63 @@ class PrivateKey(BaseKey):
         :param unspents: The UTXOs to use as the inputs. By default Bitcash will
                          communicate with the blockchain itself.
         :type unspents: ``list`` of :class:`~bitcash.network.meta.Unspent`
+        :param workers: The number of threads used to sign the inputs. By
+                        default inputs are signed sequentially.
+        :type workers: ``int``
+        :param exact_fee: Whether the fee is computed from the exact size of
+                          the transaction instead of a per-input estimate.
+        :type exact_fee: ``bool``
+        :param low_r: Whether to grind signatures to a low R value, which
+                      makes every signature at most 71 bytes long.
+        :type low_r: ``bool``
+        :param sig_type: The signature algorithm of the inputs, ``"ecdsa"`` or
+                         ``"schnorr"``. Schnorr signatures are smaller, which
+                         lowers the fee.
+        :type sig_type: ``str``
+        :param coin_selection: How UTXOs are selected when ``combine`` is
+                               ``False``. ``"smallest"`` spends the smallest
+                               UTXOs first. ``"bnb"`` looks for UTXOs that
+                               need no change output, which keeps
+                               transactions small and the wallet from
+                               fragmenting.
+        :type coin_selection: ``str``
         :returns: The signed transaction as hex.
         :rtype: ``str``
         """
 
+        tx, _ = self._create_transaction_bytes(
+            outputs,
+            fee=fee,
+            leftover=leftover,
+            combine=combine,
+            message=message,
+            unspents=unspents,
+            custom_pushdata=custom_pushdata,
+            workers=workers,
+            exact_fee=exact_fee,
+            low_r=low_r,
+            sig_type=sig_type,
+            coin_selection=coin_selection,
+        )
+
+        return bytes_to_hex(tx)
+
+    def _create_transaction_bytes(
+        self,
+        outputs: Sequence[UserOutput],
+        fee: Optional[int] = None,
+        leftover: Optional[str] = None,
+        combine: bool = True,
+        message: Union[bytes, str, None] = None,
+        unspents: Optional[list[Unspent]] = None,
+        custom_pushdata: bool = False,
+        workers: Optional[int] = None,
+        exact_fee: bool = False,
+        low_r: bool = False,
+        sig_type: SignatureType = "ecdsa",
+        coin_selection: SelectionStrategy = "smallest",
+    ) -> tuple[bytes, str]:  # pragma: no cover
+        """Creates a signed P2PKH transaction as bytes, with its txid."""
         unspents, prepared_outputs = sanitize_tx_data(
             unspents or self.get_unspents(),
             outputs,
@@ -316,9 +427,20 @@ class PrivateKey(BaseKey):
             message=message,
             compressed=self.is_compressed(),
             custom_pushdata=custom_pushdata,
+            exact_fee=exact_fee,
+            low_r=low_r,
+            sig_type=sig_type,
+            coin_selection=coin_selection,
         )
 
-        return create_p2pkh_transaction(self, unspents, prepared_outputs)
+        return create_p2pkh_transaction_bytes(
+            self,
+            unspents,
+            prepared_outputs,
+            workers=workers,
+            low_r=low_r,
+            sig_type=sig_type,
+        )
 
     def send(
         self,
@@ -328,6 +450,8 @@ class PrivateKey(BaseKey):
         combine: bool = True,
         message: Union[bytes, str, None] = None,
         unspents: Optional[list[Unspent]] = None,
+        low_r: bool = False,
+        sig_type: SignatureType = "ecdsa",
     ):  # pragma: no cover
         """Creates a signed P2PKH transaction and attempts to broadcast it on
         the blockchain. This accepts the same arguments as
@@ -370,22 +494,32 @@ class PrivateKey(BaseKey):
         :param unspents: The UTXOs to use as the inputs. By default Bitcash will
                          communicate with the blockchain itself.
         :type unspents: ``list`` of :class:`~bitcash.network.meta.Unspent`
+        :param low_r: Whether to grind signatures to a low R value, which
+                      makes each input a byte smaller and lowers the fee.
+        :type low_r: ``bool``
+        :param sig_type: The signature algorithm of the inputs, ``"ecdsa"`` or
+                         ``"schnorr"``. Schnorr signatures are smaller, which
+                         lowers the fee.
+        :type sig_type: ``str``
         :returns: The transaction ID.
         :rtype: ``str``
         """
 
-        tx_hex = self.create_transaction(
+        tx, txid = self._create_transaction_bytes(
             outputs,
             fee=fee,
             leftover=leftover,
             combine=combine,
             message=message,
             unspents=unspents,
+            low_r=low_r,
+            sig_type=sig_type,
         )
 
-        NetworkAPI.broadcast_tx(tx_hex, network=self._network.value)
+        # hex is only needed by the broadcasting endpoints
+        NetworkAPI.broadcast_tx(bytes_to_hex(tx), network=self._network.value)
 
-        return calc_txid(tx_hex)
+        return txid
 
     @classmethod
     def prepare_transaction(
@@ -398,6 +532,10 @@ class PrivateKey(BaseKey):
         combine: bool = True,
         message: Union[bytes, str, None] = None,
         unspents: Optional[list[Unspent]] = None,
+        exact_fee: bool = False,
+        low_r: bool = False,
+        sig_type: SignatureType = "ecdsa",
+        coin_selection: SelectionStrategy = "smallest",
     ):  # pragma: no cover
         """Prepares a P2PKH transaction for offline signing.
 
@@ -443,6 +581,20 @@ class PrivateKey(BaseKey):
         :param unspents: The UTXOs to use as the inputs. By default Bitcash will
                          communicate with the blockchain itself.
         :type unspents: ``list`` of :class:`~bitcash.network.meta.Unspent`
+        :param exact_fee: Whether the fee is computed from the exact size of
+                          the transaction instead of a per-input estimate.
+        :type exact_fee: ``bool``
+        :param low_r: Whether the inputs will be signed with low R signatures,
+                      see :func:`~bitcash.PrivateKey.sign_transaction`. This
+                      influences the fee.
+        :type low_r: ``bool``
+        :param sig_type: The signature algorithm that will sign the inputs,
+                         ``"ecdsa"`` or ``"schnorr"``. This influences the fee.
+        :type sig_type: ``str``
+        :param coin_selection: How UTXOs are selected when ``combine`` is
+                               ``False``, ``"smallest"`` or ``"bnb"``. See
+                               :meth:`~bitcash.PrivateKey.create_transaction`.
+        :type coin_selection: ``str``
         :returns: JSON storing data required to create an offline transaction.
         :rtype: ``str``
         """
@@ -454,6 +606,10 @@ class PrivateKey(BaseKey):
             combine=combine,
             message=message,
             compressed=compressed,
+            exact_fee=exact_fee,
+            low_r=low_r,
+            sig_type=sig_type,
+            coin_selection=coin_selection,
         )
 
         serialized_outputs = [
@@ -466,12 +622,29 @@ class PrivateKey(BaseKey):
 
         return json.dumps(data, separators=(",", ":"))
 
-    def sign_transaction(self, tx_data: str) -> str:  # pragma: no cover
+    def sign_transaction(
+        self,
+        tx_data: str,
+        workers: Optional[int] = None,
+        low_r: bool = False,
+        sig_type: SignatureType = "ecdsa",
+    ) -> str:  # pragma: no cover
         """Creates a signed P2PKH transaction using previously prepared
         transaction data.
 
         :param tx_data: Output of :func:`~bitcash.PrivateKey.prepare_transaction`.
         :type tx_data: ``str``
+        :param workers: The number of threads used to sign the inputs. By
+                        default inputs are signed sequentially.
+        :type workers: ``int``
+        :param low_r: Whether to grind signatures to a low R value. It should
+                      match the one given to
+                      :func:`~bitcash.PrivateKey.prepare_transaction`.
+        :type low_r: ``bool``
+        :param sig_type: The signature algorithm of the inputs, ``"ecdsa"`` or
+                         ``"schnorr"``. It should match the one given to
+                         :func:`~bitcash.PrivateKey.prepare_transaction`.
+        :type sig_type: ``str``
         :returns: The signed transaction as hex.
         :rtype: ``str``
         """
@@ -483,7 +656,9 @@ class PrivateKey(BaseKey):
             PreparedOutput.from_serializable(output) for output in serialized_outputs
         ]
 
-        return create_p2pkh_transaction(self, unspents, outputs)
+        return create_p2pkh_transaction(
+            self, unspents, outputs, workers=workers, low_r=low_r, sig_type=sig_type
+        )
 
     def subscribe(
         self, callback: Callable[[str, str | None], None], update_self: bool = False
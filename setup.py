@@ -48,10 +48,11 @@ setup(
         "Programming Language :: Python :: Implementation :: CPython",
         "Programming Language :: Python :: Implementation :: PyPy",
     ],
-    install_requires=["coincurve>=4.3.0", "requests"],
+    install_requires=["coincurve>=5.2.0", "requests"],
     extras_require={
         "cli": ("appdirs", "click", "privy", "tinydb"),
         "cache": ("lmdb",),
+        "numpy": ("numpy",),
     },
     tests_require=["pytest"],
     packages=find_packages(),
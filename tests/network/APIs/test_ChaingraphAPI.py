@@ -221,7 +221,17 @@ class TestChaingraphAPI:
         }
 
         monkeypatch.setattr(_capi, "session", DummySession(return_json))
+        # the scripts of the inputs and outputs are converted at once
+        calls = []
+        original = _capi.scripts_to_addresses
+
+        def scripts_to_addresses(scripts, network):
+            calls.append(scripts)
+            return original(scripts, network)
+
+        monkeypatch.setattr(_capi, "scripts_to_addresses", scripts_to_addresses)
         transaction = self.api.get_transaction(BITCOIN_CASHADDRESS_CATKN)
+        assert [len(scripts) for scripts in calls] == [5]
         tx = Transaction(
             "446f83e975d2870de740917df1b5221aa4bc52c6e2540188f5897c4ce775b7f4",
             792781,
@@ -1,9 +1,14 @@
+import json
 import pytest
+import socket
 import threading
 import time
 from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
+from requests.exceptions import ConnectTimeout
+
+from bitcash.exceptions import BatchError, InvalidEndpointResponse
 from bitcash.network.APIs import FulcrumProtocolAPI as _fapi
 from bitcash.network.APIs import SubscriptionHandle
 from bitcash.network.transaction import Transaction, TxPart
@@ -18,6 +23,27 @@ def dummy_handshake(hostname: str, port: int, timeout: float):
     return "dummy_socket"
 
 
+class DummyConnection:
+    # sends each request through send_json_rpc_payload, patched by the tests
+    closed = False
+    in_flight = 0
+
+    def __init__(self, sock):
+        self.sock = sock
+
+    def call(self, method, params, timeout=None):
+        return _fapi.send_json_rpc_payload(self.sock, method, params)
+
+    def call_batch(self, calls, timeout=None, batch_size=None, return_exceptions=False):
+        results = []
+        for method, params in calls:
+            try:
+                results.append(self.call(method, params))
+            except InvalidEndpointResponse as e:
+                results.append(e)
+        return results
+
+
 class DummySendPayload:
     def __init__(self, return_result):
         self.return_result = return_result
@@ -30,6 +56,8 @@ class TestFulcrumProtolAPI:
     @pytest.fixture(autouse=True)
     def setup(self, monkeypatch):
         monkeypatch.setattr(_fapi, "handshake", dummy_handshake)
+        monkeypatch.setattr(_fapi, "JsonRpcConnection", DummyConnection)
+        monkeypatch.setattr(_fapi, "_pools", {})
         self.api = FulcrumProtocolAPI("dummy.com:50002")
         self.monkeypatch = monkeypatch
 
@@ -434,6 +462,406 @@ class TestFulcrumProtolAPI:
         )
         assert tx == {"dummy": "dummy"}
 
+    def test_batch(self):
+        history = [
+            {"height": 1, "tx_hash": "aa"},
+            {"height": 2, "tx_hash": "bb"},
+        ]
+        utxo = {"height": 800_000, "tx_hash": "cc", "tx_pos": 1, "value": 1000}
+
+        def send_payload(sock, method, params):
+            if method == "blockchain.address.get_balance":
+                return {"confirmed": len(params[0]), "unconfirmed": 1}
+            if method == "blockchain.transaction.get":
+                return {"txid": params[0]}
+            return {
+                "blockchain.address.get_history": history,
+                "blockchain.address.listunspent": [utxo],
+                "blockchain.headers.get_tip": {"height": 800_009},
+            }[method]
+
+        self.monkeypatch.setattr(_fapi, "send_json_rpc_payload", send_payload)
+        addresses = [BITCOIN_CASHADDRESS_CATKN, BITCOIN_CASHADDRESS_CATKN[:-1]]
+        assert self.api.get_balance_batch(addresses) == [
+            len(addresses[0]) + 1,
+            len(addresses[1]) + 1,
+        ]
+        assert self.api.get_transactions_batch(addresses) == [["bb", "aa"]] * 2
+        assert self.api.get_unspent_batch(addresses[:1]) == [
+            [Unspent(1000, 10, _SCRIPT, "cc", 1)]
+        ]
+        assert self.api.get_raw_transaction_batch(["dd", "ee"]) == [
+            {"txid": "dd"},
+            {"txid": "ee"},
+        ]
+        assert self.api.get_balance_batch([]) == []
+
+    def test_batch_error(self):
+        utxo = {"height": 0, "tx_hash": "cc", "tx_pos": 1, "value": 1000}
+
+        def send_payload(sock, method, params):
+            if method == "blockchain.headers.get_tip":
+                return {"height": 800_009}
+            if params[0] == "invalid":
+                raise InvalidEndpointResponse("Error in returned json: invalid")
+            return [utxo]
+
+        self.monkeypatch.setattr(_fapi, "send_json_rpc_payload", send_payload)
+        # the other addresses are still parsed
+        with pytest.raises(BatchError) as excinfo:
+            self.api.get_unspent_batch(
+                [BITCOIN_CASHADDRESS_CATKN, "invalid", BITCOIN_CASHADDRESS_CATKN]
+            )
+        first, error, last = excinfo.value.results
+        assert first == last == [Unspent(1000, 0, _SCRIPT, "cc", 1)]
+        assert isinstance(error, InvalidEndpointResponse)
+
+
+def read_request(sock) -> dict:
+    data = b""
+    while not data.endswith(b"\n"):
+        data += sock.recv(1)
+    return json.loads(data)
+
+
+def respond(sock, request_id, result) -> None:
+    response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+    sock.sendall(json.dumps(response).encode() + b"\n")
+
+
+class TestLineReader:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.client, self.server = socket.socketpair()
+        yield
+        self.client.close()
+        self.server.close()
+
+    def test_several_lines_in_one_read(self):
+        reader = _fapi.LineReader(self.client)
+        self.server.sendall(b'{"id": 1}\n{"id": 2}\n\n{"id"')
+        assert reader.readline() == '{"id": 1}'
+        assert reader.readline() == '{"id": 2}'
+        assert reader.readline() == ""
+        self.server.sendall(b": 3}\n")
+        assert reader.readline() == '{"id": 3}'
+
+    def test_line_across_reads(self):
+        reader = _fapi.LineReader(self.client, recv_size=7)
+        message = json.dumps({"result": "ab" * 10_000, "text": "\u00e9"})
+        self.server.sendall(message.encode() + b"\n" + message.encode() + b"\n")
+        self.server.close()
+        assert list(reader) == [message, message]
+        assert reader.readline() is None
+
+    def test_send_json_rpc_payload(self):
+        notification = {"jsonrpc": "2.0", "method": "notify", "params": []}
+        response = {"jsonrpc": "2.0", "id": "bitcash", "result": 1.5}
+        self.server.sendall(
+            json.dumps(notification).encode() + b"\n" + json.dumps(response).encode()
+        )
+        self.server.sendall(b"\n")
+        result = _fapi.send_json_rpc_payload(self.client, "method", [])
+        assert result == Decimal("1.5")
+        assert read_request(self.server)["method"] == "method"
+
+        self.server.shutdown(socket.SHUT_WR)
+        with pytest.raises(ConnectTimeout):
+            _fapi.send_json_rpc_payload(self.client, "method", [])
+
+
+class TestJsonRpcConnection:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.client, self.server = socket.socketpair()
+        self.connection = _fapi.JsonRpcConnection(self.client)
+        yield
+        self.connection.close()
+        self.server.close()
+
+    def test_unique_ids(self):
+        futures = [self.connection.request("method", [i]) for i in range(3)]
+        requests = [read_request(self.server) for _ in range(3)]
+        assert len({request["id"] for request in requests}) == 3
+        # responses are dispatched by id, in any order
+        for request in reversed(requests):
+            respond(self.server, request["id"], request["params"][0] * 10)
+        assert [future.result(1) for future in futures] == [0, 10, 20]
+
+    def test_concurrent_calls(self):
+        results = {}
+
+        def call(i):
+            results[i] = self.connection.call("method", [i], timeout=2)
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        # every request is sent before any response
+        requests = [read_request(self.server) for _ in range(5)]
+        for request in requests:
+            respond(self.server, request["id"], request["params"][0])
+        for thread in threads:
+            thread.join()
+        assert results == {i: i for i in range(5)}
+
+    def test_error_response(self):
+        future = self.connection.request("method", [])
+        request = read_request(self.server)
+        response = {"jsonrpc": "2.0", "id": request["id"], "error": "bad"}
+        self.server.sendall(json.dumps(response).encode() + b"\n")
+        with pytest.raises(InvalidEndpointResponse):
+            future.result(1)
+
+    def test_notification(self):
+        received = []
+        self.connection.on_notification = lambda *message: received.append(message)
+        future = self.connection.request("method", [])
+        notification = {"jsonrpc": "2.0", "method": "notify", "params": [1]}
+        self.server.sendall(json.dumps(notification).encode() + b"\n")
+        respond(self.server, read_request(self.server)["id"], "done")
+        assert future.result(1) == "done"
+        assert received == [("notify", [1])]
+
+    def test_timeout(self):
+        with pytest.raises(TimeoutError):
+            self.connection.call("method", [], timeout=0.05)
+        assert not self.connection._pending
+
+    def test_timeout_restarts_on_data(self):
+        def respond_slowly():
+            request = read_request(self.server)
+            response = json.dumps(
+                {"jsonrpc": "2.0", "id": request["id"], "result": "ab" * 1000}
+            ).encode()
+            # the response takes longer than the timeout, but data keeps
+            # arriving
+            for i in range(0, len(response), len(response) // 5):
+                self.server.sendall(response[i : i + len(response) // 5])
+                time.sleep(0.1)
+            self.server.sendall(b"\n")
+
+        thread = threading.Thread(target=respond_slowly)
+        thread.start()
+        assert self.connection.call("method", [], timeout=0.3) == "ab" * 1000
+        thread.join()
+
+    def test_batch(self):
+        futures = self.connection.request_batch([("method", [i]) for i in range(3)])
+        requests = read_request(self.server)
+        assert isinstance(requests, list) and len(requests) == 3
+        # the batch may be answered in any order
+        responses = [
+            {"jsonrpc": "2.0", "id": request["id"], "result": request["params"][0]}
+            for request in reversed(requests)
+        ]
+        self.server.sendall(json.dumps(responses).encode() + b"\n")
+        assert [future.result(1) for future in futures] == [0, 1, 2]
+        assert self.connection.request_batch([]) == []
+
+    def test_call_batch(self):
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(
+                self.connection.call_batch(
+                    [("method", [i]) for i in range(5)], timeout=2, batch_size=2
+                )
+            )
+        )
+        thread.start()
+        # every batch is sent before any response
+        batches = [read_request(self.server) for _ in range(3)]
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        for batch in batches:
+            responses = [
+                {"jsonrpc": "2.0", "id": request["id"], "result": request["params"][0]}
+                for request in batch
+            ]
+            self.server.sendall(json.dumps(responses).encode() + b"\n")
+        thread.join()
+        assert results == [[0, 1, 2, 3, 4]]
+        assert not self.connection._pending
+
+    def test_call_batch_error(self):
+        errors = []
+        results = []
+
+        def call_batch():
+            calls = [("method", [i]) for i in range(3)]
+            try:
+                self.connection.call_batch(calls, 2, batch_size=2)
+            except BatchError as e:
+                errors.append(e)
+            results.append(
+                self.connection.call_batch(
+                    calls, 2, batch_size=2, return_exceptions=True
+                )
+            )
+
+        thread = threading.Thread(target=call_batch)
+        thread.start()
+        for _ in range(2):
+            batches = [read_request(self.server) for _ in range(2)]
+            # the error fails its own request, not the rest of its batch
+            for batch in batches:
+                responses = [
+                    (
+                        {"jsonrpc": "2.0", "id": request["id"], "error": "bad"}
+                        if request["params"][0] == 1
+                        else {
+                            "jsonrpc": "2.0",
+                            "id": request["id"],
+                            "result": request["params"][0],
+                        }
+                    )
+                    for request in batch
+                ]
+                self.server.sendall(json.dumps(responses).encode() + b"\n")
+        thread.join()
+        for batch_results in [errors[0].results, results[0]]:
+            assert batch_results[0] == 0 and batch_results[2] == 2
+            assert isinstance(batch_results[1], InvalidEndpointResponse)
+        assert not self.connection._pending
+
+    def test_call_batch_timeout(self):
+        with pytest.raises(TimeoutError):
+            self.connection.call_batch([("method", [])] * 3, timeout=0.05)
+        assert not self.connection._pending
+
+    def test_closed(self):
+        future = self.connection.request("method", [])
+        self.server.close()
+        with pytest.raises(ConnectTimeout):
+            future.result(1)
+        assert self.connection.closed
+        with pytest.raises(ConnectTimeout):
+            self.connection.request("method", [])
+
+
+def serve(server, result=None):
+    request = read_request(server)
+    respond(server, request["id"], result)
+
+
+class TestConnectionPool:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.pairs = []
+        self.monkeypatch = monkeypatch
+        monkeypatch.setattr(_fapi, "handshake", self.handshake)
+        monkeypatch.setattr(_fapi, "_pools", {})
+        self.pool = _fapi.ConnectionPool("dummy.com", 50002, size=2)
+        yield
+        self.pool.close()
+        for _, server in self.pairs:
+            server.close()
+
+    def handshake(self, hostname, port, timeout):
+        self.pairs.append(socket.socketpair())
+        return self.pairs[-1][0]
+
+    def test_reuses_idle_connection(self):
+        connection = self.pool.get()
+        assert self.pool.get() is connection
+        assert len(self.pairs) == 1
+
+    def test_opens_connections_while_busy(self):
+        first = self.pool.get()
+        first.request("method", [])
+        second = self.pool.get()
+        assert second is not first
+        # the pool is full, the least busy connection is shared
+        second.request("method", [])
+        second.request("method", [])
+        assert self.pool.get() is first
+        assert len(self.pool) == len(self.pairs) == 2
+
+    def test_idle_eviction(self):
+        self.pool.idle_timeout = 0
+        connection = self.pool.get()
+        assert self.pool.get() is not connection
+        assert connection.closed
+        assert len(self.pool) == 1
+
+    def test_replaces_closed_connection(self):
+        connection = self.pool.get()
+        self.pairs[0][1].close()
+        with pytest.raises(ConnectTimeout):
+            connection.call("method", [], timeout=1)
+        assert self.pool.get() is not connection
+        assert len(self.pairs) == 2
+
+    def test_ping(self):
+        self.pool.ping_interval = 0
+        connection = self.pool.get()
+        thread = threading.Thread(target=serve, args=(self.pairs[0][1],))
+        thread.start()
+        assert self.pool.get() is connection
+        thread.join()
+
+        # a connection that does not answer the ping is replaced
+        self.pool.timeout = 0.05
+        assert self.pool.get() is not connection
+        assert connection.closed
+
+    def test_reconnect_backoff(self):
+        def handshake(hostname, port, timeout):
+            raise OSError("refused")
+
+        self.monkeypatch.setattr(_fapi, "handshake", handshake)
+        with pytest.raises(OSError, match="refused"):
+            self.pool.get()
+        # no new handshake until the backoff has passed
+        with pytest.raises(ConnectTimeout):
+            self.pool.get()
+        first_retry = self.pool._retry_at
+        self.pool._retry_at = 0.0
+        with pytest.raises(OSError, match="refused"):
+            self.pool.get()
+        assert self.pool._retry_at - first_retry > _fapi.RECONNECT_BACKOFF
+
+        self.monkeypatch.setattr(_fapi, "handshake", self.handshake)
+        self.pool._retry_at = 0.0
+        self.pool.get()
+        assert self.pool._failures == 0
+
+    def test_shared_by_endpoint(self):
+        api = FulcrumProtocolAPI("dummy.com:50002")
+        assert FulcrumProtocolAPI("dummy.com:50002").pool is api.pool
+        assert FulcrumProtocolAPI("other.com:50002").pool is not api.pool
+        assert FulcrumProtocolAPI("dummy.com:50002", pool=self.pool).pool is self.pool
+
+
+def test_send_rpc_pooled_connection(monkeypatch):
+    pairs = []
+
+    def handshake(hostname, port, timeout):
+        pairs.append(socket.socketpair())
+        return pairs[-1][0]
+
+    monkeypatch.setattr(_fapi, "handshake", handshake)
+    monkeypatch.setattr(_fapi, "_pools", {})
+    api = FulcrumProtocolAPI("dummy.com:50002")
+    try:
+        thread = threading.Thread(target=lambda: serve(pairs[0][1], {"height": 1}))
+        api.pool.get()
+        thread.start()
+        assert api.get_blockheight() == 1
+        thread.join()
+        assert len(pairs) == 1
+
+        # a closed connection is replaced and the request retried
+        pairs[0][1].close()
+        threading.Thread(
+            target=lambda: (time.sleep(0.1), serve(pairs[1][1], {"height": 2}))
+        ).start()
+        assert api.get_blockheight() == 2
+        assert len(pairs) == 2
+    finally:
+        api.close()
+        for _, server in pairs:
+            server.close()
+
 
 class TestSubscriptionHandle:
     def test_unsubscribe_calls_stop_callback(self):
@@ -448,146 +876,188 @@ class TestSubscriptionHandle:
         assert stop_called.is_set()
 
 
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def notify(sock, address, status) -> None:
+    notification = {
+        "jsonrpc": "2.0",
+        "method": "blockchain.address.subscribe",
+        "params": [address, status],
+    }
+    sock.sendall(json.dumps(notification).encode() + b"\n")
+
+
 class TestFulcrumSubscription:
     @pytest.fixture(autouse=True)
     def setup(self, monkeypatch):
+        self.pairs = []
         self.monkeypatch = monkeypatch
+        monkeypatch.setattr(_fapi, "handshake", self.handshake)
+        monkeypatch.setattr(_fapi, "_subscription_managers", {})
+        self.api = FulcrumProtocolAPI("dummy.com:50002")
+        self.received = []
+        yield
+        self.api.subscriptions.close()
+        for _, server in self.pairs:
+            server.close()
 
-    def test_subscribe_address_returns_handle(self):
-        """Test that subscribe_address returns a SubscriptionHandle."""
-        # Create a mock socket that simulates the subscription response
-        mock_socket = MagicMock()
-        # Simulate initial subscription response
-        initial_response = (
-            b'{"jsonrpc":"2.0","id":"bitcash-sub","result":"abc123hash"}\n'
-        )
-        mock_socket.recv.return_value = initial_response
-
-        self.monkeypatch.setattr(_fapi, "handshake", lambda h, p, t: mock_socket)
+    def handshake(self, hostname, port, timeout):
+        self.pairs.append(socket.socketpair())
+        return self.pairs[-1][0]
 
-        api = FulcrumProtocolAPI("dummy.com:50002")
-        callback = MagicMock()
+    def callback(self, address, status):
+        self.received.append((address, status))
 
-        handle = api.subscribe_address(BITCOIN_CASHADDRESS_CATKN, callback)
+    def subscribe(self, address, status, server_index=0):
+        handle = self.api.subscribe_address(address, self.callback)
+        server = self.pairs[server_index][1]
+        request = read_request(server)
+        assert request["method"] == "blockchain.address.subscribe"
+        assert request["params"] == [address]
+        respond(server, request["id"], status)
+        return handle
 
+    def test_subscribe_address_returns_handle(self):
+        """Test that subscribe_address returns a SubscriptionHandle."""
+        handle = self.subscribe(BITCOIN_CASHADDRESS_CATKN, "abc123hash")
         assert isinstance(handle, SubscriptionHandle)
-        # Give the thread time to process
-        time.sleep(0.1)
-        handle.unsubscribe()
 
     def test_subscribe_address_callback_receives_initial_status(self):
         """Test that callback receives initial status hash."""
-        mock_socket = MagicMock()
-        initial_response = (
-            b'{"jsonrpc":"2.0","id":"bitcash-sub","result":"abc123hash"}\n'
-        )
-        # Return initial response, then block
-        mock_socket.recv.side_effect = [initial_response, OSError("closed")]
-
-        self.monkeypatch.setattr(_fapi, "handshake", lambda h, p, t: mock_socket)
-
-        api = FulcrumProtocolAPI("dummy.com:50002")
-        received = []
-
-        def callback(address, status):
-            received.append((address, status))
-
-        handle = api.subscribe_address(BITCOIN_CASHADDRESS_CATKN, callback)
-        time.sleep(0.1)
-        handle.unsubscribe()
-        time.sleep(0.1)
+        self.subscribe(BITCOIN_CASHADDRESS_CATKN, "abc123hash")
+        wait_for(lambda: len(self.received) == 1)
+        assert self.received[0] == (BITCOIN_CASHADDRESS_CATKN, "abc123hash")
 
-        # Should have received initial status
-        assert len(received) >= 1
-        assert received[0] == (BITCOIN_CASHADDRESS_CATKN, "abc123hash")
-        assert received[1] == (BITCOIN_CASHADDRESS_CATKN, "error: closed")
+        # the callback is told when the connection closes
+        self.pairs[0][1].close()
+        wait_for(lambda: len(self.received) == 2)
+        assert self.received[1][1].startswith("error: ")
+        assert len(self.api.subscriptions) == 0
 
     def test_subscribe_address_callback_receives_null_status(self):
         """Test that callback handles null status (address with no history)."""
-        mock_socket = MagicMock()
-        # Null result for address with no history
-        initial_response = b'{"jsonrpc":"2.0","id":"bitcash-sub","result":null}\n'
-        mock_socket.recv.side_effect = [initial_response, OSError("closed")]
-
-        self.monkeypatch.setattr(_fapi, "handshake", lambda h, p, t: mock_socket)
-
-        api = FulcrumProtocolAPI("dummy.com:50002")
-        received = []
-
-        def callback(address, status):
-            received.append((address, status))
-
-        handle = api.subscribe_address(BITCOIN_CASHADDRESS_CATKN, callback)
-        time.sleep(0.1)
-        handle.unsubscribe()
-        time.sleep(0.1)
-
-        assert len(received) >= 1
-        assert received[0] == (BITCOIN_CASHADDRESS_CATKN, None)
-        assert received[1] == (BITCOIN_CASHADDRESS_CATKN, "error: closed")
+        self.subscribe(BITCOIN_CASHADDRESS_CATKN, None)
+        wait_for(lambda: len(self.received) == 1)
+        assert self.received[0] == (BITCOIN_CASHADDRESS_CATKN, None)
 
     def test_subscribe_address_receives_notifications(self):
         """Test that callback receives push notifications."""
-        mock_socket = MagicMock()
-        initial_response = b'{"jsonrpc":"2.0","id":"bitcash-sub","result":"hash1"}\n'
-        notification = (
-            b'{"jsonrpc":"2.0","method":"blockchain.address.subscribe","params":["'
-            + BITCOIN_CASHADDRESS_CATKN.encode()
-            + b'","hash2"]}\n'
-        )
-
-        mock_socket.recv.side_effect = [
-            initial_response,
-            notification,
-            OSError("closed"),
+        self.subscribe(BITCOIN_CASHADDRESS_CATKN, "hash1")
+        notify(self.pairs[0][1], BITCOIN_CASHADDRESS_CATKN, "hash2")
+        wait_for(lambda: len(self.received) == 2)
+        assert self.received == [
+            (BITCOIN_CASHADDRESS_CATKN, "hash1"),
+            (BITCOIN_CASHADDRESS_CATKN, "hash2"),
         ]
 
-        self.monkeypatch.setattr(_fapi, "handshake", lambda h, p, t: mock_socket)
+    def test_subscribe_address_unsubscribe_notifies_callback(self):
+        """Test that unsubscribe sends 'unsubscribed' to callback."""
+        handle = self.subscribe(BITCOIN_CASHADDRESS_CATKN, "hash1")
+        wait_for(lambda: len(self.received) == 1)
+        handle.unsubscribe()
+        assert self.received[-1] == (BITCOIN_CASHADDRESS_CATKN, "unsubscribed")
+        # the connection without subscriptions is closed
+        assert self.pairs[0][1].recv(1) == b""
 
-        api = FulcrumProtocolAPI("dummy.com:50002")
-        received = []
+        # unsubscribing again does nothing
+        handle.unsubscribe()
+        assert len(self.received) == 2
 
-        def callback(address, status):
-            received.append((address, status))
+    def test_multiplexed_addresses(self):
+        addresses = [f"bitcoincash:address{i}" for i in range(50)]
+        handles = [self.subscribe(address, address) for address in addresses]
+        wait_for(lambda: len(self.received) == len(addresses))
+        assert len(self.pairs) == 1
+        assert len(self.api.subscriptions) == len(addresses)
 
-        handle = api.subscribe_address(BITCOIN_CASHADDRESS_CATKN, callback)
-        time.sleep(0.2)
-        handle.unsubscribe()
-        time.sleep(0.1)
+        for address in reversed(addresses):
+            notify(self.pairs[0][1], address, "new")
+        wait_for(lambda: len(self.received) == 2 * len(addresses))
+        assert set(self.received[len(addresses) :]) == {
+            (address, "new") for address in addresses
+        }
 
-        assert len(received) >= 2
-        assert received[0] == (BITCOIN_CASHADDRESS_CATKN, "hash1")
-        assert received[1] == (BITCOIN_CASHADDRESS_CATKN, "hash2")
+        # the server is told when one address is unsubscribed
+        handles[0].unsubscribe()
+        request = read_request(self.pairs[0][1])
+        assert request["method"] == "blockchain.address.unsubscribe"
+        assert request["params"] == [addresses[0]]
+        notify(self.pairs[0][1], addresses[0], "ignored")
+        notify(self.pairs[0][1], addresses[1], "newer")
+        wait_for(lambda: self.received[-1] == (addresses[1], "newer"))
+        assert (addresses[0], "ignored") not in self.received
 
-    def test_subscribe_address_unsubscribe_notifies_callback(self):
-        """Test that unsubscribe sends 'unsubscribed' to callback."""
-        mock_socket = MagicMock()
-        initial_response = b'{"jsonrpc":"2.0","id":"bitcash-sub","result":"hash1"}\n'
-        subsequent_response = b'{"jsonrpc":"2.0","id":"bitcash-sub","result":"hash2"}\n'
+    def test_shared_address(self):
+        first = self.subscribe(BITCOIN_CASHADDRESS_CATKN, "hash1")
+        wait_for(lambda: len(self.received) == 1)
+        # a second subscription reuses the subscription of the address and
+        # gets its current status
+        self.api.subscribe_address(BITCOIN_CASHADDRESS_CATKN, self.callback)
+        assert self.received[1] == (BITCOIN_CASHADDRESS_CATKN, "hash1")
 
-        # Block on second recv until shutdown
-        call_count = [0]
+        first.unsubscribe()
+        notify(self.pairs[0][1], BITCOIN_CASHADDRESS_CATKN, "hash2")
+        wait_for(lambda: len(self.received) == 4)
+        assert self.received[2:] == [
+            (BITCOIN_CASHADDRESS_CATKN, "unsubscribed"),
+            (BITCOIN_CASHADDRESS_CATKN, "hash2"),
+        ]
 
-        def recv_side_effect(size: int) -> bytes:
-            call_count[0] += 1
-            if call_count[0] == 1:
-                return initial_response
-            return subsequent_response
+    def test_max_per_connection(self):
+        self.api.subscriptions.max_per_connection = 2
+        for i in range(5):
+            self.subscribe(f"bitcoincash:address{i}", None, server_index=i // 2)
+        assert len(self.pairs) == 3
 
-        mock_socket.recv.side_effect = recv_side_effect
+    def test_concurrent_handshakes(self):
+        # both subscriptions connect at the same time, without the lock
+        barrier = threading.Barrier(2, timeout=2)
 
-        self.monkeypatch.setattr(_fapi, "handshake", lambda h, p, t: mock_socket)
+        def handshake(hostname, port, timeout):
+            barrier.wait()
+            return self.handshake(hostname, port, timeout)
 
-        api = FulcrumProtocolAPI("dummy.com:50002")
-        received = []
+        self.monkeypatch.setattr(_fapi, "handshake", handshake)
+        addresses = ["bitcoincash:address0", "bitcoincash:address1"]
+        threads = [
+            threading.Thread(
+                target=self.api.subscribe_address, args=(address, self.callback)
+            )
+            for address in addresses
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(self.pairs) == 2
 
-        def callback(address, status):
-            received.append((address, status))
+        # the connection opened last is closed, both addresses use the other
+        servers = [server for _, server in self.pairs]
+        for server in servers:
+            server.settimeout(2)
+        kept, closed = sorted(
+            servers, key=lambda server: not server.recv(1, socket.MSG_PEEK)
+        )
+        assert closed.recv(1) == b""
+        for _ in addresses:
+            request = read_request(kept)
+            respond(kept, request["id"], "hash")
+        wait_for(lambda: len(self.received) == 2)
+        assert sorted(self.received) == [(address, "hash") for address in addresses]
+        assert len(self.api.subscriptions) == 2
 
-        handle = api.subscribe_address(BITCOIN_CASHADDRESS_CATKN, callback)
-        time.sleep(0.1)
-        handle.unsubscribe()
-        time.sleep(0.2)
+    def test_callback_error(self):
+        def failing(address, status):
+            raise ValueError("callback failed")
 
-        # Should have received "unsubscribed" notification
-        assert any(status == "unsubscribed" for _, status in received)
+        self.api.subscribe_address("bitcoincash:failing", failing)
+        request = read_request(self.pairs[0][1])
+        respond(self.pairs[0][1], request["id"], "hash")
+        self.subscribe(BITCOIN_CASHADDRESS_CATKN, "hash1")
+        wait_for(lambda: len(self.received) == 1)
+        assert len(self.pairs) == 1
@@ -68,3 +68,33 @@ class TestUnspent:
         assert unspent5 > unspent7
         assert not unspent6 > unspent5
         assert unspent7 > unspent6
+
+    def test_sort_key(self):
+        unspents = [
+            Unspent(30000, 7, "script", "txid", 0, "category_id", token_amount=20),
+            Unspent(10000, 7, "script", "txid", 1, "category_id", "mutable"),
+            Unspent(20000, 7, "script", "txid", 2),
+            Unspent(10000, 7, "script", "txid", 3, "category_id", "none"),
+            Unspent(20000, 7, "script", "txid", 4, "category_id", token_amount=50),
+            Unspent(10000, 7, "script", "txid", 5),
+        ]
+        expected = [5, 2, 0, 4, 3, 1]
+        assert [u.txindex for u in sorted(unspents, key=Unspent.sort_key)] == expected
+        assert [u.txindex for u in sorted(unspents)] == expected
+
+    def test_sort_key_updated(self):
+        unspent = Unspent(10000, 7, "script", "txid", 0)
+        unspent1 = Unspent(20000, 7, "script", "txid", 1)
+        assert unspent1 > unspent
+        unspent.amount = 30000
+        assert unspent > unspent1
+        unspent.cashtoken = unspent.cashtoken._replace(token_amount=1)
+        assert unspent.sort_key()[2] is True
+
+    def test_hash(self):
+        unspent1 = Unspent(10000, 7, "script", "txid", 0)
+        unspent2 = Unspent(10000, 7, "script", "txid", 0)
+        unspent3 = Unspent(10000, 7, "script", "txid", 1)
+        assert len({unspent1, unspent2, unspent3}) == 2
+        assert {unspent1: 1}[unspent2] == 1
+        assert unspent1 != "txid"
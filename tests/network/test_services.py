@@ -6,7 +6,12 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 import bitcash
-from bitcash.exceptions import InvalidEndpointURLProvided
+from bitcash.exceptions import (
+    BatchError,
+    DataNotFound,
+    InvalidEndpointResponse,
+    InvalidEndpointURLProvided,
+)
 from bitcash.network import services as _services
 from bitcash.network.APIs import SubscriptionHandle
 from bitcash.network.APIs.FulcrumProtocolAPI import FulcrumProtocolAPI
@@ -536,6 +541,67 @@ class TestNetworkAPISubscription:
             NetworkAPI.subscribe_address(MAIN_ADDRESS_USED1, callback)
 
 
+class TestNetworkAPIBatch:
+    @patch("bitcash.network.services.get_sanitized_endpoints_for")
+    def test_tries_next_endpoint_on_error(self, mock_get_endpoints):
+        mock_endpoint1 = MagicMock()
+        mock_endpoint1.get_balance_batch.side_effect = TimeoutError()
+        mock_endpoint2 = MagicMock()
+        mock_endpoint2.get_balance_batch.return_value = [1, 2]
+        mock_get_endpoints.return_value = (mock_endpoint1, mock_endpoint2)
+
+        addresses = [MAIN_ADDRESS_USED1, MAIN_ADDRESS_USED2]
+        assert NetworkAPI.get_balance_batch(addresses) == [1, 2]
+        mock_endpoint2.get_balance_batch.assert_called_once_with(
+            addresses, timeout=_services.DEFAULT_TIMEOUT
+        )
+
+    @patch("bitcash.network.services.get_sanitized_endpoints_for")
+    def test_batch_error_not_caught(self, mock_get_endpoints):
+        error = InvalidEndpointResponse("invalid address")
+        mock_endpoint1 = MagicMock()
+        mock_endpoint1.get_balance_batch.side_effect = BatchError(
+            "1 of 2 requests failed", [1, error]
+        )
+        mock_endpoint2 = MagicMock()
+        mock_get_endpoints.return_value = (mock_endpoint1, mock_endpoint2)
+
+        with pytest.raises(BatchError) as excinfo:
+            NetworkAPI.get_balance_batch([MAIN_ADDRESS_USED1, "invalid"])
+        assert excinfo.value.results == [1, error]
+        mock_endpoint2.get_balance_batch.assert_not_called()
+
+    @patch("bitcash.network.services.get_sanitized_endpoints_for")
+    def test_default_raw_transaction_not_found(self, mock_get_endpoints):
+        endpoint = BitcoinDotComAPI("https://dummy.com/v2/")
+        mock_get_endpoints.return_value = (endpoint,)
+
+        def get_raw_transaction(txid, **kwargs):
+            if txid == MAIN_TX2:
+                raise DataNotFound(txid)
+            return {"txid": txid}
+
+        with patch.object(
+            BitcoinDotComAPI, "get_raw_transaction", side_effect=get_raw_transaction
+        ):
+            with pytest.raises(BatchError) as excinfo:
+                NetworkAPI.get_raw_transaction_batch([MAIN_TX, MAIN_TX2])
+        assert excinfo.value.results[0] == {"txid": MAIN_TX}
+        assert isinstance(excinfo.value.results[1], DataNotFound)
+
+    @patch("bitcash.network.services.get_sanitized_endpoints_for")
+    def test_default_queries_one_by_one(self, mock_get_endpoints):
+        endpoint = BitcoinDotComAPI("https://dummy.com/v2/")
+        mock_get_endpoints.return_value = (endpoint,)
+
+        with patch.object(
+            BitcoinDotComAPI, "get_transactions", side_effect=lambda a, **_: [a]
+        ):
+            assert NetworkAPI.get_transactions_batch(
+                [MAIN_ADDRESS_USED1, MAIN_ADDRESS_USED2]
+            ) == [[MAIN_ADDRESS_USED1], [MAIN_ADDRESS_USED2]]
+
+
 CASHTOKEN_CATEGORY = "8473d94f604de351cdee3030f6c354d36b257861ad8e95bbc0a06fbab2a2f9cf"
 
 
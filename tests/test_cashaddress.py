@@ -1,12 +1,26 @@
+import pickle
 import typing
 
 import pytest
 
+from bitcash import cashaddress
 from bitcash.cashaddress import (
+    PREFIX_STATES,
     Address,
+    _cached_encode_cashaddress,
+    _encode_cashaddress,
+    addresses_to_scripts,
+    b32decode,
+    calculate_checksum,
     convertbits,
+    decode_addresses,
+    encode_addresses,
     generate_cashaddress,
     parse_cashaddress,
+    polymod,
+    prefix_expand,
+    scripts_to_addresses,
+    verify_checksum,
 )
 from bitcash.exceptions import InvalidAddress
 from bitcash.types import Network
@@ -116,6 +130,9 @@ class TestAddress:
             Address.from_string(
                 "bitcoincash:qxfyvx77v2pmgc0vulwlfkl3uzjgh5gnmqedjjrtq6"
             )
+        # same checksum as bitcoincash, only the low 5 bits of the prefix count
+        with pytest.raises(InvalidAddress, match="Unknown cash address prefix"):
+            Address.from_string(BITCOIN_CASHADDRESS.replace("cash", "ca3h"))
 
     def test_address_mainnet(self):
         assert Address(payload=list(PUBKEY_HASH), version="P2PKH").payload == list(
@@ -231,6 +248,31 @@ class TestAddress:
         with pytest.raises(ValueError):
             assert address == 1
 
+    def test_hash(self):
+        address = Address.from_string(BITCOIN_CASHADDRESS)
+        same = Address("P2PKH", list(PUBKEY_HASH))
+        assert hash(address) == hash(same) == hash(BITCOIN_CASHADDRESS)
+        assert {address: 1}[same] == 1
+        assert len({address, same, Address.from_string(BITCOIN_CASHADDRESS_TEST)}) == 2
+
+    def test_immutable(self):
+        address = Address.from_string(BITCOIN_CASHADDRESS)
+        with pytest.raises(AttributeError):
+            address.version = "P2PKH-CATKN"
+        # the payload is returned as a copy
+        address.payload.append(0)
+        assert bytes(address.payload) == PUBKEY_HASH
+        assert pickle.loads(pickle.dumps(address)) == address
+
+    def test_cache(self):
+        address = Address.from_string(BITCOIN_CASHADDRESS)
+        assert Address.from_string(BITCOIN_CASHADDRESS) is address
+        assert address.cash_address() is address.cash_address()
+        assert address.scriptcode is address.scriptcode
+        # inputs that are not strings are converted and not cached
+        with pytest.raises(InvalidAddress):
+            Address.from_string(typing.cast(str, [BITCOIN_CASHADDRESS]))
+
     def test_to_from_script(self):
         address = Address.from_string(BITCOIN_CASHADDRESS)
         assert address == Address.from_script(address.scriptcode)
@@ -271,6 +313,126 @@ class TestAddress:
         )
 
 
+def test_polymod():
+    # "prefix:x64nx6hz" from the CashAddr specification
+    assert verify_checksum("prefix", b32decode("x64nx6hz"))
+    assert calculate_checksum("prefix", []) == b32decode("x64nx6hz")
+    for prefix, state in PREFIX_STATES.items():
+        assert polymod(prefix_expand(prefix)) == state ^ 1
+
+    payload = convertbits([0] + list(PUBKEY_HASH), 8, 5)
+    assert payload is not None
+    for prefix in ["bitcoincash", "bchtest", "bchreg", "prefix"]:
+        checksum = calculate_checksum(prefix, payload)
+        assert verify_checksum(prefix, payload + checksum)
+        assert polymod(prefix_expand(prefix) + payload + checksum) == 0
+        assert not verify_checksum(prefix, payload + checksum[::-1])
+
+
+def test_decode_addresses():
+    addresses = [
+        BITCOIN_CASHADDRESS,
+        "bitcoincash:qzfyvx77v2pmgc0vulwlfkl3uzjgh5gnmqk5hhyba6",
+        BITCOIN_CASHADDRESS_TEST,
+        "Hello world!",
+        BITCOIN_CASHADDRESS_PAY2SH32,
+    ]
+    results = decode_addresses(addresses)
+    assert results[0] == (("P2PKH", PUBKEY_HASH), None)
+    assert results[2] == (("P2PKH-TESTNET", PUBKEY_HASH), None)
+    address = Address.from_string(BITCOIN_CASHADDRESS_PAY2SH32)
+    assert results[4] == (("P2SH32", bytes(address.payload)), None)
+    for result in (results[1], results[3]):
+        assert result.value is None
+        assert isinstance(result.error, InvalidAddress)
+
+    scripts = addresses_to_scripts(addresses)
+    assert [result.value for result in scripts] == [
+        Address.from_string(BITCOIN_CASHADDRESS).scriptcode,
+        None,
+        Address.from_string(BITCOIN_CASHADDRESS_TEST).scriptcode,
+        None,
+        address.scriptcode,
+    ]
+    assert isinstance(scripts[3].error, InvalidAddress)
+
+
+def test_encode_addresses():
+    address = Address.from_string(BITCOIN_CASHADDRESS_PAY2SH32)
+    results = encode_addresses(
+        [
+            ("P2PKH", PUBKEY_HASH),
+            ("P2PKH-CATKN", PUBKEY_HASH),
+            ("P2SH32", bytes(address.payload)),
+            ("P2PKH-TESTNET", PUBKEY_HASH),
+            ("P2PKH", PUBKEY_HASH[:-1]),
+            ("P2WPKH", PUBKEY_HASH),
+            ("P2PKH", typing.cast(bytes, 20)),
+            typing.cast(tuple[str, bytes], ("P2PKH",)),
+            typing.cast(tuple[str, bytes], None),
+            ("P2PKH", PUBKEY_HASH),
+        ]
+    )
+    assert [result.value for result in results[:4]] == [
+        BITCOIN_CASHADDRESS,
+        BITCOIN_CASHADDRESS_CATKN,
+        BITCOIN_CASHADDRESS_PAY2SH32,
+        BITCOIN_CASHADDRESS_TEST,
+    ]
+    assert all(result.error is None for result in results[:4])
+    assert isinstance(results[4].error, ValueError)
+    assert isinstance(results[5].error, ValueError)
+    assert isinstance(results[6].error, TypeError)
+    assert isinstance(results[7].error, ValueError)
+    assert isinstance(results[8].error, TypeError)
+    assert all(result.value is None for result in results[4:9])
+    assert results[9] == (BITCOIN_CASHADDRESS, None)
+
+
+def test_scripts_to_addresses():
+    p2pkh = Address.from_string(BITCOIN_CASHADDRESS).scriptcode
+    p2sh32 = Address.from_string(BITCOIN_CASHADDRESS_PAY2SH32).scriptcode
+    scripts = [
+        p2pkh,
+        PREFIX_AMOUNT + p2pkh,
+        p2sh32,
+        b"\x6a\x04test",
+        PREFIX_AMOUNT[:-1],
+        p2pkh,
+    ]
+    assert scripts_to_addresses(scripts) == [
+        BITCOIN_CASHADDRESS,
+        BITCOIN_CASHADDRESS_CATKN,
+        BITCOIN_CASHADDRESS_PAY2SH32,
+        None,
+        None,
+        BITCOIN_CASHADDRESS,
+    ]
+    assert scripts_to_addresses([p2pkh], Network.test) == [BITCOIN_CASHADDRESS_TEST]
+    for script, address in zip(scripts[:3], scripts_to_addresses(scripts[:3])):
+        assert Address.from_script(script) == address
+    # a scan does not evict the addresses cached by Address
+    p2sh20 = Address.from_string(BITCOIN_CASHADDRESS_PAY2SH20).scriptcode
+    currsize = _cached_encode_cashaddress.cache_info().currsize
+    scripts_to_addresses([p2sh20], Network.test)
+    assert _cached_encode_cashaddress.cache_info().currsize == currsize
+
+
+def test_scripts_to_addresses_encodes_hash_once(monkeypatch):
+    encoded = []
+
+    def encode(version, payload):
+        encoded.append((version, payload))
+        return _encode_cashaddress(version, payload)
+
+    monkeypatch.setattr(cashaddress, "_encode_cashaddress", encode)
+    p2pkh = Address.from_string(BITCOIN_CASHADDRESS).scriptcode
+    # token outputs of one category with different amounts and the same hash
+    scripts = [PREFIX_AMOUNT + p2pkh, PREFIX_AMOUNT[:-1] + b"\x07" + p2pkh]
+    assert scripts_to_addresses(scripts) == [BITCOIN_CASHADDRESS_CATKN] * 2
+    assert encoded == [("P2PKH-CATKN", PUBKEY_HASH)]
+
+
 def test_parse_cashaddress():
     # good address
     address, params = parse_cashaddress(
@@ -8,15 +8,24 @@ from bitcash import types as _types
 from bitcash.cashaddress import Address
 from bitcash.cashtoken import (
     Unspents,
+    UnspentSelection,
     _calculate_dust_value,
     generate_cashtoken_prefix,
     parse_cashtoken_prefix,
+    parse_cashtoken_prefixes,
     prepare_output,
     select_cashtoken_utxo,
 )
 from bitcash.exceptions import InsufficientFunds, InvalidAddress, InvalidCashToken
 from bitcash.network.meta import Unspent
-from bitcash.types import CashTokens, NFTCapability, PreparedOutput
+from bitcash.types import (
+    CashTokens,
+    NFTCapability,
+    NFTData,
+    NFTMultiset,
+    PreparedOutput,
+    TokenData,
+)
 
 from .samples import (
     BITCOIN_CASHADDRESS,
@@ -122,6 +131,28 @@ def test_cashtoken_prefix_script(test_vectors, monkeypatch):
         )
 
 
+def test_parse_cashtoken_prefixes(test_vectors, monkeypatch):
+    monkeypatch.setattr(_types, "COMMITMENT_LENGTH", 1500)
+    scripts = [bytes.fromhex(test_vector["prefix"]) for test_vector in test_vectors]
+    scripts += [PREFIX_CAPABILITY_AMOUNT, b"", PREFIX_CAPABILITY_AMOUNT]
+    cashtokens = parse_cashtoken_prefixes(scripts)
+    assert cashtokens == [parse_cashtoken_prefix(script) for script in scripts]
+    assert cashtokens[-2] == CashTokens(None, None, None, None)
+    assert cashtokens[-1] == cashtokens[-3]
+    # views into serialized data are parsed without copying
+    assert parse_cashtoken_prefixes([memoryview(PREFIX_AMOUNT)]) == [
+        parse_cashtoken_prefix(PREFIX_AMOUNT)
+    ]
+
+
+def test_parse_cashtoken_prefix_invalid():
+    with pytest.raises(ValueError):
+        parse_cashtoken_prefix(PREFIX_CAPABILITY_COMMITMENT_AMOUNT[:-1])
+    # unknown nft capability
+    with pytest.raises(ValueError):
+        parse_cashtoken_prefix(PREFIX_CAPABILITY[:33] + b"\x23")
+
+
 class TestPrepareOutput:
     def test_output(self):
         output = (BITCOIN_CASHADDRESS, 20, "bch")
@@ -623,6 +654,154 @@ class TestUnspents:
         assert leftover_amount == 546
 
 
+class TestNFTMultiset:
+    def test_order(self):
+        nfts = [
+            NFTData(NFTCapability.none, b"a"),
+            NFTData(NFTCapability.mutable, None),
+            NFTData(NFTCapability.none, b"b"),
+            NFTData(NFTCapability.none, b"a"),
+            NFTData(NFTCapability.minting, None),
+        ]
+        multiset = NFTMultiset(nfts)
+        assert list(multiset) == nfts
+        assert multiset == nfts
+        assert len(multiset) == 5
+        assert multiset.count(NFTCapability.none) == 3
+
+        assert multiset.pop_immutable(b"a") is nfts[0]
+        assert multiset.pop_immutable(b"c") is None
+        assert multiset.pop_capability(NFTCapability.none) is nfts[2]
+        assert multiset.pop_capability(NFTCapability.mutable) is nfts[1]
+        assert multiset.pop_capability(NFTCapability.mutable) is None
+        assert list(multiset) == [nfts[3], nfts[4]]
+        assert multiset.pop_immutable(b"a") is nfts[3]
+        assert multiset.pop_immutable(b"a") is None
+        assert multiset.count(NFTCapability.none) == 0
+
+    def test_getitem(self):
+        nfts = [NFTData(NFTCapability.mutable, b"a"), NFTData(NFTCapability.none, b"b")]
+        multiset = NFTMultiset(nfts)
+        multiset.pop_capability(NFTCapability.mutable)
+        multiset.append(nfts[0])
+        assert multiset[0] == nfts[1]
+        assert multiset[-1] == nfts[0]
+        assert multiset[:1] == nfts[1:]
+        with pytest.raises(IndexError):
+            multiset[2]
+
+    def test_copy(self):
+        multiset = NFTMultiset([NFTData(NFTCapability.mutable, None)])
+        copy = multiset.copy()
+        copy.pop_capability(NFTCapability.mutable)
+        assert len(multiset) == 1
+        assert len(copy) == 0
+
+    def test_tokendata(self):
+        # a list is converted
+        tokendata = TokenData(
+            None, [NFTData(NFTCapability.minting, None)]  # pyright: ignore
+        )
+        assert isinstance(tokendata.nft, NFTMultiset)
+        tokendata = TokenData(None, NFTMultiset([NFTData(NFTCapability.minting, None)]))
+        tokendata.add_nft(NFTData(NFTCapability.none, b"a"))
+        assert tokendata.to_dict() == {
+            "nft": [
+                {"capability": "minting"},
+                {"capability": "none", "commitment": b"a"},
+            ]
+        }
+        assert TokenData.from_dict(tokendata.to_dict()) == tokendata
+
+    def test_many_nfts(self):
+        unspents = [
+            Unspent(
+                1000, 42, "script", "txid", i, "category1", "none", bytes([i % 256])
+            )
+            for i in range(20000)
+        ]
+        cashtoken = Unspents(unspents)
+        for i in range(20000):
+            cashtoken.subtract_output(
+                PreparedOutput(
+                    b"",
+                    0,
+                    CashTokens("category1", NFTCapability.none, bytes([i % 256]), None),
+                )
+            )
+        assert cashtoken.tokendata == {}
+
+
+class TestUnspentSelection:
+    @staticmethod
+    def subtract_outputs(unspents, outputs, leftover):
+        # reference: subtract the outputs from a fresh aggregate
+        cashtoken = Unspents(unspents)
+        for output in outputs:
+            cashtoken.subtract_output(output)
+        return cashtoken.get_outputs(leftover)
+
+    def test_matches_unspents(self):
+        leftover = Address.from_string(BITCOIN_CASHADDRESS_CATKN)
+        unspents = [
+            Unspent(1000, 42, "script", "txid", 1, "caff", "none"),
+            Unspent(1000, 42, "script", "txid", 0),
+            Unspent(5000, 42, "script", "txid", 2, "caff", token_amount=50),
+            Unspent(2000, 42, "script", "txid", 3),
+            Unspent(1000, 42, "script", "txid", 4, "caff", "minting"),
+            Unspent(9000, 42, "script", "txid", 5),
+        ]
+        outputs = [
+            prepare_output(
+                (BITCOIN_CASHADDRESS_CATKN, 3000, "satoshi", "caff", None, None, 20)
+            ),
+            prepare_output(
+                (
+                    BITCOIN_CASHADDRESS_CATKN,
+                    1000,
+                    "satoshi",
+                    "caff",
+                    "mutable",
+                    None,
+                    None,
+                )
+            ),
+        ]
+        selection = UnspentSelection([], outputs, leftover)
+        for i, unspent in enumerate(unspents):
+            selection.add_unspent(unspent)
+            try:
+                expected = self.subtract_outputs(unspents[: i + 1], outputs, leftover)
+            except InsufficientFunds as err:
+                with pytest.raises(InsufficientFunds, match=str(err)):
+                    selection.get_outputs()
+            else:
+                assert selection.get_outputs() == expected
+        assert selection.amount == 19000
+
+    def test_genesis(self):
+        leftover = Address.from_string(BITCOIN_CASHADDRESS_CATKN)
+        outputs = [
+            prepare_output(
+                (BITCOIN_CASHADDRESS_CATKN, 800, "satoshi", "cafe", "none", None, None)
+            )
+        ]
+        selection = UnspentSelection(
+            [Unspent(1500, 42, "script", "txid", 0)], outputs, leftover
+        )
+        with pytest.raises(InsufficientFunds, match="category_id does not exist"):
+            selection.get_outputs()
+        selection.add_unspent(Unspent(500, 42, "script", "cafe", 0))
+        assert selection.get_outputs() == self.subtract_outputs(
+            [
+                Unspent(1500, 42, "script", "txid", 0),
+                Unspent(500, 42, "script", "cafe", 0),
+            ],
+            outputs,
+            leftover,
+        )
+
+
 def test_select_cashtoken_utxo():
     unspent1 = Unspent(50, 1234, "script", "txid", 1, "c1", "minting")
     unspent2 = Unspent(50, 1234, "script", "txid", 1, "c1", "none")
@@ -0,0 +1,77 @@
+from itertools import combinations
+
+from bitcash.coinselection import select_branch_and_bound, select_knapsack
+
+
+def best_excess(values, target, window):
+    # exhaustive search, for comparison
+    best = None
+    for size in range(1, len(values) + 1):
+        for subset in combinations(values, size):
+            excess = sum(subset) - target
+            if 0 <= excess <= window and (best is None or excess < best):
+                best = excess
+    return best
+
+
+class TestSelectBranchAndBound:
+    def test_exact_match(self):
+        values = [7, 3, 11, 5, 2]
+        selected = select_branch_and_bound(values, 10, 0)
+        assert selected is not None
+        assert sum(values[i] for i in selected) == 10
+
+    def test_single_input(self):
+        assert select_branch_and_bound([1, 20, 50], 19, 2) == [1]
+
+    def test_least_excess(self):
+        values = [30, 24, 17, 13, 9, 6, 5, 3]
+        for target in range(1, 110):
+            selected = select_branch_and_bound(values, target, 4)
+            expected = best_excess(values, target, 4)
+            if expected is None:
+                assert selected is None
+            else:
+                assert selected is not None
+                assert len(set(selected)) == len(selected)
+                assert sum(values[i] for i in selected) - target == expected
+
+    def test_no_solution(self):
+        assert select_branch_and_bound([10, 10, 10], 15, 4) is None
+        assert select_branch_and_bound([10, 10], 25, 100) is None
+
+    def test_ignores_negative_values(self):
+        assert select_branch_and_bound([-100, 0, 10], 10, 0) == [2]
+        assert select_branch_and_bound([-100], -100, 0) is None
+
+    def test_max_tries(self):
+        values = [2**i for i in range(20)] * 2
+        assert select_branch_and_bound(values, 2**20 + 1, 0, max_tries=10) is None
+
+
+class TestSelectKnapsack:
+    def test_exact_match(self):
+        assert select_knapsack([5, 10, 20], 10) == [1]
+
+    def test_lowest_larger(self):
+        assert select_knapsack([1, 2, 30, 50], 10) == [2]
+
+    def test_subset_of_smaller(self):
+        values = [6, 5, 4, 100]
+        selected = select_knapsack(values, 9)
+        assert selected is not None
+        assert 3 not in selected
+        assert sum(values[i] for i in selected) >= 9
+
+    def test_prunes_unneeded(self):
+        values = [8, 7, 1, 1]
+        selected = select_knapsack(values, 9)
+        assert selected is not None
+        assert sorted(values[i] for i in selected) == [1, 8]
+
+    def test_insufficient(self):
+        assert select_knapsack([1, 2, 3], 7) is None
+        assert select_knapsack([-5, 3], 4) is None
+
+    def test_nothing_to_pay(self):
+        assert select_knapsack([1, 2], 0) == []
@@ -0,0 +1,106 @@
+import pytest
+
+from bitcash.cashtoken import Unspents
+from bitcash.ledger import LedgerDiff, UnspentLedger
+from bitcash.network.meta import Unspent
+
+
+def make_unspents():
+    # the ledger updates confirmations in place, each test gets new unspents
+    return [
+        Unspent(1000, 0, "script", "aa", 0),
+        Unspent(2000, 3, "script", "bb", 1, "caff", "none", b"a"),
+        Unspent(3000, 3, "script", "cc", 0, "caff", token_amount=50),
+        Unspent(4000, 3, "script", "dd", 2, "caff", "mutable", None, 25),
+        Unspent(5000, 3, "script", "ee", 0, "caf2", "minting"),
+    ]
+
+
+def assert_totals(ledger):
+    # the running totals match a rebuild from scratch
+    unspents = Unspents(list(ledger))
+    assert ledger.balance == unspents.amount
+    assert ledger.cashtoken_balance == unspents.tokendata
+
+
+class TestUnspentLedger:
+    def setup_method(self):
+        self.unspents = make_unspents()
+
+    def test_init(self):
+        ledger = UnspentLedger(self.unspents)
+        assert len(ledger) == 5
+        assert list(ledger) == self.unspents
+        assert ledger.balance == 15000
+        assert_totals(ledger)
+
+    def test_add_spend(self):
+        ledger = UnspentLedger()
+        for unspent in self.unspents:
+            assert ledger.add(unspent)
+            assert_totals(ledger)
+        assert not ledger.add(Unspent(1000, 5, "script", "aa", 0))
+        assert ledger.balance == 15000
+
+        for unspent in self.unspents[::-1]:
+            assert ledger.spend(unspent.txid, unspent.txindex) is unspent
+            assert_totals(ledger)
+        assert ledger.spend("aa", 0) is None
+        assert ledger.balance == 0
+        assert ledger.cashtoken_balance == {}
+
+    def test_apply(self):
+        ledger = UnspentLedger(self.unspents[:3])
+        diff = ledger.apply(
+            added=self.unspents[3:],
+            spent=[("aa", 0), self.unspents[1], ("ff", 0)],
+            confirmations={("cc", 0): 4, ("dd", 2): 3, ("ff", 0): 1},
+        )
+        assert diff == LedgerDiff(
+            self.unspents[3:], [self.unspents[0], self.unspents[1]], [self.unspents[2]]
+        )
+        unspent = ledger.get("cc", 0)
+        assert unspent is not None
+        assert unspent.confirmations == 4
+        assert ("aa", 0) not in ledger
+        assert self.unspents[3] in ledger
+        assert_totals(ledger)
+
+    def test_sync(self):
+        ledger = UnspentLedger(self.unspents[:3])
+        listing = [
+            Unspent(1000, 1, "script", "aa", 0),
+            Unspent(3000, 3, "script", "cc", 0, "caff", token_amount=50),
+            Unspent(6000, 0, "script", "ff", 0),
+        ]
+        diff = ledger.sync(listing)
+        assert diff.added == [listing[2]]
+        assert diff.spent == [self.unspents[1]]
+        assert diff.confirmed == [self.unspents[0]]
+        # unchanged unspents keep their instance
+        assert ledger.get("cc", 0) is self.unspents[2]
+        unspent = ledger.get("aa", 0)
+        assert unspent is not None
+        assert unspent.confirmations == 1
+        assert ledger.balance == 10000
+        assert_totals(ledger)
+
+        assert ledger.sync(listing) == LedgerDiff([], [], [])
+
+    def test_snapshot(self):
+        ledger = UnspentLedger(self.unspents)
+        unspents, balance, cashtoken_balance = ledger.snapshot()
+        ledger.spend("bb", 1)
+        assert unspents == self.unspents
+        assert balance == 15000
+        nft = cashtoken_balance["caff"].nft
+        assert nft is not None
+        assert len(nft) == 2
+        nft = ledger.cashtoken_balance["caff"].nft
+        assert nft is not None
+        assert len(nft) == 1
+
+    def test_spend_unknown_token(self):
+        unspents = Unspents([self.unspents[0]])
+        with pytest.raises(ValueError):
+            unspents.remove_unspent(self.unspents[1])
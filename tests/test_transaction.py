@@ -4,14 +4,25 @@ import pytest
 from bitcash.exceptions import InsufficientFunds
 from bitcash.network.meta import Unspent
 from bitcash.transaction import (
+    BatchResult,
+    SighashCache,
     TxIn,
+    TxSize,
+    TxWriter,
     calc_txid,
     create_p2pkh_transaction,
+    create_p2pkh_transaction_bytes,
+    create_p2pkh_transactions,
     construct_input_block,
+    deserialize_transaction,
     construct_output_block,
     estimate_tx_fee,
+    p2pkh_input_size,
     sanitize_tx_data,
+    serialize_transaction,
 )
+from bitcash.cashtoken import generate_cashtoken_prefix
+from bitcash.crypto import double_sha256, sha256
 from bitcash.op import OpCodes
 from bitcash.cashaddress import Address
 from bitcash.types import CashTokens, NFTCapability, PreparedOutput
@@ -332,6 +343,120 @@ class TestSanitizeTxData:
         assert outputs_single[1][0] == Address.from_string(RETURN_ADDRESS).scriptcode
         assert outputs[1][1] == outputs_single[1][1]
 
+    def test_exact_fee_combine(self):
+        unspents_original = [Unspent(5000, 0, "", "", 0), Unspent(5000, 0, "", "", 0)]
+        outputs_original = [(BITCOIN_CASHADDRESS_COMPRESSED, 1000, "satoshi")]
+
+        unspents, outputs = sanitize_tx_data(
+            unspents_original,
+            outputs_original,
+            fee=1,
+            leftover=RETURN_ADDRESS,
+            combine=True,
+            exact_fee=True,
+        )
+
+        # 10 bytes overhead, 2 inputs of 148 bytes and 2 P2PKH outputs of 34
+        assert unspents == unspents_original
+        assert outputs[1][1] == 10000 - 1000 - (10 + 2 * 148 + 2 * 34)
+
+    def test_exact_fee_no_combine(self):
+        unspents_original = [
+            Unspent(1500, 0, "", "", 0),
+            Unspent(1600, 0, "", "", 0),
+            Unspent(1700, 0, "", "", 0),
+        ]
+        outputs_original = [(BITCOIN_CASHADDRESS_COMPRESSED, 2000, "satoshi")]
+
+        unspents, outputs = sanitize_tx_data(
+            unspents_original,
+            outputs_original,
+            fee=1,
+            leftover=RETURN_ADDRESS,
+            combine=False,
+            exact_fee=True,
+        )
+
+        assert unspents == [Unspent(1500, 0, "", "", 0), Unspent(1600, 0, "", "", 0)]
+        assert outputs[1][1] == 3100 - 2000 - (10 + 2 * 148 + 2 * 34)
+
+    def test_bnb_changeless(self):
+        unspents_original = [
+            Unspent(1000, 0, "", "a", 0),
+            Unspent(5150, 0, "", "b", 0),
+            Unspent(5200, 0, "", "c", 0),
+            Unspent(30000, 0, "", "d", 0),
+        ]
+        outputs_original = [(BITCOIN_CASHADDRESS_COMPRESSED, 10000, "satoshi")]
+
+        unspents, outputs = sanitize_tx_data(
+            unspents_original,
+            outputs_original,
+            fee=1,
+            leftover=RETURN_ADDRESS,
+            combine=False,
+            exact_fee=True,
+            coin_selection="bnb",
+        )
+
+        # 10350 - 10000 pays the fee of 10 + 2 * 148 + 34 bytes, the excess
+        # of 10 satoshi is less than a change output costs
+        assert unspents == [unspents_original[2], unspents_original[1]]
+        assert len(outputs) == 1
+        assert outputs[0][1] == 10000
+
+    def test_bnb_knapsack(self):
+        unspents_original = [
+            Unspent(1000, 0, "", "a", 0),
+            Unspent(2000, 0, "", "b", 0),
+            Unspent(30000, 0, "", "c", 0),
+        ]
+        outputs_original = [(BITCOIN_CASHADDRESS_COMPRESSED, 10000, "satoshi")]
+
+        unspents, outputs = sanitize_tx_data(
+            unspents_original,
+            outputs_original,
+            fee=1,
+            leftover=RETURN_ADDRESS,
+            combine=False,
+            exact_fee=True,
+            coin_selection="bnb",
+        )
+
+        assert unspents == [unspents_original[2]]
+        assert outputs[1][1] == 30000 - 10000 - (10 + 148 + 2 * 34)
+
+    def test_bnb_legacy_fee(self):
+        unspents_original = [
+            Unspent(1000, 0, "", "a", 0),
+            Unspent(5150, 0, "", "b", 0),
+            Unspent(5200, 0, "", "c", 0),
+        ]
+        outputs_original = [(BITCOIN_CASHADDRESS_COMPRESSED, 10000, "satoshi")]
+
+        unspents, outputs = sanitize_tx_data(
+            unspents_original,
+            outputs_original,
+            fee=1,
+            leftover=RETURN_ADDRESS,
+            combine=False,
+            coin_selection="bnb",
+        )
+
+        assert unspents == [unspents_original[2], unspents_original[1]]
+        assert len(outputs) == 1
+
+    def test_unknown_coin_selection(self):
+        with pytest.raises(ValueError):
+            sanitize_tx_data(
+                [Unspent(1000, 0, "", "", 0)],
+                [(BITCOIN_CASHADDRESS_COMPRESSED, 500, "satoshi")],
+                fee=1,
+                leftover=RETURN_ADDRESS,
+                combine=False,
+                coin_selection="largest",  # type: ignore
+            )
+
     def test_no_combine_insufficient_funds(self):
         unspents_original = [Unspent(1000, 0, "", "", 0), Unspent(1000, 0, "", "", 0)]
         outputs_original = [(BITCOIN_CASHADDRESS_COMPRESSED, 2500, "satoshi")]
@@ -540,6 +665,143 @@ class TestCreateSignedTransaction:
         print(tx)
         assert tx[-288:] == FINAL_TX_1[-288:]
 
+    def test_bytes(self):
+        private_key = PrivateKey(WALLET_FORMAT_MAIN)
+        tx, txid = create_p2pkh_transaction_bytes(private_key, UNSPENTS, OUTPUTS)
+        assert isinstance(tx, bytes)
+        assert tx == hex_to_bytes(
+            create_p2pkh_transaction(private_key, UNSPENTS, OUTPUTS)
+        )
+        assert txid == calc_txid(tx)
+
+    def test_low_r(self):
+        private_key = PrivateKey(WALLET_FORMAT_MAIN)
+        unspents = [
+            Unspent(1000, 15, UNSPENTS[0].script, UNSPENTS[0].txid, i)
+            for i in range(20)
+        ]
+        tx = deserialize_transaction(
+            create_p2pkh_transaction(private_key, unspents, OUTPUTS, low_r=True)
+        )
+        for txin in tx.inputs:
+            signature_len = txin.script_sig[0]
+            assert signature_len <= 71
+            assert txin.script_sig[4] <= 32
+
+    def test_schnorr(self):
+        private_key = PrivateKey(WALLET_FORMAT_MAIN)
+        tx_hex = create_p2pkh_transaction(
+            private_key, UNSPENTS, OUTPUTS, sig_type="schnorr"
+        )
+        tx = deserialize_transaction(tx_hex)
+        script_sig = tx.inputs[0].script_sig
+        assert script_sig[0] == 65
+        assert script_sig[65] == 0x41
+
+        script = hex_to_bytes(UNSPENTS[0].script)
+        txin = TxIn(
+            script,
+            len(script).to_bytes(1, "little"),
+            hex_to_bytes(UNSPENTS[0].txid)[::-1],
+            UNSPENTS[0].txindex.to_bytes(4, "little"),
+            UNSPENTS[0].amount.to_bytes(8, "little"),
+        )
+        hashed = SighashCache([txin], construct_output_block(OUTPUTS)).sighash(txin)
+        assert private_key.verify_schnorr(script_sig[1:65], hashed)
+
+    def test_unknown_sig_type(self):
+        private_key = PrivateKey(WALLET_FORMAT_MAIN)
+        with pytest.raises(ValueError):
+            create_p2pkh_transaction(
+                private_key,
+                UNSPENTS,
+                OUTPUTS,
+                sig_type=typing.cast(typing.Literal["ecdsa"], "rsa"),
+            )
+
+    def test_workers(self):
+        private_key = PrivateKey(WALLET_FORMAT_MAIN)
+        unspents = [
+            Unspent(
+                1000,
+                15,
+                UNSPENTS[0].script,
+                UNSPENTS[0].txid,
+                i,
+            )
+            for i in range(8)
+        ]
+        assert create_p2pkh_transaction(
+            private_key, unspents, OUTPUTS, workers=4
+        ) == create_p2pkh_transaction(private_key, unspents, OUTPUTS)
+
+
+class TestSighashCache:
+    def test_matches_full_preimage(self):
+        txins = [
+            TxIn(b"script", b"\x06", b"\x01" * 32, b"\x00" * 4, AMOUNT),
+            TxIn(b"scr", b"\x03", b"\x02" * 32, b"\x01" * 4, AMOUNT, b"\xef"),
+        ]
+        output_block = construct_output_block(OUTPUTS)
+        cache = SighashCache(txins, output_block)
+        hash_prevouts = double_sha256(b"".join(i.txid + i.txindex for i in txins))
+        hash_sequence = double_sha256(b"\xff" * 4 * 2)
+        hash_outputs = double_sha256(output_block)
+        for txin in txins:
+            preimage = (
+                b"\x01\x00\x00\x00"
+                + hash_prevouts
+                + hash_sequence
+                + txin.txid
+                + txin.txindex
+                + txin.token_prefix
+                + txin.script_len
+                + txin.script
+                + txin.amount
+                + b"\xff" * 4
+                + hash_outputs
+                + b"\x00" * 4
+                + b"\x41\x00\x00\x00"
+            )
+            assert cache.sighash(txin) == sha256(preimage)
+
+    def test_script_code(self):
+        txin = TxIn(b"script", b"\x06", b"\x01" * 32, b"\x00" * 4, AMOUNT)
+        other = TxIn(b"other", b"\x05", b"\x01" * 32, b"\x00" * 4, AMOUNT)
+        cache = SighashCache([txin], construct_output_block(OUTPUTS))
+        assert cache.sighash(txin, b"\x05other") == cache.sighash(other)
+
+
+class TestCreateSignedTransactions:
+    def test_matching(self):
+        private_key = PrivateKey(WALLET_FORMAT_MAIN)
+        other_key = PrivateKey()
+        jobs = [
+            (private_key, UNSPENTS, OUTPUTS),
+            (other_key, UNSPENTS, OUTPUTS),
+            (private_key, UNSPENTS, OUTPUTS[:1]),
+        ]
+        results = create_p2pkh_transactions(jobs, max_workers=2)
+        assert results == [
+            BatchResult(create_p2pkh_transaction(*job), None) for job in jobs
+        ]
+
+    def test_error(self):
+        private_key = PrivateKey(WALLET_FORMAT_MAIN)
+        bad_unspent = Unspent(1000, 1, "zz", UNSPENTS[0].txid, 0)
+        results = create_p2pkh_transactions(
+            [(private_key, [bad_unspent], OUTPUTS), (private_key, UNSPENTS, OUTPUTS)],
+            max_workers=1,
+        )
+        assert results[0].tx_hex is None
+        assert isinstance(results[0].error, ValueError)
+        assert results[1] == BatchResult(
+            create_p2pkh_transaction(private_key, UNSPENTS, OUTPUTS), None
+        )
+
+    def test_empty(self):
+        assert create_p2pkh_transactions([]) == []
+
 
 class TestEstimateTxFee:
     def test_accurate_compressed(self):
@@ -556,6 +818,12 @@ class TestEstimateTxFee:
         output_script_list = [b"\x00" * 35] * 2
         assert estimate_tx_fee(1, output_script_list, 70, True) == 17220
 
+    def test_schnorr(self):
+        # 2 p2pkh
+        output_script_list = [b"\x00" * 25] * 2
+        assert estimate_tx_fee(1, output_script_list, 70, True, "schnorr") == 15330
+        assert estimate_tx_fee(1, output_script_list, 70, False, "schnorr") == 17570
+
     def test_accurate_uncompressed(self):
         # 2 p2pkh
         output_script_list = [b"\x00" * 25] * 2
@@ -567,6 +835,48 @@ class TestEstimateTxFee:
         assert estimate_tx_fee(5, output_script_list, 0, True) == 0
 
 
+class TestTxSize:
+    def test_input_size(self):
+        assert p2pkh_input_size(True) == 148
+        assert p2pkh_input_size(False) == 180
+        assert p2pkh_input_size(True, 65) == 141
+
+    def test_size(self):
+        tx_size = TxSize(148)
+        tx_size.add_inputs(2)
+        tx_size.add_output(b"\x00" * 25)
+        assert tx_size.size() == 4 + 1 + 2 * 148 + 1 + 34 + 4
+        assert tx_size.size([b"\x00" * 23]) == 4 + 1 + 2 * 148 + 1 + 34 + 32 + 4
+        # extra scripts are not kept
+        assert tx_size.n_out == 1
+
+    def test_varints(self):
+        tx_size = TxSize(148)
+        tx_size.add_inputs(253)
+        tx_size.add_output(b"\x00" * 253)
+        assert tx_size.size() == 4 + 3 + 253 * 148 + 1 + 8 + 3 + 253 + 4
+
+    def test_fee(self):
+        tx_size = TxSize(148)
+        tx_size.add_inputs()
+        assert tx_size.fee(0) == 0
+        assert tx_size.fee(2) == 2 * tx_size.size()
+
+    def test_upper_bound_of_signed_size(self):
+        private_key = PrivateKey(WALLET_FORMAT_MAIN)
+        unspents = [
+            Unspent(1000, 15, UNSPENTS[0].script, UNSPENTS[0].txid, i)
+            for i in range(20)
+        ]
+        tx = hex_to_bytes(create_p2pkh_transaction(private_key, unspents, OUTPUTS))
+        tx_size = TxSize(p2pkh_input_size(private_key.is_compressed()))
+        tx_size.add_inputs(len(unspents))
+        for output in OUTPUTS:
+            tx_size.add_output(output.scriptcode)
+        assert len(tx) <= tx_size.size()
+        assert len(tx) >= tx_size.size() - len(unspents)
+
+
 class TestConstructOutputBlock:
     def test_no_message(self):
         assert construct_output_block(OUTPUTS) == hex_to_bytes(OUTPUT_BLOCK)
@@ -632,5 +942,123 @@ def test_construct_input_block():
     assert construct_input_block(INPUTS) == hex_to_bytes(INPUT_BLOCK)
 
 
+class TestTxWriter:
+    def test_write(self):
+        writer = TxWriter(6)
+        writer.write(b"abc")
+        writer.write(b"def")
+        assert writer.getvalue() == b"abcdef"
+
+    def test_incomplete(self):
+        writer = TxWriter(6)
+        writer.write(b"abc")
+        with pytest.raises(ValueError):
+            writer.getvalue()
+
+
+class TestSerializeTransaction:
+    def test_matching(self):
+        assert serialize_transaction(INPUTS, OUTPUTS) == (
+            hex_to_bytes("0100000001")
+            + hex_to_bytes(INPUT_BLOCK)
+            + b"\x02"
+            + hex_to_bytes(OUTPUT_BLOCK)
+            + b"\x00\x00\x00\x00"
+        )
+
+    def test_output_block(self):
+        output_block = construct_output_block(OUTPUTS)
+        assert serialize_transaction(
+            INPUTS, OUTPUTS, output_block=output_block
+        ) == serialize_transaction(INPUTS, OUTPUTS)
+
+    def test_many_inputs_varint(self):
+        tx = serialize_transaction(INPUTS * 300, OUTPUTS)
+        assert tx[4:7] == b"\xfd\x2c\x01"
+        assert tx[7:].startswith(hex_to_bytes(INPUT_BLOCK) * 300)
+
+
+class TestDeserializeTransaction:
+    def test_fields(self):
+        tx = deserialize_transaction(FINAL_TX_1)
+        assert tx.version == 1
+        assert tx.lock_time == 0
+        assert tx.txid == FINAL_TX_ID
+        assert len(tx.inputs) == 1
+        assert tx.inputs[0].txid == UNSPENTS[0].txid
+        assert tx.inputs[0].txindex == 1
+        assert tx.inputs[0].sequence == 0xFFFFFFFF
+        assert tx.inputs[0].script_sig == hex_to_bytes(FINAL_TX_1[84:360])
+        assert [(o.amount, o.script) for o in tx.outputs] == [
+            (o.amount, o.scriptcode) for o in OUTPUTS
+        ]
+
+    def test_bytes(self):
+        tx = deserialize_transaction(hex_to_bytes(FINAL_TX_1))
+        assert tx.txid == FINAL_TX_ID
+
+    def test_cashtoken_round_trip(self):
+        private_key = PrivateKey(WALLET_FORMAT_MAIN)
+        cashtoken = CashTokens("b" * 64, NFTCapability.mutable, b"commitment", 1000)
+        unspents = [
+            Unspent(
+                100000,
+                1,
+                UNSPENTS[0].script,
+                UNSPENTS[0].txid,
+                0,
+                "b" * 64,
+                "mutable",
+                b"commitment",
+                1000,
+            )
+        ]
+        outputs = [
+            PreparedOutput(
+                generate_cashtoken_prefix(cashtoken)
+                + Address.from_string(BITCOIN_CASHADDRESS_CATKN).scriptcode,
+                90000,
+                cashtoken,
+            ),
+            MESSAGES[0],
+        ]
+        tx_hex = create_p2pkh_transaction(private_key, unspents, outputs)
+        raw = deserialize_transaction(tx_hex)
+        assert raw.txid == calc_txid(tx_hex)
+        assert raw.outputs[0].cashtoken == cashtoken
+        assert raw.outputs[1].cashtoken == EMPTY_CASHTOKEN
+
+        tx = raw.to_transaction(unspents)
+        assert tx.txid == raw.txid
+        assert tx.amount_in == 100000
+        assert tx.amount_out == 90000
+        assert tx.amount_fee == 10000
+        assert tx.inputs[0].token_amount == 1000
+        assert tx.inputs[0].nft_capability == "mutable"
+        assert tx.outputs[0].address == BITCOIN_CASHADDRESS_CATKN
+        assert tx.outputs[0].nft_commitment == b"commitment"
+        assert tx.outputs[1].address is None
+        assert tx.outputs[1].op_return is not None
+
+    def test_to_transaction_mismatch(self):
+        raw = deserialize_transaction(FINAL_TX_1)
+        with pytest.raises(ValueError):
+            raw.to_transaction([])
+        unspent = Unspent(1000, 1, UNSPENTS[0].script, UNSPENTS[0].txid, 0)
+        with pytest.raises(ValueError):
+            raw.to_transaction([unspent])
+
+    def test_truncated(self):
+        with pytest.raises(ValueError):
+            deserialize_transaction(FINAL_TX_1[:-10])
+        with pytest.raises(ValueError):
+            deserialize_transaction(FINAL_TX_1[:10])
+
+    def test_trailing_bytes(self):
+        with pytest.raises(ValueError):
+            deserialize_transaction(FINAL_TX_1 + "00")
+
+
 def test_calc_txid():
     assert calc_txid(FINAL_TX_1) == FINAL_TX_ID
+    assert calc_txid(hex_to_bytes(FINAL_TX_1)) == FINAL_TX_ID
@@ -0,0 +1,66 @@
+import pytest
+
+from bitcash.network.meta import Unspent
+
+np = pytest.importorskip("numpy")
+
+from bitcash.unspenttable import UnspentTable  # noqa: E402
+
+TXIDS = [bytes([i]) * 32 for i in range(6)]
+
+
+def make_unspents():
+    return [
+        Unspent(1000, 0, "script", TXIDS[0].hex(), 0),
+        Unspent(5000, 3, "script", TXIDS[1].hex(), 1, "caff", "none", b"a"),
+        Unspent(3000, 3, "script2", TXIDS[2].hex(), 0, "caff", token_amount=50),
+        Unspent(5000, 6, "script", TXIDS[3].hex(), 2, "caf2", "minting", None, 25),
+        Unspent(500, 6, "script", TXIDS[4].hex(), 0),
+        Unspent(4000, 1, "script2", TXIDS[5].hex(), 7),
+    ]
+
+
+class TestUnspentTable:
+    def test_roundtrip(self):
+        unspents = make_unspents()
+        table = UnspentTable.from_unspents(unspents)
+        assert len(table) == 6
+        assert table.scripts == ["script", "script2"]
+        assert table.categories == ["caff", "caf2"]
+        assert table.txid.shape == (6, 32)
+        restored = table.to_unspents()
+        assert restored == unspents
+        assert [u.to_dict() for u in restored] == [u.to_dict() for u in unspents]
+
+    def test_empty(self):
+        table = UnspentTable.from_unspents([])
+        assert len(table) == 0
+        assert table.sum() == 0
+        assert table.top_k(3).to_unspents() == []
+
+    def test_invalid_txid(self):
+        with pytest.raises(ValueError):
+            UnspentTable.from_unspents([Unspent(1000, 0, "script", "txid", 0)])
+
+    def test_filter(self):
+        table = UnspentTable.from_unspents(make_unspents())
+        indices = [u.txindex for u in table.filter(min_confirmations=3).to_unspents()]
+        assert indices == [1, 0, 2, 0]
+        assert table.filter(has_token=True).sum() == 13000
+        assert table.filter(has_token=False).sum() == 5500
+        assert table.filter(has_token=False, min_amount=546).sum() == 5000
+        assert len(table.filter()) == 6
+
+    def test_top_k(self):
+        table = UnspentTable.from_unspents(make_unspents())
+        assert table.top_k(3).amount.tolist() == [5000, 5000, 4000]
+        # equal amounts keep their order in the table
+        top = table.top_k(1).to_unspents()
+        assert top[0].txid == TXIDS[1].hex()
+        assert table.top_k(10).amount.tolist() == [5000, 5000, 4000, 3000, 1000, 500]
+        assert len(table.top_k(0)) == 0
+
+    def test_sum(self):
+        table = UnspentTable.from_unspents(make_unspents())
+        assert table.sum() == 18500
+        assert isinstance(table.sum(), int)
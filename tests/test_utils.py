@@ -1,4 +1,7 @@
 import io
+
+import pytest
+
 from bitcash.utils import (
     Decimal,
     bytes_to_hex,
@@ -9,6 +12,7 @@ from bitcash.utils import (
     int_to_hex,
     int_to_unknown_bytes,
     int_to_varint,
+    split_cashtoken_prefix,
     varint_to_int,
 )
 
@@ -89,6 +93,25 @@ class TestVarIntToInt:
         assert varint_to_int(stream) == 10000000000
 
 
+class TestSplitCashtokenPrefix:
+    def test_no_prefix(self):
+        assert split_cashtoken_prefix(b"\x76\xa9") == (None, 0, None, None, 0)
+        assert split_cashtoken_prefix(b"") == (None, 0, None, None, 0)
+
+    def test_prefix(self):
+        category = bytes(range(32))
+        script = b"\xef" + category + b"\x72\x02ab\xfd\x00\x01\x76\xa9"
+        assert split_cashtoken_prefix(script) == (category, 0x72, b"ab", 256, 40)
+        view = memoryview(b"\x00" + script)
+        assert split_cashtoken_prefix(view, 1) == (category, 0x72, b"ab", 256, 41)
+
+    def test_truncated(self):
+        script = b"\xef" + bytes(32) + b"\x72\x02ab\xfd\x00\x01"
+        for end in range(1, len(script)):
+            with pytest.raises(ValueError):
+                split_cashtoken_prefix(script[:end])
+
+
 def test_hex_to_bytes():
     assert hex_to_bytes(HEX) == BYTES_BIG
     assert hex_to_bytes(ODD_HEX) == ODD_HEX_BYTES
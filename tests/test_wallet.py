@@ -6,8 +6,9 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from bitcash.crypto import ECPrivateKey
-from bitcash.curve import Point
+from bitcash import crypto
+from bitcash.crypto import ECPrivateKey, schnorr_sign, schnorr_verify
+from bitcash.curve import GROUP_ORDER, Point
 from bitcash.format import verify_sig
 from bitcash.wallet import (
     BaseKey,
@@ -18,6 +19,7 @@ from bitcash.wallet import (
     wif_to_key,
 )
 from bitcash.network.meta import Unspent
+from bitcash.transaction import deserialize_transaction
 from bitcash.network.APIs import SubscriptionHandle
 from .samples import (
     PRIVATE_KEY_BYTES,
@@ -114,6 +116,75 @@ class TestBaseKey:
         signature = base_key.sign(data)
         assert verify_sig(signature, data, base_key.public_key)
 
+    def test_sign_low_r(self):
+        base_key = BaseKey()
+        for _ in range(20):
+            data = os.urandom(200)
+            signature = base_key.sign(data, low_r=True)
+            assert signature[3] <= 32
+            assert len(signature) <= 70
+            assert verify_sig(signature, data, base_key.public_key)
+            assert signature == base_key.sign(data, low_r=True)
+
+    def test_sign_low_r_unavailable(self, monkeypatch):
+        # fees assume low R signatures, a normal one must not be returned
+        monkeypatch.setattr(crypto, "_ffi", None)
+        base_key = BaseKey()
+        with pytest.raises(RuntimeError):
+            base_key.sign(os.urandom(200), low_r=True)
+
+    def test_sign_schnorr(self):
+        base_key = BaseKey()
+        data = os.urandom(200)
+        signature = base_key.sign_schnorr(data)
+        assert len(signature) == 64
+        assert base_key.verify_schnorr(signature, data)
+        assert not base_key.verify_schnorr(signature, os.urandom(200))
+        assert not BaseKey().verify_schnorr(signature, data)
+        assert signature == base_key.sign_schnorr(data)
+
+    def test_schnorr_verify_vector(self):
+        public_key = bytes.fromhex(
+            "0279BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798"
+        )
+        signature = bytes.fromhex(
+            "787A848E71043D280C50470E8E1532B2DD5D20EE912A45DBDD2BD1DF"
+            "BF187EF67031A98831859DC34DFFEEDDA86831842CCD0079E1F92AF1"
+            "77F7F22CC1DCED05"
+        )
+        assert schnorr_verify(signature, b"\x00" * 32, public_key)
+        assert not schnorr_verify(signature, b"\x01" * 32, public_key)
+        assert not schnorr_verify(signature[:63], b"\x00" * 32, public_key)
+
+    def test_schnorr_sign_scalars(self):
+        # same signature as the scalar math done with Python ints
+        for _ in range(20):
+            private_key = ECPrivateKey()
+            msg = os.urandom(32)
+            nonce = next(
+                crypto._rfc6979_nonces(
+                    private_key.secret, msg, crypto.SCHNORR_NONCE_ALGO
+                )
+            )
+            k = int.from_bytes(nonce, "big")
+            R_x, R_y = ECPrivateKey(nonce).public_key.point()
+            if not crypto._is_square(R_y):
+                k = GROUP_ORDER - k
+            r = R_x.to_bytes(32, "big")
+            public_key = private_key.public_key.format(compressed=True)
+            e = int.from_bytes(crypto.sha256(r + public_key + msg), "big")
+            s = (k + e * private_key.to_int()) % GROUP_ORDER
+            assert schnorr_sign(private_key.secret, msg) == r + s.to_bytes(32, "big")
+
+    def test_schnorr_sign_uncompressed(self):
+        private_key = ECPrivateKey()
+        msg = os.urandom(32)
+        signature = schnorr_sign(private_key.secret, msg)
+        public_key = private_key.public_key.format(compressed=False)
+        assert schnorr_verify(signature, msg, public_key)
+        with pytest.raises(ValueError):
+            schnorr_sign(private_key.secret, msg[:31])
+
     def test_verify_success(self):
         base_key = BaseKey()
         data = os.urandom(200)
@@ -160,6 +231,26 @@ class TestPrivateKey:
     def test_alias(self):
         assert Key == PrivateKey
 
+    def test_prepare_sign_transaction_low_r(self):
+        private_key = PrivateKey(WALLET_FORMAT_COMPRESSED_MAIN)
+        unspents = [
+            Unspent(100000, 1, private_key.scriptcode.hex(), "ab" * 32, i)
+            for i in range(20)
+        ]
+        tx_data = PrivateKey.prepare_transaction(
+            private_key.address,
+            [(private_key.address, 1500000, "satoshi")],
+            fee=1,
+            unspents=unspents,
+            exact_fee=True,
+            low_r=True,
+        )
+        tx = deserialize_transaction(private_key.sign_transaction(tx_data, low_r=True))
+        assert len(tx.inputs) == 20
+        for tx_input in tx.inputs:
+            # pushdata length of the DER signature and sighash byte
+            assert tx_input.script_sig[0] <= 71
+
     def test_init_default(self):
         private_key = PrivateKey()
 
@@ -313,6 +404,33 @@ class TestPrivateKey:
         assert call_args[0][0] == private_key.address
         assert call_args[1]["network"] == "mainnet"
 
+    @patch("bitcash.wallet.NetworkAPI")
+    def test_get_unspents_ledger(self, mock_network_api):
+        unspent1 = Unspent(1000, 0, "script", "aa", 0)
+        unspent2 = Unspent(2000, 0, "script", "bb", 0, "caff", token_amount=5)
+        mock_network_api.get_unspent.return_value = [unspent1, unspent2]
+
+        private_key = PrivateKey(WALLET_FORMAT_MAIN)
+        assert private_key.get_unspents() == [unspent1, unspent2]
+        assert private_key.balance == 3000
+        assert private_key.cashtoken_balance["caff"].token_amount == 5
+        cashtoken_balance = private_key.cashtoken_balance
+
+        unspent3 = Unspent(4000, 0, "script", "cc", 0)
+        mock_network_api.get_unspent.return_value = [
+            Unspent(1000, 1, "script", "aa", 0),
+            unspent3,
+        ]
+        assert private_key.get_unspents() == [
+            Unspent(1000, 1, "script", "aa", 0),
+            unspent3,
+        ]
+        assert private_key.unspents[0] is unspent1
+        assert private_key.balance == 5000
+        assert private_key.cashtoken_balance == {}
+        # a balance returned earlier is not changed by later syncs
+        assert cashtoken_balance["caff"].token_amount == 5
+
     @patch("bitcash.wallet.NetworkAPI")
     def test_subscribe_with_update_self_updates_balances(self, mock_network_api):
         """Test that subscribe with update_self=True updates unspents and transactions."""